@@ -0,0 +1,57 @@
+"""Compara o gerador vetorizado com o loop de Faker usado antes no seed.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.data_generator_bench
+    python -m benchmarks.data_generator_bench --sizes 250 10000 --table notes --json ./reports/generator.json
+"""
+import argparse
+import json
+import time
+
+from tests.api.support_data import fake_notes, fake_users, vectorized_notes, vectorized_users
+
+GENERATORS = {
+    'users': {'faker': fake_users, 'vectorized': vectorized_users},
+    'notes': {'faker': fake_notes, 'vectorized': vectorized_notes},
+}
+
+
+def measure(generator, rows):
+    # Consome o iterador inteiro, como o bulk_insert faz durante o seed
+    start = time.perf_counter()
+    count = sum(1 for _ in generator(rows))
+    elapsed = time.perf_counter() - start
+    return {'rows': count, 'seconds': elapsed, 'rows_per_second': count / elapsed if elapsed else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 10_000, 1_000_000])
+    parser.add_argument('--table', choices=sorted(GENERATORS), default='users')
+    parser.add_argument('--faker-max-rows', type=int, default=None,
+                        help='skip the Faker loop above this size (1M Faker rows take several minutes)')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'rows':>10} {'generator':>11} {'seconds':>10} {'rows/s':>12} {'speedup':>8}")
+    for rows in args.sizes:
+        timings = {}
+        for name, generator in GENERATORS[args.table].items():
+            if name == 'faker' and args.faker_max_rows is not None and rows > args.faker_max_rows:
+                continue
+            timings[name] = measure(generator, rows)
+            results.append({'table': args.table, 'generator': name, **timings[name]})
+        for name, timing in timings.items():
+            speedup = ''
+            if name == 'vectorized' and 'faker' in timings:
+                speedup = f"{timings['faker']['seconds'] / timing['seconds']:.1f}x"
+            print(f"{rows:>10} {name:>11} {timing['seconds']:>10.3f} {timing['rows_per_second']:>12,.0f} {speedup:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(results, json_file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
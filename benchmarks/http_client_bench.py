@@ -0,0 +1,194 @@
+"""Mede o custo do lado do cliente dos helpers da API contra o stand-in local.
+
+Cada configuração roda os mesmos ciclos dos testes, um depois do outro: cria usuário,
+faz login, cria nota, exclui nota e exclui usuário. Os ciclos usam os helpers reais
+(support_api, ou support_api_async no modo async) com um banco de seed descartável.
+Configurações:
+    no-session  ApiClient com `Connection: close`: uma conexão TCP nova por requisição
+    session     ApiClient com o pool keep-alive, como nos testes
+    async       AsyncApiClient (httpx) com os fluxos assíncronos
+
+O tempo de cada ciclo é dividido com o timer do support_phases (HTTP, JSON, consultas e
+commits no MySQL, resto do helper). Do tempo HTTP sai o tempo gasto pelo servidor, então
+`client` é o custo do cliente por requisição: montar headers, codificar o form, enviar,
+receber e fazer o parse. `prepare` isola só a montagem dos headers e do form. O
+servidor é o mesmo em todas as configurações, então os números são comparáveis.
+Usa o MySQL do .env (DB_HOST, DB_USER, DB_PASSWORD); o banco é excluído no final.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.http_client_bench
+    python -m benchmarks.http_client_bench --lifecycles 200 --configs session async --json ./reports/http_client.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import time
+from dotenv import load_dotenv
+import requests
+
+from benchmarks.seeding_bench import notes_seed
+from tests.api.notes_api_test import NOTES_SCHEMA
+from tests.api.standin_api import NotesApiServer
+from tests.api.support_api import create_note_api, create_user4Notes_api, delete_note_api, delete_user4Notes_api, login_user4Notes_api
+from tests.api.support_api_async import AsyncApiClient, note_lifecycle_api_async
+from tests.api.support_cleanup import ACCOUNTS, create_accounts_table
+from tests.api.support_context import FlowContext
+from tests.api.support_db import DatabasePools, bulk_insert, create_seed_database, recreate_tables, seed_is_current
+from tests.api.support_http import DEFAULT_HEADERS, ApiClient
+from tests.api.support_phases import start_timer, stop_timer
+
+CONFIGS = ('no-session', 'session', 'async')
+# Requisição típica dos helpers (login com form) para medir só a montagem
+PREPARE_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': 'a' * 64}
+PREPARE_BODY = {'email': 'bench.user.000001@example.com', 'password': 'Secret-123456'}
+
+
+def note_lifecycle_api(context, pools, database, api_client):
+    """Mesmo ciclo do note_lifecycle_api_async, com os helpers síncronos e uma conexão emprestada"""
+    with pools.lease(database) as conn:
+        create_user4Notes_api(context, conn, api_client)
+        login_user4Notes_api(context, conn, api_client)
+        create_note_api(context, conn, api_client)
+        delete_note_api(context, conn, api_client)
+        delete_user4Notes_api(context, conn, api_client)
+
+
+def prepare_seconds(config, base_url, iterations):
+    """Custo médio de montar headers e form de uma requisição, sem enviar"""
+    url = f"{base_url}/users/login"
+    start = time.perf_counter()
+    if config == 'async':
+        client = AsyncApiClient(base_url)
+        for _ in range(iterations):
+            client.client.build_request('POST', 'users/login', headers=PREPARE_HEADERS, data=PREPARE_BODY)
+        asyncio.run(client.aclose())
+    else:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        for _ in range(iterations):
+            session.prepare_request(requests.Request('POST', url, headers=PREPARE_HEADERS, data=PREPARE_BODY))
+        session.close()
+    return (time.perf_counter() - start) / iterations
+
+
+def run_sync(config, pools, database, server, lifecycles):
+    headers = dict(DEFAULT_HEADERS, Connection='close') if config == 'no-session' else None
+    client = ApiClient(server.base_url, headers=headers)
+    try:
+        for lifecycle in range(lifecycles):
+            note_lifecycle_api(FlowContext(f"{config}-{lifecycle}"), pools, database, client)
+    finally:
+        client.close()
+    return client.requests, client.connections_opened
+
+
+async def run_async(pools, database, server, lifecycles):
+    async with AsyncApiClient(server.base_url) as client:
+        for lifecycle in range(lifecycles):
+            await note_lifecycle_api_async(FlowContext(f"async-{lifecycle}"), pools, database, client)
+    return client.requests, client.connections_opened
+
+
+def bench_config(config, pools, database, server, args):
+    served, served_seconds = server.requests, server.handling_seconds
+    timer = start_timer()
+    start = time.perf_counter()
+    # Os helpers imprimem corpo e resposta de cada requisição, como nos testes
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if config == 'async':
+            sent, opened = asyncio.run(run_async(pools, database, server, args.lifecycles))
+        else:
+            sent, opened = run_sync(config, pools, database, server, args.lifecycles)
+    wall = time.perf_counter() - start
+    stop_timer()
+
+    phases = timer.breakdown(wall)['phases']
+    server_seconds = server.handling_seconds - served_seconds
+
+    def per_request(seconds):
+        return seconds / sent * 1000
+
+    return {
+        'config': config,
+        'lifecycles': args.lifecycles,
+        'requests': sent,
+        'served': server.requests - served,
+        'connections_opened': opened,
+        'seconds': wall,
+        'requests_per_second': sent / wall,
+        'ms_per_request': {
+            'http': per_request(phases['http']),
+            'server': per_request(server_seconds),
+            'client': per_request(phases['http'] - server_seconds),
+            'prepare': prepare_seconds(config, server.base_url, args.prepare_iterations) * 1000,
+            'json_decode': per_request(phases['json_decode']),
+        },
+        'ms_per_lifecycle': {
+            'db': (phases['db_query'] + phases['db_commit']) / args.lifecycles * 1000,
+            'other': phases['other'] / args.lifecycles * 1000,
+        },
+    }
+
+
+def seed_database(pools, database, rows):
+    create_seed_database(pools, database)
+    create_accounts_table(pools)
+    with pools.lease(database) as conn:
+        seed_is_current(conn, NOTES_SCHEMA[0][0], '')
+        recreate_tables(conn, NOTES_SCHEMA)
+        for table, columns, table_rows in notes_seed(rows):
+            bulk_insert(conn, table, columns, table_rows)
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', choices=CONFIGS, nargs='+', default=list(CONFIGS))
+    parser.add_argument('--lifecycles', type=int, default=50, help='lifecycles per configuration (default: 50)')
+    parser.add_argument('--prepare-iterations', type=int, default=2000)
+    parser.add_argument('--database', default='http_client_bench', help='scratch database, dropped at the end')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    pools = DatabasePools(
+        size=4, timeout=10,
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+    )
+    server = NotesApiServer().start()
+    results = []
+    print(f"{'config':>10} {'req/s':>8} {'opened':>7} {'http ms':>8} {'server':>7} {'client':>7} "
+          f"{'prepare':>8} {'json':>6} {'db ms/lc':>9} {'other':>7}")
+    try:
+        seed_database(pools, args.database, args.lifecycles * len(args.configs))
+        try:
+            for config in args.configs:
+                result = bench_config(config, pools, args.database, server, args)
+                results.append(result)
+                request, lifecycle = result['ms_per_request'], result['ms_per_lifecycle']
+                print(f"{config:>10} {result['requests_per_second']:>8.0f} {result['connections_opened']:>7} "
+                      f"{request['http']:>8.3f} {request['server']:>7.3f} {request['client']:>7.3f} "
+                      f"{request['prepare']:>8.3f} {request['json_decode']:>6.3f} "
+                      f"{lifecycle['db']:>9.3f} {lifecycle['other']:>7.3f}")
+        finally:
+            with pools.lease() as conn:
+                cursor = conn.cursor()
+                # As contas só existiam no stand-in, que para junto com o benchmark
+                cursor.execute(f"DELETE FROM {ACCOUNTS} WHERE api_url = %s", (server.base_url,))
+                cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+                conn.commit()
+                cursor.close()
+    finally:
+        server.stop()
+        pools.close()
+
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(results, json_file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
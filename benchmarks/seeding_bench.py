@@ -0,0 +1,143 @@
+"""Mede a camada de dados da suíte em vários tamanhos de seed.
+
+Para cada tamanho e schema (users, como no users_api_test, e users + notes, como no
+notes_api_test), num banco descartável: cria o banco e as tabelas, insere o seed como as
+fixtures insert_users/insert_users4Notes, roda as mesmas regras dos testes de validação
+de colunas (varredura completa, sem o watermark) e reserva usuários com claim_seed_row.
+Usa o MySQL do .env (DB_HOST, DB_USER, DB_PASSWORD); o banco é excluído no final.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.seeding_bench
+    python -m benchmarks.seeding_bench --sizes 250 100000 --method load-data --json ./reports/seeding.json
+"""
+import argparse
+import json
+import os
+import time
+from dotenv import load_dotenv
+
+from tests.api.notes_api_test import NOTES_SCHEMA
+from tests.api.support_data import NOTE_COLUMNS, USER_COLUMNS, note_rows, user_rows
+from tests.api.support_db import DatabasePools, bulk_insert, claim_seed_row, create_seed_database, recreate_tables, seed_is_current
+from tests.api.support_validation import (
+    alphanumeric, check_columns, digits_between, fixed_length, length_between, lowercase, matches, one_of,
+)
+from tests.api.users_api_test import USERS_SCHEMA
+
+# Uma entrada por teste de validação, como cada teste faz a sua própria consulta
+USER_RULES = [
+    [length_between('name', 4, 30)],
+    [length_between('company', 4, 30)],
+    [digits_between('phone', 8, 20)],
+    [length_between('password', 6, 30)],
+    [fixed_length('token', 64, optional=True)],
+    [lowercase('email'), matches('email', r'^[a-z0-9][a-z0-9._%+-]*@[a-z0-9.-]+\.[a-z]{2,}$')],
+    [alphanumeric('id', optional=True), fixed_length('id', 24, optional=True)],
+    [alphanumeric('token', optional=True), fixed_length('token', 64, optional=True)],
+]
+NOTE_RULES = [
+    [length_between('noteTitle', 4, 100)],
+    [length_between('noteDescription', 4, 1000)],
+    [one_of('noteCompleted', (0, 1), optional=True)],
+    [one_of('noteCategory', ('Home', 'Work', 'Personal'))],
+    [alphanumeric('noteId', optional=True), fixed_length('noteId', 24, optional=True)],
+]
+
+
+def users_seed(rows):
+    return [('users', USER_COLUMNS, user_rows(rows))]
+
+
+def notes_seed(rows):
+    # Mesmo formato do insert_users4Notes: `index` explícito liga a nota modelo ao usuário
+    users = ((index,) + row for index, row in enumerate(user_rows(rows), start=1))
+    notes = ((index,) + row for index, row in enumerate(note_rows(rows), start=1))
+    return [('users', ('index',) + USER_COLUMNS, users), ('notes', ('user_index',) + NOTE_COLUMNS, notes)]
+
+
+SCHEMAS = {
+    'users': (USERS_SCHEMA, users_seed, {'users': USER_RULES}),
+    'notes': (NOTES_SCHEMA, notes_seed, {'users': USER_RULES[-2:], 'notes': NOTE_RULES}),
+}
+
+
+def result(schema, rows, step, seconds, operations):
+    return {
+        'schema': schema, 'rows': rows, 'step': step, 'seconds': seconds,
+        'operations': operations, 'per_second': operations / seconds if seconds else None,
+    }
+
+
+def bench_schema(pools, database, name, rows, args):
+    schema, seed, rules = SCHEMAS[name]
+    results = []
+
+    start = time.perf_counter()
+    create_seed_database(pools, database)
+    with pools.lease(database) as conn:
+        seed_is_current(conn, schema[0][0], '')  # cria seed_fingerprints, como o prepare_seed_tables
+        recreate_tables(conn, schema)
+    results.append(result(name, rows, 'create', time.perf_counter() - start, len(schema)))
+
+    with pools.lease(database) as conn:
+        for table, columns, table_rows in seed(rows):
+            count, elapsed = bulk_insert(conn, table, columns, table_rows, batch_size=args.batch_size, method=args.method)
+            results.append(result(name, rows, f'seed {table}', elapsed, count))
+
+        for table, rule_sets in rules.items():
+            start = time.perf_counter()
+            for rule_set in rule_sets:
+                check_columns(conn, table, rule_set)
+            results.append(result(name, rows, f'validate {table}', time.perf_counter() - start, len(rule_sets)))
+
+        claims = min(args.claims, rows)
+        start = time.perf_counter()
+        for claim in range(claims):
+            claim_seed_row(conn, 'users', f"bench-{claim}")
+        results.append(result(name, rows, 'claim users', time.perf_counter() - start, claims))
+
+    with pools.lease() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        cursor.close()
+    return results
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 10_000, 100_000])
+    parser.add_argument('--schemas', choices=sorted(SCHEMAS), nargs='+', default=sorted(SCHEMAS))
+    parser.add_argument('--method', choices=['executemany', 'load-data'], default='executemany')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--claims', type=int, default=100, help='users claimed per size (default: 100)')
+    parser.add_argument('--database', default='seeding_bench', help='scratch database, dropped after each size')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    pools = DatabasePools(
+        size=2, timeout=10,
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        allow_local_infile=args.method == 'load-data',
+    )
+    results = []
+    print(f"{'schema':>7} {'rows':>9} {'step':>16} {'seconds':>9} {'ops':>9} {'ops/s':>12}")
+    try:
+        for rows in args.sizes:
+            for name in args.schemas:
+                for step in bench_schema(pools, args.database, name, rows, args):
+                    results.append({'method': args.method, **step})
+                    print(f"{step['schema']:>7} {rows:>9} {step['step']:>16} {step['seconds']:>9.3f} "
+                          f"{step['operations']:>9} {step['per_second']:>12,.0f}")
+    finally:
+        pools.close()
+
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(results, json_file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
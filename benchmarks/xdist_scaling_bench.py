@@ -0,0 +1,55 @@
+"""Mede o tempo total da suíte com 1, 2, 4 e 8 workers do pytest-xdist.
+
+Cada worker cria e semeia o seu próprio banco (users_gw0, notes_gw0...), então o
+tempo de seed por worker entra na medição, como num run real.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.xdist_scaling_bench
+    python -m benchmarks.xdist_scaling_bench --workers 1 4 --json ./reports/xdist.json -- --api-standin -k "not concurrent"
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_suite(workers, pytest_args):
+    command = [sys.executable, '-m', 'pytest', 'tests', '-q', '-n', str(workers), *pytest_args]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - start
+    # Última linha do -q: "54 passed in 12.34s"
+    lines = completed.stdout.strip().splitlines()
+    return {'workers': workers, 'seconds': elapsed, 'exit_code': completed.returncode, 'summary': lines[-1] if lines else ''}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('pytest_args', nargs='*', help='extra pytest arguments, after --')
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8} {'efficiency':>11}  result")
+    for workers in args.workers:
+        result = run_suite(workers, args.pytest_args)
+        baseline = results[0] if results else result
+        # Speedup em relação ao primeiro run; eficiência 100% = escala linear com os workers
+        speedup = baseline['seconds'] / result['seconds']
+        result.update(speedup=speedup, efficiency=speedup * baseline['workers'] / workers)
+        results.append(result)
+        print(f"{workers:>8} {result['seconds']:>10.2f} {speedup:>7.2f}x {result['efficiency']:>10.0%}  {result['summary']}")
+
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(results, json_file, indent=4)
+    return 0 if all(result['exit_code'] == 0 for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Exclui da API as contas órfãs deixadas por runs interrompidos.
+
+Lê o registro de contas do support_cleanup (banco DB_ACCOUNTS_NAME, padrão api_accounts)
+e exclui em paralelo as contas ainda registradas, com o último token gravado ou, se ele
+não valer mais, com um novo login. As contas excluídas saem do registro; as que falharem
+continuam lá para a próxima varredura. Registros de um servidor local (loopback) que
+não responde mais são só removidos: as contas viviam na memória dele. Rode com a suíte
+parada.
+
+Uso (a partir da raiz do repositório):
+    python -m tests.api.account_sweeper
+    python -m tests.api.account_sweeper --database notes_gw0 --dry-run
+"""
+import argparse
+import os
+from urllib.parse import urlsplit
+import requests
+from dotenv import load_dotenv
+from .support_cleanup import ACCOUNTS, create_accounts_table, delete_recorded_accounts, forget_source
+from .support_db import DatabasePools
+from .support_http import ApiClient
+
+
+def recorded_sources(pools, database=None):
+    """(api_url, source_database, contas) de cada origem presente no registro"""
+    query = f"SELECT api_url, source_database, COUNT(*) FROM {ACCOUNTS}"
+    params = ()
+    if database is not None:
+        query += " WHERE source_database = %s"
+        params = (database,)
+    query += " GROUP BY api_url, source_database ORDER BY api_url, source_database"
+    with pools.lease() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+def standin_gone(api_url):
+    """True para uma API em loopback que recusa conexões, como um --api-standin já encerrado"""
+    if urlsplit(api_url).hostname not in ('127.0.0.1', 'localhost', '::1'):
+        return False
+    try:
+        requests.get(f"{api_url.rstrip('/')}/health-check", timeout=5)
+    except requests.ConnectionError:
+        return True
+    return False
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='only accounts created from this seed database (e.g. notes_gw0)')
+    parser.add_argument('--http-pool-size', type=int, default=int(os.getenv('HTTP_POOL_SIZE', '10')),
+                        help='concurrent DELETE requests per API (default: 10)')
+    parser.add_argument('--dry-run', action='store_true', help='only list the recorded accounts')
+    args = parser.parse_args(argv)
+
+    pools = DatabasePools(
+        size=2, timeout=10,
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+    )
+    try:
+        create_accounts_table(pools)
+        sources = recorded_sources(pools, args.database)
+        if not sources:
+            print("Nenhuma conta registrada.")
+            return 0
+        failed_total = 0
+        for api_url, database, count in sources:
+            if args.dry_run:
+                print(f"{api_url} ({database}): {count} contas")
+                continue
+            if standin_gone(api_url):
+                with pools.lease() as conn:
+                    forget_source(conn, api_url, database)
+                print(f"{api_url} ({database}): servidor local fora do ar, {count} registros removidos")
+                continue
+            client = ApiClient(api_url, pool_size=args.http_pool_size)
+            try:
+                deleted, failed = delete_recorded_accounts(pools, client, database)
+            finally:
+                client.close()
+            failed_total += failed
+            print(f"{api_url} ({database}): {deleted} excluídas, {failed} falharam")
+        return 1 if failed_total else 0
+    finally:
+        pools.close()
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
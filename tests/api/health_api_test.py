@@ -1,7 +1,5 @@
-import requests
-
-def test_check_health_api():
-    resp = requests.get("https://practice.expandtesting.com/notes/api/health-check")
+def test_check_health_api(api_client):
+    resp = api_client.get("/health-check")
     print(resp)
     assert True == resp.json()['success']
     assert 200 == resp.json()['status']
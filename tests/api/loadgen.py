@@ -0,0 +1,348 @@
+"""Gerador de carga que repete os fluxos da suíte como cenários ponderados.
+
+Cada cenário é uma sequência de passos (register, login, create_note, get_notes,
+update_note, patch_status, delete_note, delete_account). Cada passo é um helper do
+support_api_async, o mesmo dos testes, com as mesmas validações na API e no banco. Cada
+usuário virtual roda com o seu próprio FlowContext. Os usuários vêm de um banco de seed
+descartável (--database) e as contas criadas entram no registro do support_cleanup. No
+fim, as que sobraram de cenários que falharam são excluídas e o banco é removido. Usa o
+MySQL do .env (DB_HOST, DB_USER, DB_PASSWORD) também com --standin.
+
+Modelos:
+    closed  --users usuários virtuais repetem cenários em sequência; com --rate cada um
+            espera o seu intervalo entre passos para somar aproximadamente a taxa alvo
+    open    cenários chegam como um processo de Poisson com --rate requisições/s no
+            total, sem esperar as respostas anteriores (--max-in-flight limita)
+
+O relatório traz, por passo, requisições, erros, vazão e percentis da duração do helper
+(HTTP + MySQL), e por endpoint os percentis só da requisição HTTP. Os percentis vêm do
+LatencyHistogram do support_latency (erro de até ~9%).
+
+Uso (a partir da raiz do repositório):
+    python -m tests.api.loadgen --standin --model closed --users 20 --duration 30
+    python -m tests.api.loadgen --standin --model open --rate 300 --mix lifecycle=6,reader=3,signup=1 --json ./reports/load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from dotenv import load_dotenv
+from .notes_api_test import NOTES_SCHEMA
+from .standin_api import NotesApiServer
+from .support_api_async import (
+    AsyncApiClient, create_note_api_async, create_user4Notes_api_async, delete_note_api_async,
+    delete_user4Notes_api_async, get_notes_api_async, login_user4Notes_api_async, update_note_api_async,
+    update_note_status_api_async,
+)
+from .support_cleanup import ACCOUNTS, SESSION_OWNER, create_accounts_table, delete_recorded_accounts
+from .support_context import FlowContext
+from .support_data import NOTE_COLUMNS, USER_COLUMNS, vectorized_notes, vectorized_users
+from .support_db import DatabasePools, bulk_insert, create_seed_database, recreate_tables, seed_is_current
+from .support_http import ApiClient
+from .support_latency import LatencyHistogram, LatencyRecorder
+
+PERCENTILES = (50, 90, 95, 99)
+# Partição de e-mails longe das dos workers do xdist, para não colidir com a suíte na mesma API
+LOAD_SEED_START = 10 ** 9
+
+SCENARIOS = {
+    'lifecycle': ('register', 'login', 'create_note', 'get_notes', 'update_note', 'patch_status', 'delete_note', 'delete_account'),
+    'reader': ('register', 'login', 'create_note', 'get_notes', 'get_notes', 'get_notes', 'delete_account'),
+    'signup': ('register', 'login', 'delete_account'),
+}
+DEFAULT_MIX = 'lifecycle=6,reader=3,signup=1'
+
+STEPS = {
+    'register': create_user4Notes_api_async,
+    'login': login_user4Notes_api_async,
+    'create_note': create_note_api_async,
+    'get_notes': get_notes_api_async,
+    'update_note': update_note_api_async,
+    'patch_status': update_note_status_api_async,
+    'delete_note': delete_note_api_async,
+    'delete_account': delete_user4Notes_api_async,
+}
+
+
+class StepStats:
+    """Duração (LatencyHistogram) e erros de um passo"""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = Counter()
+
+    def add(self, seconds, error=None):
+        self.histogram.record(seconds * 1000)
+        if error is not None:
+            self.errors[error] += 1
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.errors.update(other.errors)
+
+    def summary(self, elapsed):
+        requests = self.histogram.count
+        errors = sum(self.errors.values())
+        summary = {
+            'requests': requests,
+            'errors': errors,
+            'error_rate': errors / requests if requests else 0.0,
+            'throughput': requests / elapsed if elapsed else 0.0,
+            'max_ms': self.histogram.max_ms if requests else None,
+            'error_kinds': dict(self.errors),
+        }
+        for percentile in PERCENTILES:
+            summary[f'p{percentile}_ms'] = self.histogram.percentile(percentile)
+        return summary
+
+
+def parse_mix(text):
+    """'lifecycle=6,reader=3' → {'lifecycle': 6.0, 'reader': 3.0}"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name}', choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadRun:
+    """Executa os cenários do `mix` contra a API e acumula as estatísticas por passo"""
+
+    def __init__(self, client, pools, database, mix, seed=None):
+        self.client = client
+        self.pools = pools
+        self.database = database
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.random = random.Random(seed)
+        self.stats = {name: StepStats() for name in STEPS}
+        self.scenarios = Counter()
+        self.failed_scenarios = Counter()
+        self.dropped = 0
+        self._flow_ids = count(1)
+
+    @property
+    def mean_steps(self):
+        total = sum(self.weights)
+        return sum(len(SCENARIOS[name]) * weight for name, weight in zip(self.names, self.weights)) / total
+
+    def pick(self):
+        return self.random.choices(self.names, self.weights)[0]
+
+    async def _step(self, name, context):
+        start = time.perf_counter()
+        error = None
+        try:
+            await STEPS[name](context, self.pools, self.database, self.client)
+        except Exception as exc:  # assert do helper, timeout, conexão recusada... contam como erro do passo
+            error = type(exc).__name__
+        self.stats[name].add(time.perf_counter() - start, error)
+        return error is None
+
+    async def run_scenario(self, name, pace=None):
+        """Executa um cenário; se um passo falha os seguintes são pulados e a conta é excluída"""
+        context = FlowContext(f"load-{next(self._flow_ids)}")
+        self.scenarios[name] += 1
+        for step in SCENARIOS[name]:
+            if pace is not None:
+                await pace()
+            if not await self._step(step, context):
+                self.failed_scenarios[name] += 1
+                # Sem o login a exclusão falha; a conta fica no registro para a limpeza do fim
+                if context.user_index is not None and step not in ('register', 'delete_account'):
+                    await self._step('delete_account', context)
+                return False
+        return True
+
+    async def closed(self, users, duration, rate=None):
+        """Modelo fechado: `users` usuários virtuais, cada um começa um cenário quando o anterior termina"""
+        deadline = time.perf_counter() + duration
+        interval = users / rate if rate else None
+
+        async def virtual_user():
+            next_start = time.perf_counter()
+
+            async def pace():
+                nonlocal next_start
+                delay = next_start - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_start = max(next_start, time.perf_counter()) + interval
+
+            while time.perf_counter() < deadline:
+                await self.run_scenario(self.pick(), pace if interval else None)
+
+        await asyncio.gather(*(virtual_user() for _ in range(users)))
+
+    async def open(self, rate, duration, max_in_flight):
+        """Modelo aberto: cenários chegam a `rate` requisições/s, independente das respostas"""
+        arrivals_per_second = rate / self.mean_steps
+        in_flight = set()
+        start = time.perf_counter()
+        next_arrival = start
+        while next_arrival < start + duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= max_in_flight:
+                self.dropped += 1
+            else:
+                task = asyncio.create_task(self.run_scenario(self.pick()))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            next_arrival += self.random.expovariate(arrivals_per_second)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    def report(self, elapsed):
+        steps = {name: stats.summary(elapsed) for name, stats in self.stats.items() if stats.histogram.count}
+        total = StepStats()
+        for stats in self.stats.values():
+            total.merge(stats)
+        return {
+            'elapsed_seconds': elapsed,
+            'scenarios': dict(self.scenarios),
+            'failed_scenarios': dict(self.failed_scenarios),
+            'dropped_arrivals': self.dropped,
+            'steps': steps,
+            'total': total.summary(elapsed),
+        }
+
+
+def print_report(report):
+    if not report['total']['requests']:
+        print("No requests were sent.")
+        return
+    header = f"{'step':<15} {'requests':>9} {'errors':>7} {'err %':>6} {'req/s':>8}"
+    header += ''.join(f" {f'p{percentile} ms':>8}" for percentile in PERCENTILES) + f" {'max ms':>8}"
+    print(header)
+    rows = list(report['steps'].items()) + [('total', report['total'])]
+    for name, summary in rows:
+        line = (f"{name:<15} {summary['requests']:>9} {summary['errors']:>7} "
+                f"{summary['error_rate']:>6.1%} {summary['throughput']:>8.1f}")
+        line += ''.join(f" {summary[f'p{percentile}_ms']:>8.1f}" for percentile in PERCENTILES)
+        print(line + f" {summary['max_ms']:>8.1f}")
+    print("\nHTTP latency per endpoint (request only, without the MySQL work of the step)")
+    for line in LatencyRecorder.from_dict(report['http_latency']).summary_lines():
+        print(line)
+    scenarios = ', '.join(f"{name}={total}" for name, total in report['scenarios'].items())
+    print(f"\n{report['elapsed_seconds']:.1f}s, scenarios: {scenarios}, failed: {sum(report['failed_scenarios'].values())}, "
+          f"dropped arrivals: {report['dropped_arrivals']}, leftover accounts deleted: {report['leftover_accounts_deleted']}, "
+          f"failed to delete: {report['leftover_accounts_failed']}")
+
+
+def seed_database(pools, database, rows):
+    """Banco de seed descartável no formato do insert_users4Notes"""
+    create_seed_database(pools, database)
+    create_accounts_table(pools)
+    users = ((index,) + row for index, row in enumerate(vectorized_users(rows, start=LOAD_SEED_START), start=1))
+    notes = ((index,) + row for index, row in enumerate(vectorized_notes(rows), start=1))
+    with pools.lease(database) as conn:
+        seed_is_current(conn, NOTES_SCHEMA[0][0], '')  # cria seed_fingerprints, usada pelo recreate_tables
+        recreate_tables(conn, NOTES_SCHEMA)
+        bulk_insert(conn, 'users', ('index',) + USER_COLUMNS, users)
+        bulk_insert(conn, 'notes', ('user_index',) + NOTE_COLUMNS, notes)
+
+
+def cleanup(pools, database, base_url, standin):
+    """Exclui as contas que os cenários com falha deixaram e remove o banco de seed"""
+    client = ApiClient(base_url)
+    try:
+        deleted, failed = delete_recorded_accounts(pools, client, database, owner=SESSION_OWNER)
+    finally:
+        client.close()
+    with pools.lease() as conn:
+        cursor = conn.cursor()
+        if standin:
+            # As contas só existiam no stand-in, que para junto com o gerador
+            cursor.execute(f"DELETE FROM {ACCOUNTS} WHERE api_url = %s", (base_url,))
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        conn.commit()
+        cursor.close()
+    return deleted, failed
+
+
+async def generate(args, pools, base_url):
+    # Os helpers fazem o trabalho no MySQL em threads (asyncio.to_thread): uma por conexão do pool
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.db_pool_size))
+    latency = LatencyRecorder()
+    async with AsyncApiClient(base_url, pool_size=args.http_pool_size, latency=latency) as client:
+        load = LoadRun(client, pools, args.database, args.mix, seed=args.seed)
+        start = time.perf_counter()
+        if args.model == 'closed':
+            await load.closed(args.users, args.duration, args.rate)
+        else:
+            await load.open(args.rate, args.duration, args.max_in_flight)
+        report = load.report(time.perf_counter() - start)
+        report.update(model=args.model, base_url=base_url, mix=args.mix, target_rate=args.rate,
+                      users=args.users if args.model == 'closed' else None)
+        report['connections_opened'] = client.connections_opened
+    report['http_latency'] = latency.to_dict()
+    return report
+
+
+def run(args):
+    pools = DatabasePools(
+        size=args.db_pool_size, timeout=30,
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+    )
+    server = NotesApiServer().start() if args.standin else None
+    base_url = server.base_url if server else args.api_base_url
+    try:
+        seed_database(pools, args.database, args.seed_rows)
+        try:
+            report = asyncio.run(generate(args, pools, base_url))
+        finally:
+            deleted, failed = cleanup(pools, args.database, base_url, args.standin)
+        report.update(leftover_accounts_deleted=deleted, leftover_accounts_failed=failed)
+        return report
+    finally:
+        if server:
+            server.stop()
+        pools.close()
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', choices=('closed', 'open'), default='closed')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"weighted scenarios, from {', '.join(SCENARIOS)} (default: {DEFAULT_MIX})")
+    parser.add_argument('--rate', type=float, help='target requests per second (required for --model open)')
+    parser.add_argument('--users', type=int, default=10, help='virtual users in the closed model (default: 10)')
+    parser.add_argument('--duration', type=float, default=30, help='seconds generating load (default: 30)')
+    parser.add_argument('--max-in-flight', type=int, default=1000,
+                        help='scenarios running at once in the open model; arrivals above it are dropped')
+    parser.add_argument('--standin', action='store_true', help='start the in-memory Notes API stand-in and load it')
+    parser.add_argument('--api-base-url', default=os.getenv('API_BASE_URL', 'https://practice.expandtesting.com/notes/api'))
+    parser.add_argument('--http-pool-size', type=int, default=100, help='connections kept by the async client')
+    parser.add_argument('--db-pool-size', type=int, default=32, help='MySQL connections used by the helpers (max 32)')
+    parser.add_argument('--seed-rows', type=int, default=20000,
+                        help='seed users available; each scenario claims one (default: 20000)')
+    parser.add_argument('--database', default='loadgen', help='scratch seed database, dropped at the end')
+    parser.add_argument('--seed', type=int, help='seed for the scenario picks and the arrival times')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args(argv)
+    if args.model == 'open' and not args.rate:
+        parser.error('--model open requires --rate')
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(report, json_file, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,294 +1,225 @@
 import os
-import mysql.connector
 import pytest
 from faker import Faker
 from dotenv import load_dotenv
-import time
-import json
-import requests
-import re
-from .support_api import create_note_api, create_user4Notes_api, delete_json_file, delete_note_api, delete_user4Notes_api, login_user4Notes_api
+from .support_api_async import note_lifecycle_api_async, run_concurrently
+from .support_context import FlowContext
+from .support_api import api_datetime, api_timestamp, clear_user_notes_api, create_note_api
+from .support_cleanup import ORPHAN_MIN_AGE, SESSION_OWNER, sweep_accounts
+from .support_user_pool import UserPool, node_passed
+from .support_data import NOTE_COLUMNS, USER_COLUMNS, note_rows, user_rows
+from .support_validation import alphanumeric, assert_columns_valid, fixed_length, length_between, one_of, validation_cache
+from .support_db import create_seed_database, drop_seed_database, prepare_seed_tables, rolled_back, seed_tables, worker_database, worker_seed_start
 
 # Carregar variáveis de ambiente do arquivo .env
 load_dotenv()
 
+# Host, usuário e senha ficam no pool compartilhado (plugin_db); com xdist cada worker usa o seu banco (notes_gw0...)
 db_config4Notes = {
-    'host': os.getenv('DB_HOST', 'localhost'),
-    'user': os.getenv('DB_USER', 'root'),
-    'password': os.getenv('DB_PASSWORD', ''),
-    'database': os.getenv('DB_NAME_N', 'notes'),
+    'database': worker_database(os.getenv('DB_NAME_N', 'notes')),
 }
 
+# Usuários e notas em tabelas separadas: cada usuário de seed tem uma nota modelo (noteId NULL)
+# e as notas criadas via API entram como novas linhas ligadas ao usuário
+USERS_TABLE_DDL4Notes = """
+    CREATE TABLE IF NOT EXISTS users (
+        `index` INT AUTO_INCREMENT PRIMARY KEY,
+        id CHAR(24) NULL,
+        name VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL UNIQUE,
+        password VARCHAR(255) NOT NULL,
+        company VARCHAR(255) NOT NULL,
+        phone VARCHAR(20) NOT NULL,
+        token CHAR(64) NULL,
+        claimed_by VARCHAR(64) NULL,
+        claim_order DOUBLE NOT NULL DEFAULT (RAND()),
+        updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+        UNIQUE INDEX users_id (id),
+        INDEX users_token (token),
+        INDEX claim_queue (claimed_by, claim_order),
+        INDEX changed_rows (updated_at)
+    )
+"""
+NOTES_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS notes (
+        `index` INT AUTO_INCREMENT PRIMARY KEY,
+        user_index INT NOT NULL,
+        noteId CHAR(24) NULL,
+        noteTitle VARCHAR(255) NOT NULL,
+        noteDescription VARCHAR(1000) NOT NULL,
+        noteCompleted BOOLEAN NULL,
+        noteCreatedAt DATETIME(3) NULL,
+        noteUpdatedAt DATETIME(3) NULL,
+        noteCategory VARCHAR(8) NOT NULL,
+        updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+        UNIQUE INDEX notes_note_id (noteId),
+        INDEX notes_user_notes (user_index, noteId),
+        INDEX changed_rows (updated_at),
+        CONSTRAINT notes_user_fk FOREIGN KEY (user_index) REFERENCES users (`index`) ON DELETE CASCADE
+    )
+"""
+NOTES_SCHEMA = (('users', USERS_TABLE_DDL4Notes), ('notes', NOTES_TABLE_DDL))
+
 # Inicializa o Faker
 fake = Faker()
 
 @pytest.fixture(scope="session")
-def connection4Notes():
-    """Cria uma conexão com o MySQL"""
-    try:
-        conn = mysql.connector.connect(
-            host=db_config4Notes['host'],
-            user=db_config4Notes['user'],
-            password=db_config4Notes['password']
-        )
-        yield conn
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@pytest.fixture(scope="session")
-def create_database4Notes(connection4Notes):
+def create_database4Notes(db_pool):
     """Cria o banco de dados se ele não existir"""
-    cursor = connection4Notes.cursor()
-    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_config4Notes['database']}")
-    cursor.close()
+    create_seed_database(db_pool, db_config4Notes['database'])
 
-@pytest.fixture(scope="session")
-def setup_database4Notes(connection4Notes, create_database4Notes):
-    """Conecta no banco de dados criado"""
-    conn = mysql.connector.connect(
-        host=db_config4Notes['host'],
-        user=db_config4Notes['user'],
-        password=db_config4Notes['password'],
-        database=db_config4Notes['database']
-    )
-    yield conn
-    if conn.is_connected():
-        conn.close()
+@pytest.fixture
+def setup_database4Notes(db_pool, create_database4Notes):
+    """Empresta ao teste uma conexão do pool compartilhado"""
+    with db_pool.lease(db_config4Notes['database']) as conn:
+        yield conn
 
 @pytest.fixture(scope="session")
-def create_table4Notes(setup_database4Notes):
-    """Cria a tabela de notas e usuários"""
-    cursor = setup_database4Notes.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS notes (
-            `index` INT AUTO_INCREMENT PRIMARY KEY,
-            id VARCHAR(255) NULL,
-            name VARCHAR(255) NOT NULL,
-            email VARCHAR(255) NOT NULL UNIQUE,
-            password VARCHAR(255) NOT NULL,
-            company VARCHAR(255) NOT NULL,
-            phone VARCHAR(255) NOT NULL,
-            token VARCHAR(255) NULL,
-            noteId VARCHAR(255) NULL,
-            noteTitle VARCHAR(255) NOT NULL,
-            noteDescription VARCHAR(255) NOT NULL,
-            noteCompleted VARCHAR(255) NULL,
-            noteCreatedAt VARCHAR(255) NULL,
-            noteUpdatedAt VARCHAR(255) NULL,
-            noteCategory VARCHAR(255) NOT NULL
-        )
-    """)
-    cursor.close()
+def create_table4Notes(request, db_pool, create_database4Notes):
+    """Cria as tabelas de usuários e notas, ou reaproveita as do run anterior se o fingerprint não mudou"""
+    return prepare_seed_tables(
+        db_pool, request.config, db_config4Notes['database'], NOTES_SCHEMA, ('id', 'token'),
+        cleanup=("DELETE FROM notes WHERE noteId IS NOT NULL",)  # notas criadas via API
+    )
 
 @pytest.fixture(scope="session")
-def insert_users4Notes(setup_database4Notes, create_table4Notes):
-    """Insere 250 notas na tabela"""
-    cursor = setup_database4Notes.cursor()
-    
-    for _ in range(250):
-        name = fake.name()
-        email = fake.lexify(text='??').lower() + fake.company_email().replace("-", "")
-        password = fake.password(length=12, special_chars=False, digits=True, upper_case=True, lower_case=True)
-        company = fake.company()[:24]
-        phone = fake.bothify(text='############')
-        token = None  # Inicialmente vazio
-        noteTitle = fake.sentence(4)
-        noteDescription = fake.sentence(5)
-        noteCategory = fake.random_element(elements=('Home', 'Personal', 'Work'))
-
-        cursor.execute("""
-            INSERT INTO notes (name, email, password, company, phone, noteTitle, noteDescription, noteCategory)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (name, email, password, company, phone, noteTitle, noteDescription, noteCategory))
-    
-    setup_database4Notes.commit()
-    cursor.close()
+def insert_users4Notes(request, db_pool, create_table4Notes):
+    """Insere os usuários de seed e uma nota modelo para cada um, em lotes"""
+    if not create_table4Notes:
+        return
+
+    seed_rows = request.config.getoption("--seed-rows")
+    generator = request.config.getoption("--seed-generator")
+    # O `index` explícito liga cada nota modelo ao seu usuário
+    seed_start = worker_seed_start(seed_rows)
+    users = ((index,) + row for index, row in enumerate(user_rows(seed_rows, generator, start=seed_start), start=1))
+    notes = ((index,) + row for index, row in enumerate(note_rows(seed_rows, generator), start=1))
+    seed_tables(db_pool, request.config, db_config4Notes['database'], NOTES_SCHEMA, [
+        ('users', ('index',) + USER_COLUMNS, users),
+        ('notes', ('user_index',) + NOTE_COLUMNS, notes),
+    ])
 
 @pytest.fixture(scope="session", autouse=True)
-def teardown_database4Notes(setup_database4Notes):
+def teardown_database4Notes(request, db_pool, create_database4Notes):
     """Exclui o banco de dados após todos os testes serem executados"""
     yield  # Executa os testes antes de remover o banco
-    
-    cursor = setup_database4Notes.cursor()
-    cursor.execute(f"DROP DATABASE IF EXISTS {db_config4Notes['database']}")
-    setup_database4Notes.commit()
-    cursor.close()
-    setup_database4Notes.close()
-    print("\n🔥 Banco de dados excluído após os testes!")
+    drop_seed_database(db_pool, request.config, db_config4Notes['database'])
 
-def test_notes_table_has_250_rows(setup_database4Notes, create_table4Notes, insert_users4Notes):
+@pytest.fixture(scope="session")
+def account_cleanup4Notes(request, db_pool, create_database4Notes, api_client):
+    """Varre as contas antigas que runs interrompidos deixaram na API e, no fim da sessão, exclui em paralelo as desta sessão"""
+    sweep_accounts(request.config, db_pool, db_config4Notes['database'], api_client, "órfãs", min_age=ORPHAN_MIN_AGE)
+    yield
+    sweep_accounts(request.config, db_pool, db_config4Notes['database'], api_client, "criadas na sessão", owner=SESSION_OWNER)
+
+@pytest.fixture(scope="session")
+def user_pool4Notes(request, db_pool, create_table4Notes, insert_users4Notes, api_client, account_cleanup4Notes):
+    """Usuários registrados e logados em paralelo no início da sessão; as notas criadas são excluídas na devolução"""
+    pool = UserPool(
+        db_pool, db_config4Notes['database'], api_client, request.config.getoption("--user-pool-size"),
+        reset=clear_user_notes_api
+    )
+    return pool.fill(request.config)
+
+@pytest.fixture
+def pooled_user4Notes(request, user_pool4Notes, flow_context):
+    """Empresta ao teste um usuário já logado e sem notas; ele volta ao pool se o teste passar"""
+    user_pool4Notes.lease(flow_context)
+    yield flow_context
+    user_pool4Notes.release(flow_context.user_index, clean=node_passed(request.node))
+
+@pytest.fixture(autouse=True)
+def db_only_transaction4Notes(request):
+    """Desfaz tudo o que um teste db_only fez no banco, no modo --db-isolation=transaction"""
+    if request.config.getoption("--db-isolation") != 'transaction' or request.node.get_closest_marker('db_only') is None:
+        yield
+        return
+    with rolled_back(request.getfixturevalue('setup_database4Notes')):
+        yield
+
+@pytest.mark.db_only
+def test_notes_table_has_seed_rows(request, setup_database4Notes, create_table4Notes, insert_users4Notes):
+    seed_rows = request.config.getoption("--seed-rows")
     cursor = setup_database4Notes.cursor()
-    cursor.execute("SELECT COUNT(*) FROM notes")
+    cursor.execute("SELECT COUNT(*) FROM users")
+    users_count = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM notes WHERE noteId IS NULL")
     count = cursor.fetchone()[0]
     cursor.close()
-    assert count == 250, f"Expected 250 records, but found {count}"
+    assert users_count == seed_rows, f"Expected {seed_rows} users, but found {users_count}"
+    assert count == seed_rows, f"Expected {seed_rows} records, but found {count}"
 
+@pytest.mark.db_only
 def test_notes_table_structure(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    expected_columns = {
+    expected_user_columns = {
         'index', 'id', 'name', 'email', 'password', 'company', 'phone', 'token',
-        'noteId', 'noteTitle', 'noteDescription', 'noteCompleted',
-        'noteCreatedAt', 'noteUpdatedAt', 'noteCategory'
+        'claimed_by', 'claim_order', 'updated_at'
+    }
+    expected_columns = {
+        'index', 'user_index', 'noteId', 'noteTitle', 'noteDescription', 'noteCompleted',
+        'noteCreatedAt', 'noteUpdatedAt', 'noteCategory', 'updated_at'
     }
     cursor = setup_database4Notes.cursor()
+    cursor.execute("DESCRIBE users")
+    user_columns = {row[0] for row in cursor.fetchall()}
     cursor.execute("DESCRIBE notes")
     columns = {row[0] for row in cursor.fetchall()}
     cursor.close()
+    assert expected_user_columns == user_columns, f"Expected columns: {expected_user_columns}, but found: {user_columns}"
     assert expected_columns == columns, f"Expected columns: {expected_columns}, but found: {columns}"
 
-def test_note_title_length(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    cursor = setup_database4Notes.cursor()
-    cursor.execute("SELECT noteTitle FROM notes")
-    titles = cursor.fetchall()
-    cursor.close()
-    for (title,) in titles:
-        assert 4 <= len(title) <= 100, f"Invalid title: '{title}' with {len(title)} characters"
-
-def test_note_description_length(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    cursor = setup_database4Notes.cursor()
-    cursor.execute("SELECT noteDescription FROM notes")
-    descriptions = cursor.fetchall()
-    cursor.close()
-    for (desc,) in descriptions:
-        assert 4 <= len(desc) <= 1000, f"Invalid description with {len(desc)} characters: {desc}"
-
-def test_note_completed_is_boolean_or_null(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    cursor = setup_database4Notes.cursor()
-    cursor.execute("SELECT noteCompleted FROM notes")
-    completed_values = cursor.fetchall()
-    cursor.close()
-    for (completed,) in completed_values:
-        if completed is not None:
-            assert completed.lower() in ['true', 'false'], f"Invalid status: {completed}"
-
-def test_note_category_validity(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    valid_categories = {'Home', 'Work', 'Personal'}
-    cursor = setup_database4Notes.cursor()
-    cursor.execute("SELECT noteCategory FROM notes")
-    categories = cursor.fetchall()
-    cursor.close()
-    for (category,) in categories:
-        assert category in valid_categories, f"Invalid category: {category}"
-
-def test_note_id_format_if_exists(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    cursor = setup_database4Notes.cursor()
-    cursor.execute("SELECT noteId FROM notes")
-    note_ids = cursor.fetchall()
-    cursor.close()
-    for (note_id,) in note_ids:
-        if note_id:
-            assert note_id.isalnum(), f"noteId contains invalid characters: {note_id}"
-            assert len(note_id) == 24, f"noteId must be 24 characters long: {note_id}"
-
-def test_user_id_format_if_exists(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    cursor = setup_database4Notes.cursor()
-    cursor.execute("SELECT id FROM notes")
-    user_ids = cursor.fetchall()
-    cursor.close()
-    for (user_id,) in user_ids:
-        if user_id:
-            assert user_id.isalnum(), f"id contains invalid characters: {user_id}"
-            assert len(user_id) == 24, f"id must be 24 characters long: {user_id}"
-
-def test_token_format_if_exists(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    cursor = setup_database4Notes.cursor()
-    cursor.execute("SELECT token FROM notes")
-    tokens = cursor.fetchall()
-    cursor.close()
-    for (token,) in tokens:
-        if token:
-            assert token.isalnum(), f"Token contains non-alphanumeric characters: {token}"
-            assert len(token) == 64, f"Token must be 64 characters long: {token}"
-
-def test_create_note_api(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+@pytest.mark.db_only
+def test_note_title_length(request, setup_database4Notes, create_table4Notes, insert_users4Notes):
+    assert_columns_valid(setup_database4Notes, 'notes', [length_between('noteTitle', 4, 100)], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_note_description_length(request, setup_database4Notes, create_table4Notes, insert_users4Notes):
+    assert_columns_valid(setup_database4Notes, 'notes', [length_between('noteDescription', 4, 1000)], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_note_completed_is_boolean_or_null(request, setup_database4Notes, create_table4Notes, insert_users4Notes):
+    assert_columns_valid(setup_database4Notes, 'notes', [one_of('noteCompleted', (0, 1), optional=True)], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_note_category_validity(request, setup_database4Notes, create_table4Notes, insert_users4Notes):
+    assert_columns_valid(setup_database4Notes, 'notes', [one_of('noteCategory', ('Home', 'Work', 'Personal'))], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_note_id_format_if_exists(request, setup_database4Notes, create_table4Notes, insert_users4Notes):
+    assert_columns_valid(setup_database4Notes, 'notes', [
+        alphanumeric('noteId', optional=True),
+        fixed_length('noteId', 24, optional=True),
+    ], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_user_id_format_if_exists(request, setup_database4Notes, create_table4Notes, insert_users4Notes):
+    assert_columns_valid(setup_database4Notes, 'users', [
+        alphanumeric('id', optional=True),
+        fixed_length('id', 24, optional=True),
+    ], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_token_format_if_exists(request, setup_database4Notes, create_table4Notes, insert_users4Notes):
+    assert_columns_valid(setup_database4Notes, 'users', [
+        alphanumeric('token', optional=True),
+        fixed_length('token', 64, optional=True),
+    ], cache=validation_cache(request.config))
+
+@pytest.mark.db_budget(queries=3, commits=1, cursors=1)
+def test_create_note_api(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    # Cria na API a nota modelo do usuário e valida a linha gravada no banco; a devolução do usuário ao pool exclui a nota
+    create_note_api(flow_context, setup_database4Notes, api_client)
+
+def test_create_note_api_bad_request(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário e da nota pelo index
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT id, token, noteTitle, noteDescription, noteCategory FROM notes WHERE `index` = %s", (user_index,))
-    user_note = cursor.fetchone()
-
-    # Atribui os valores do banco de dados às variáveis
-    user_id = user_note["id"]
-    user_token = user_note["token"]
-    note_title = user_note["noteTitle"]
-    note_description = user_note["noteDescription"]
-    note_category = user_note["noteCategory"]
-
-    body = {'category': note_category, 'description': note_description, 'title': note_title}
-    print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/notes", headers=headers, data=body)
-    respJS = resp.json()
-    print(respJS)
-
-    note_id = respJS['data']['id']
-    note_created_at = respJS['data']['created_at']
-    note_completed = respJS['data']['completed']
-    note_updated_at = respJS['data']['updated_at']
-
-    # Assertions de validação no banco de dados e API
-    assert True == respJS['success']
-    assert 200 == respJS['status']
-    assert "Note successfully created" == respJS['message']
-    assert note_category == respJS['data']['category']
-    assert note_description == respJS['data']['description']
-    assert note_title == respJS['data']['title']
-    assert user_id == respJS['data']['user_id']
-
-    # Atualiza os dados da nota na linha do usuário correspondente ao user_index
-    cursor = setup_database4Notes.cursor()
     cursor.execute("""
-        UPDATE notes 
-        SET noteId = %s, noteCompleted = %s, 
-            noteCreatedAt = %s, noteUpdatedAt = %s
-        WHERE `index` = %s
-    """, (note_id, note_completed, note_created_at, note_updated_at, user_index))
-    setup_database4Notes.commit()
-
-    # Consulta novamente para validar os dados salvos
-    cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteId, noteCompleted, noteCreatedAt, noteUpdatedAt FROM notes WHERE `index` = %s", (user_index,))
-    db_note = cursor.fetchone()
-    cursor.close()
-
-    # Assertions com os dados do banco de dados
-    assert db_note['noteId'] == note_id
-    assert bool(int(db_note['noteCompleted'])) == note_completed
-    assert db_note['noteCreatedAt'] == note_created_at
-    assert db_note['noteUpdatedAt'] == note_updated_at
-
-    # Armazena apenas o índice do usuário escolhido no arquivo JSON
-    user_index_data = {"user_index": user_index}
-    
-    with open(f"./tests/fixtures/file-{randomData}.json", 'w') as json_file:
-        json.dump(user_index_data, json_file, indent=4)
-
-    # This functions is here only for practice purpose since we already have delete_user_api to delete the user right away.
-    delete_note_api(randomData, setup_database4Notes)
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_create_note_api_bad_request(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
-
-    # Conecta ao banco de dados para buscar os dados do usuário e da nota pelo index
-    cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT id, token, noteTitle, noteDescription, noteCategory FROM notes WHERE `index` = %s", (user_index,))
+        SELECT u.id, u.token, n.noteTitle, n.noteDescription, n.noteCategory
+        FROM users u JOIN notes n ON n.user_index = u.`index` AND n.noteId IS NULL
+        WHERE u.`index` = %s
+    """, (user_index,))
     user_note = cursor.fetchone()
 
     # Atribui os valores do banco de dados às variáveis
@@ -299,29 +230,24 @@ def test_create_note_api_bad_request(setup_database4Notes, create_table4Notes, i
     note_category = user_note["noteCategory"]
     body = {'category': 'a', 'description': note_description, 'title': note_title}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/notes", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    resp = api_client.post("/notes", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 400 == respJS['status']
     assert "Category must be one of the categories: Home, Work, Personal" == respJS['message']
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_create_note_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+
+def test_create_note_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário e da nota pelo index
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT id, token, noteTitle, noteDescription, noteCategory FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT u.id, u.token, n.noteTitle, n.noteDescription, n.noteCategory
+        FROM users u JOIN notes n ON n.user_index = u.`index` AND n.noteId IS NULL
+        WHERE u.`index` = %s
+    """, (user_index,))
     user_note = cursor.fetchone()
 
     # Atribui os valores do banco de dados às variáveis
@@ -332,29 +258,22 @@ def test_create_note_api_unauthorized(setup_database4Notes, create_table4Notes,
     note_category = user_note["noteCategory"]
     body = {'category': note_category, 'description': note_description, 'title': note_title}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': '@'+user_token}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/notes", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': '@'+user_token}
+    resp = api_client.post("/notes", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message']
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_get_notes_api(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+
+@pytest.mark.slo(endpoint="/notes", method="GET", p95_ms=1500)
+@pytest.mark.db_budget(queries=6, commits=1, cursors=1)
+def test_get_notes_api(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("SELECT id, token FROM users WHERE `index` = %s", (user_index,))
     user = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
@@ -371,8 +290,8 @@ def test_get_notes_api(setup_database4Notes, create_table4Notes, insert_users4No
     for x in range(4):
         body = {'category': note_category_array[x], 'description': note_description_array[x], 'title': note_title_array[x]}
         print(body)
-        headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
-        resp = requests.post("https://practice.expandtesting.com/notes/api/notes", headers=headers, data=body)
+        headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+        resp = api_client.post("/notes", headers=headers, data=body)
         respJS = resp.json()
         print(respJS)
         assert True == respJS['success']
@@ -384,16 +303,16 @@ def test_get_notes_api(setup_database4Notes, create_table4Notes, insert_users4No
         note_id_array[x] = respJS['data']['id']
         note_created_at_array[x] = respJS['data']['created_at']
         note_updated_at_array[x] = respJS['data']['updated_at']
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
     body = {'completed': "true"}
     print(body)
-    resp = requests.patch(f"https://practice.expandtesting.com/notes/api/notes/{note_id_array[3]}", headers=headers, data=body)
+    resp = api_client.patch(f"/notes/{note_id_array[3]}", headers=headers, data=body)
     respJS = resp.json()
     note_updated_at_array[3] = respJS['data']['updated_at']  
     
 
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.get(f"https://practice.expandtesting.com/notes/api/notes", headers=headers)
+    headers = {'x-auth-token': user_token}
+    resp = api_client.get(f"/notes", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert True == respJS['success']
@@ -409,73 +328,21 @@ def test_get_notes_api(setup_database4Notes, create_table4Notes, insert_users4No
         assert note_updated_at_array[x] == respJS['data'][3-x]['updated_at']
         assert user_id == respJS['data'][3-x]['user_id']
 
-    # Insere as outras 3 notas no banco como novas linhas com os mesmos dados de usuário
-    cursor = setup_database4Notes.cursor(dictionary=True)
-
-    # Primeiro, pega todos os dados do usuário original (linha base)
-    cursor.execute("SELECT * FROM notes WHERE `index` = %s", (user_index,))
-    user_row = cursor.fetchone()
-
-    # Atualiza a linha original com os dados da primeira nota
-    update_query = """
-        UPDATE notes SET
-            noteId = %s,
-            noteTitle = %s,
-            noteDescription = %s,
-            noteCompleted = %s,
-            noteCreatedAt = %s,
-            noteUpdatedAt = %s,
-            noteCategory = %s
-        WHERE `index` = %s
-    """
-    cursor.execute(update_query, (
-        note_id_array[0],
-        note_title_array[0],
-        note_description_array[0],
-        str(note_completed_array[0]),
-        note_created_at_array[0],
-        note_updated_at_array[0],
-        note_category_array[0],
-        user_index
-    ))
-
-    # Move os usuários que vêm depois para frente (incrementa os índices)
-    cursor.execute("UPDATE notes SET `index` = `index` + 3 WHERE `index` > %s ORDER BY `index` DESC", (user_index,))
-
-    # Insere as outras 3 notas como novas linhas (copiando os dados de usuário)
-    insert_query = """
-        INSERT INTO notes (
-            `index`, id, name, email, password, company, phone, token,
-            noteId, noteTitle, noteDescription, noteCompleted,
-            noteCreatedAt, noteUpdatedAt, noteCategory
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
-
-    for i in range(1, 4):  # notas 1, 2 e 3 (as outras 3 além da original)
-        new_index = user_index + i        
- 
-        new_email = str(i) + "same@as.above.com"  # Para as outras linhas, o email fica vazio (NULL)
-        print(new_email)
-        cursor.execute(insert_query, (
-            new_index,
-            user_row['id'],
-            user_row['name'],
-            new_email,  # email será preenchido apenas para a primeira linha
-            user_row['password'],
-            user_row['company'],
-            user_row['phone'],
-            user_row['token'],
-            note_id_array[i],
-            note_title_array[i],
-            note_description_array[i],
-            str(note_completed_array[i]),
-            note_created_at_array[i],
-            note_updated_at_array[i],
-            note_category_array[i]
-        ))
-
+    # Grava as 4 notas como novas linhas do usuário em um único INSERT (append, sem reindexar a tabela)
+    cursor.executemany("""
+        INSERT INTO notes (user_index, noteId, noteTitle, noteDescription, noteCompleted, noteCreatedAt, noteUpdatedAt, noteCategory)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, [(
+        user_index,
+        note_id_array[i],
+        note_title_array[i],
+        note_description_array[i],
+        note_completed_array[i],
+        api_datetime(note_created_at_array[i]),
+        api_datetime(note_updated_at_array[i]),
+        note_category_array[i]
+    ) for i in range(4)])
     setup_database4Notes.commit()
-    # cursor.close()
 
         # Faz assert de cada uma das 4 notas: API vs banco de dados
     for i in range(4):
@@ -502,27 +369,19 @@ def test_get_notes_api(setup_database4Notes, create_table4Notes, insert_users4No
         assert db_note['noteId'] == note_id
         assert db_note['noteTitle'] == note_title_array[i]
         assert db_note['noteDescription'] == note_description_array[i]
-        assert db_note['noteCompleted'] in [str(note_completed_array[i]), note_completed_array[i], "1" if note_completed_array[i] else "0", None]  # dependendo como armazena
-        assert db_note['noteCreatedAt'] == note_created_at_array[i]
-        assert db_note['noteUpdatedAt'] == note_updated_at_array[i]
+        assert bool(db_note['noteCompleted']) == note_completed_array[i]
+        assert api_timestamp(db_note['noteCreatedAt']) == note_created_at_array[i]
+        assert api_timestamp(db_note['noteUpdatedAt']) == note_updated_at_array[i]
         assert db_note['noteCategory'] == note_category_array[i]
+    cursor.close()
 
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_get_notes_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_get_notes_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("SELECT id, token FROM users WHERE `index` = %s", (user_index,))
     user = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
@@ -539,8 +398,8 @@ def test_get_notes_api_unauthorized(setup_database4Notes, create_table4Notes, in
     for x in range(4):
         body = {'category': note_category_array[x], 'description': note_description_array[x], 'title': note_title_array[x]}
         print(body)
-        headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
-        resp = requests.post("https://practice.expandtesting.com/notes/api/notes", headers=headers, data=body)
+        headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+        resp = api_client.post("/notes", headers=headers, data=body)
         respJS = resp.json()
         print(respJS)
         assert True == respJS['success']
@@ -552,57 +411,52 @@ def test_get_notes_api_unauthorized(setup_database4Notes, create_table4Notes, in
         note_id_array[x] = respJS['data']['id']
         note_created_at_array[x] = respJS['data']['created_at']
         note_updated_at_array[x] = respJS['data']['updated_at']
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
     body = {'completed': "true"}
     print(body)
 
-    resp = requests.patch(f"https://practice.expandtesting.com/notes/api/notes/{note_id_array[3]}", headers=headers, data=body)
+    resp = api_client.patch(f"/notes/{note_id_array[3]}", headers=headers, data=body)
     respJS = resp.json()
     note_updated_at_array[3] = respJS['data']['updated_at']  
       
-    headers = {'accept': 'application/json', 'x-auth-token': '@'+user_token}
-    resp = requests.get(f"https://practice.expandtesting.com/notes/api/notes", headers=headers)
+    headers = {'x-auth-token': '@'+user_token}
+    resp = api_client.get(f"/notes", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message']      
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_get_note_api(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+
+@pytest.mark.db_budget(queries=4, commits=1, cursors=2)
+def test_get_note_api(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteCategory, noteCreatedAt, noteCompleted, noteDescription, noteId, noteTitle, noteUpdatedAt, id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteCategory, n.noteCreatedAt, n.noteCompleted, n.noteDescription, n.noteId, n.noteTitle, n.noteUpdatedAt, u.id, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
     note_category = note_row['noteCategory']
-    note_created_at = note_row['noteCreatedAt']
-    note_completed = bool(int(note_row['noteCompleted']))  # Converte '0' ou '1' para False ou True
+    note_created_at = api_timestamp(note_row['noteCreatedAt'])
+    note_completed = bool(note_row['noteCompleted'])  # Converte 0 ou 1 para False ou True
     note_description = note_row['noteDescription']
     note_id = note_row['noteId']
     note_title = note_row['noteTitle']
-    note_updated_at = note_row['noteUpdatedAt']
+    note_updated_at = api_timestamp(note_row['noteUpdatedAt'])
     user_id = note_row['id']
     user_token = note_row['token']
 
     cursor.close()
 
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.get(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers)
+    headers = {'x-auth-token': user_token}
+    resp = api_client.get(f"/notes/{note_id}", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert True == respJS['success']
@@ -617,25 +471,19 @@ def test_get_note_api(setup_database4Notes, create_table4Notes, insert_users4Not
     assert note_updated_at == respJS['data']['updated_at']
     assert user_id == respJS['data']['user_id']
 
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_get_note_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+def test_get_note_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteCategory, noteCreatedAt, noteCompleted, noteDescription, noteId, noteTitle, noteUpdatedAt, id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteCategory, n.noteCreatedAt, n.noteCompleted, n.noteDescription, n.noteId, n.noteTitle, n.noteUpdatedAt, u.id, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
@@ -651,36 +499,32 @@ def test_get_note_api_unauthorized(setup_database4Notes, create_table4Notes, ins
 
     cursor.close()
 
-    headers = {'accept': 'application/json', 'x-auth-token': '@'+user_token}
-    resp = requests.get(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers)
+    headers = {'x-auth-token': '@'+user_token}
+    resp = api_client.get(f"/notes/{note_id}", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message'] 
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_update_note_api(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+
+@pytest.mark.slo(endpoint="/notes", method="PUT", p95_ms=1500)
+@pytest.mark.db_budget(queries=6, commits=2, cursors=2)
+def test_update_note_api(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteCategory, noteCreatedAt, noteCompleted, noteDescription, noteId, noteTitle, id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteCategory, n.noteCreatedAt, n.noteCompleted, n.noteDescription, n.noteId, n.noteTitle, u.id, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
-    note_created_at = note_row['noteCreatedAt']
+    note_created_at = api_timestamp(note_row['noteCreatedAt'])
     note_completed = True  # Aqui, conforme a lógica do teste, sempre será True
     note_id = note_row['noteId']
     user_id = note_row['id']
@@ -689,12 +533,10 @@ def test_update_note_api(setup_database4Notes, create_table4Notes, insert_users4
     note_description = Faker().sentence(5) 
     note_title = Faker().sentence(4) 
 
-    cursor.close()
-
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
     body = {'category': note_category, 'completed': "true", 'description': note_description, 'title': note_title}
     print(body)
-    resp = requests.put(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers, data=body)
+    resp = api_client.put(f"/notes/{note_id}", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert True == respJS['success']
@@ -710,19 +552,16 @@ def test_update_note_api(setup_database4Notes, create_table4Notes, insert_users4
 
     note_updated_at = respJS['data']['updated_at']
 
-    # Atualiza os dados da nota na linha do usuário correspondente ao user_index no banco
-    cursor = setup_database4Notes.cursor()
+    # Atualiza os dados da nota no banco pelo noteId (índice único)
     cursor.execute("""
         UPDATE notes 
         SET noteCategory = %s, noteDescription = %s, noteTitle = %s, 
             noteCompleted = %s, noteUpdatedAt = %s
-        WHERE `index` = %s
-    """, (note_category, note_description, note_title, note_completed, note_updated_at, user_index))
+        WHERE noteId = %s
+    """, (note_category, note_description, note_title, note_completed, api_datetime(note_updated_at), note_id))
     setup_database4Notes.commit()
-    cursor.close()
 
     # Consulta os dados atualizados do banco para validação (somente os campos desejados)
-    cursor = setup_database4Notes.cursor(dictionary=True)
     cursor.execute("""
         SELECT noteCategory, noteDescription, noteTitle, noteCompleted, noteUpdatedAt
         FROM notes 
@@ -735,32 +574,26 @@ def test_update_note_api(setup_database4Notes, create_table4Notes, insert_users4
     assert db_note['noteCategory'] == respJS['data']['category']
     assert db_note['noteDescription'] == respJS['data']['description']
     assert db_note['noteTitle'] == respJS['data']['title']
-    assert bool(int(db_note['noteCompleted'])) == respJS['data']['completed']
-    assert db_note['noteUpdatedAt'] == respJS['data']['updated_at']
+    assert bool(db_note['noteCompleted']) == respJS['data']['completed']
+    assert api_timestamp(db_note['noteUpdatedAt']) == respJS['data']['updated_at']
 
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_update_note_api_bad_request(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+def test_update_note_api_bad_request(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteCategory, noteCreatedAt, noteCompleted, noteDescription, noteId, noteTitle, id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteCategory, n.noteCreatedAt, n.noteCompleted, n.noteDescription, n.noteId, n.noteTitle, u.id, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
-    note_created_at = note_row['noteCreatedAt']
+    note_created_at = api_timestamp(note_row['noteCreatedAt'])
     note_completed = True  # Aqui, conforme a lógica do teste, sempre será True
     note_id = note_row['noteId']
     user_id = note_row['id']
@@ -771,38 +604,32 @@ def test_update_note_api_bad_request(setup_database4Notes, create_table4Notes, i
 
     cursor.close()
 
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
     body = {'category': 'a', 'completed': "true", 'description': note_description, 'title': note_title}
     print(body)
-    resp = requests.put(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers, data=body)
+    resp = api_client.put(f"/notes/{note_id}", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 400 == respJS['status']
     assert "Category must be one of the categories: Home, Work, Personal" == respJS['message']
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_update_note_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+
+def test_update_note_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteCategory, noteCreatedAt, noteCompleted, noteDescription, noteId, noteTitle, id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteCategory, n.noteCreatedAt, n.noteCompleted, n.noteDescription, n.noteId, n.noteTitle, u.id, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
-    note_created_at = note_row['noteCreatedAt']
+    note_created_at = api_timestamp(note_row['noteCreatedAt'])
     note_completed = True  # Aqui, conforme a lógica do teste, sempre será True
     note_id = note_row['noteId']
     user_id = note_row['id']
@@ -812,38 +639,32 @@ def test_update_note_api_unauthorized(setup_database4Notes, create_table4Notes,
     note_title = Faker().sentence(4) 
 
     cursor.close()
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': "@"+user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': "@"+user_token}
     body = {'category': note_category, 'completed': "true", 'description': note_description, 'title': note_title}
     print(body)
-    resp = requests.put(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers, data=body)
+    resp = api_client.put(f"/notes/{note_id}", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message'] 
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_update_note_status_api(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+
+def test_update_note_status_api(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteCategory, noteCreatedAt, noteCompleted, noteDescription, noteId, noteTitle, id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteCategory, n.noteCreatedAt, n.noteCompleted, n.noteDescription, n.noteId, n.noteTitle, u.id, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
-    note_created_at = note_row['noteCreatedAt']
+    note_created_at = api_timestamp(note_row['noteCreatedAt'])
     note_completed = True  # Aqui, conforme a lógica do teste, sempre será True
     note_id = note_row['noteId']
     user_id = note_row['id']
@@ -853,10 +674,10 @@ def test_update_note_status_api(setup_database4Notes, create_table4Notes, insert
     note_title = note_row['noteTitle']
     cursor.close()
 
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
     body = {'completed': "true"}
     print(body)
-    resp = requests.patch(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers, data=body)
+    resp = api_client.patch(f"/notes/{note_id}", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert True == respJS['success']
@@ -881,31 +702,25 @@ def test_update_note_status_api(setup_database4Notes, create_table4Notes, insert
     cursor.close()
 
     # Assertion para validar que o campo 'noteCompleted' no banco corresponde ao valor retornado pela API
-    assert bool(int(db_note['noteCompleted'])) == respJS['data']['completed']
-
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
+    assert bool(db_note['noteCompleted']) == respJS['data']['completed']
 
-def test_update_note_status_api_bad_request(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
 
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+def test_update_note_status_api_bad_request(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteCategory, noteCreatedAt, noteCompleted, noteDescription, noteId, noteTitle, id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteCategory, n.noteCreatedAt, n.noteCompleted, n.noteDescription, n.noteId, n.noteTitle, u.id, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
-    note_created_at = note_row['noteCreatedAt']
+    note_created_at = api_timestamp(note_row['noteCreatedAt'])
     note_completed = True  # Aqui, conforme a lógica do teste, sempre será True
     note_id = note_row['noteId']
     user_id = note_row['id']
@@ -915,38 +730,32 @@ def test_update_note_status_api_bad_request(setup_database4Notes, create_table4N
     note_title = note_row['noteTitle']
 
     cursor.close()   
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
     body = {'completed': "a"}
     print(body)
-    resp = requests.patch(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers, data=body)
+    resp = api_client.patch(f"/notes/{note_id}", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 400 == respJS['status']
     assert "Note completed status must be boolean" == respJS['message']
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_update_note_status_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+
+def test_update_note_status_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteCategory, noteCreatedAt, noteCompleted, noteDescription, noteId, noteTitle, id, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteCategory, n.noteCreatedAt, n.noteCompleted, n.noteDescription, n.noteId, n.noteTitle, u.id, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     # Atribui os valores das colunas do banco às variáveis
-    note_created_at = note_row['noteCreatedAt']
+    note_created_at = api_timestamp(note_row['noteCreatedAt'])
     note_completed = True  # Aqui, conforme a lógica do teste, sempre será True
     note_id = note_row['noteId']
     user_id = note_row['id']
@@ -956,111 +765,109 @@ def test_update_note_status_api_unauthorized(setup_database4Notes, create_table4
     note_title = note_row['noteTitle']
 
     cursor.close()     
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': "@"+user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': "@"+user_token}
     body = {'completed': note_completed}
     print(body)
-    resp = requests.patch(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers, data=body)
+    resp = api_client.patch(f"/notes/{note_id}", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message'] 
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_delete_note_api(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+
+def test_delete_note_api(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteId, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteId, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     user_token = note_row['token']  
     note_id = note_row['noteId']
 
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.delete(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers)
+    headers = {'x-auth-token': user_token}
+    resp = api_client.delete(f"/notes/{note_id}", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert True == respJS['success']
     assert 200 == respJS['status']
     assert "Note successfully deleted" == respJS['message']
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_delete_note_api_bad_request(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+
+def test_delete_note_api_bad_request(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteId, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteId, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     user_token = note_row['token']  
     note_id = note_row['noteId']
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.delete(f"https://practice.expandtesting.com/notes/api/notes/'@'+{note_id}", headers=headers)
+    headers = {'x-auth-token': user_token}
+    resp = api_client.delete(f"/notes/'@'+{note_id}", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 400 == respJS['status']
     assert "Note ID must be a valid ID" == respJS['message']
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_delete_note_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user4Notes_api(randomData, setup_database4Notes)
-    login_user4Notes_api(randomData, setup_database4Notes)
-    create_note_api(randomData, setup_database4Notes)
-    # Lê o arquivo JSON para obter o índice aleatório
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-
-    # Pega o índice do arquivo JSON
-    user_index = data['user_index']
+
+def test_delete_note_api_unauthorized(setup_database4Notes, create_table4Notes, insert_users4Notes, api_client, flow_context, pooled_user4Notes):
+    create_note_api(flow_context, setup_database4Notes, api_client)
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados e pega os dados da linha correspondente ao índice
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteId, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteId, u.token
+        FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     note_row = cursor.fetchone()
 
     user_token = note_row['token']  
     note_id = note_row['noteId']
-    headers = {'accept': 'application/json', 'x-auth-token': '@'+user_token}
-    resp = requests.delete(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers)
+    headers = {'x-auth-token': '@'+user_token}
+    resp = api_client.delete(f"/notes/{note_id}", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message']
-    delete_user4Notes_api(randomData, setup_database4Notes)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-
-
-
 
+@pytest.mark.asyncio
+@pytest.mark.slo(endpoint="/notes", p95_ms=3000)
+async def test_concurrent_note_lifecycles_api(request, db_pool, create_table4Notes, insert_users4Notes, account_cleanup4Notes, async_api_client):
+    standin = request.config.getoption("--api-standin")
+    lifecycles = request.config.getoption("--async-lifecycles")
+    concurrency = request.config.getoption("--async-concurrency")
+    if lifecycles is None:
+        if not standin:
+            # A API pública limita a taxa de requisições: a rajada de ciclos receberia 429
+            pytest.skip("concurrent lifecycles hit the public API rate limit; use --api-standin or set --async-lifecycles")
+        lifecycles = 10
+    if concurrency is None:
+        concurrency = 50 if standin else 1
+    # Cada ciclo reserva o seu próprio usuário de seed, então todos podem rodar ao mesmo tempo
+    flows = [
+        note_lifecycle_api_async(FlowContext(Faker().hexify(text='^^^^^^^^^^^^')), db_pool, db_config4Notes['database'], async_api_client)
+        for _ in range(lifecycles)
+    ]
+    results = await run_concurrently(flows, concurrency)
+
+    failures = [result for result in results if isinstance(result, BaseException)]
+    assert not failures, f"{len(failures)} of {lifecycles} lifecycles failed, first: {failures[0]!r}"
+    assert len(set(results)) == lifecycles  # nenhum usuário de seed foi usado por dois ciclos
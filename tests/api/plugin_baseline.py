@@ -0,0 +1,124 @@
+"""Gate de regressão de desempenho contra um baseline salvo (support_baseline).
+
+Com --perf-baseline os tempos do run (fase call de cada teste que passou, p50 de cada
+endpoint da API e as etapas do setup da sessão: seed e pool de usuários) são comparados
+com as amostras do baseline. As regressões aparecem na
+seção "Performance regressions". Com --perf-gate=fail (padrão) as que têm amostras
+suficientes falham o run. --perf-save-baseline acrescenta o run atual ao arquivo,
+mantendo as últimas --perf-window amostras de cada teste e endpoint.
+"""
+import statistics
+import pytest
+from .plugin_http import latency_key
+from .support_baseline import compare, load_baseline, merge_samples, save_baseline, setup_timings_key
+
+perf_regressions_key = pytest.StashKey()
+
+SECTION_LABELS = {'tests': 'test', 'endpoints': 'endpoint', 'setup': 'setup'}
+
+
+class _TestDurations:
+    """Duração da fase call dos testes que passaram (vale também com xdist)
+
+    O setup fica de fora: o primeiro teste a pedir as fixtures de sessão absorveria o
+    seed e o preenchimento do pool de usuários, e mudar a ordem dos testes pareceria
+    regressão. Essas etapas entram na seção `setup` do baseline (record_setup), e a pausa
+    do rate limit roda no teardown (plugin_http).
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self.failed = set()
+
+    def pytest_runtest_logreport(self, report):
+        if report.when == 'call':
+            self.durations[report.nodeid] = report.duration
+        if not report.passed:
+            self.failed.add(report.nodeid)
+
+    def passed_ms(self):
+        return {nodeid: seconds * 1000 for nodeid, seconds in self.durations.items() if nodeid not in self.failed}
+
+
+class _XdistSetupTimings:
+    """Leva os tempos de setup de cada worker do xdist para o controlador"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def pytest_testnodedown(self, node, error):
+        timings = getattr(node, 'workeroutput', {}).get('perf_setup')
+        for key, values in (timings or {}).items():
+            self.config.stash.setdefault(setup_timings_key, {}).setdefault(key, []).extend(values)
+
+
+def current_timings(config):
+    latency = config.stash[latency_key]
+    return {
+        'tests': config.pluginmanager.get_plugin("perf-test-durations").passed_ms(),
+        'endpoints': {f"{method} {path}": histogram.percentile(50)
+                      for (method, path), histogram in latency.histograms.items()},
+        # Com xdist cada worker tem o seu seed e o seu pool: vale a média dos workers
+        'setup': {key: statistics.mean(values) for key, values in config.stash.get(setup_timings_key, {}).items()},
+    }
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(_TestDurations(), "perf-test-durations")
+    if config.pluginmanager.hasplugin("xdist"):
+        config.pluginmanager.register(_XdistSetupTimings(config), "perf-setup-xdist")
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    workeroutput = getattr(config, 'workeroutput', None)
+    if workeroutput is not None:
+        workeroutput['perf_setup'] = config.stash.get(setup_timings_key, {})
+        return
+    baseline_path = config.getoption("--perf-baseline")
+    save_path = config.getoption("--perf-save-baseline")
+    if baseline_path is None and save_path is None:
+        return
+    current = current_timings(config)
+
+    if baseline_path is not None:
+        baseline = load_baseline(baseline_path)
+        if baseline is not None:
+            regressions = compare(
+                baseline, current,
+                tolerance=config.getoption("--perf-tolerance"),
+                mad_k=config.getoption("--perf-noise-k"),
+                min_delta=config.getoption("--perf-min-delta-ms"),
+                min_samples=config.getoption("--perf-min-samples"),
+            )
+            config.stash[perf_regressions_key] = regressions
+            gating = [regression for regression in regressions if regression.gating]
+            if gating and config.getoption("--perf-gate") == "fail" and session.exitstatus == pytest.ExitCode.OK:
+                session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    # Só runs sem falhas entram no baseline, senão um run quebrado vira referência
+    if save_path is not None and session.exitstatus == pytest.ExitCode.OK:
+        window = config.getoption("--perf-window")
+        save_baseline(save_path, merge_samples(load_baseline(save_path), current, window))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    baseline_path = config.getoption("--perf-baseline")
+    if baseline_path is None or hasattr(config, 'workerinput'):
+        return
+    regressions = config.stash.get(perf_regressions_key, None)
+    terminalreporter.section("Performance regressions")
+    if regressions is None:
+        terminalreporter.write_line(f"no baseline at {baseline_path}; nothing compared")
+        return
+    if not regressions:
+        terminalreporter.write_line(f"no regressions against {baseline_path}", green=True)
+        return
+    gate = config.getoption("--perf-gate")
+    for regression in regressions:
+        status = "FAIL" if regression.gating and gate == "fail" else "slower"
+        terminalreporter.write_line(
+            f"{status} {SECTION_LABELS[regression.section]} {regression.key}: {regression.current:.1f} ms, "
+            f"baseline median {regression.median:.1f} ms over {regression.samples} runs (limit {regression.limit:.1f} ms)",
+            red=status == "FAIL", yellow=status != "FAIL",
+        )
@@ -0,0 +1,30 @@
+import os
+import pytest
+from .support_db import DatabasePools
+
+db_pools_key = pytest.StashKey()
+
+
+@pytest.fixture(scope="session")
+def db_pool(request):
+    """Pool de conexões MySQL compartilhado pelos módulos de usuários e notas"""
+    pools = DatabasePools(
+        size=request.config.getoption("--db-pool-size"),
+        timeout=request.config.getoption("--db-pool-timeout"),
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        allow_local_infile=request.config.getoption("--seed-method") == 'load-data',
+    )
+    request.config.stash[db_pools_key] = pools
+    yield pools
+    pools.close()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    pools = config.stash.get(db_pools_key, None)
+    if pools is None or not pools.pools:
+        return
+    terminalreporter.section("MySQL connection pools")
+    for line in pools.summary_lines():
+        terminalreporter.write_line(line)
@@ -0,0 +1,89 @@
+"""Budgets de idas ao banco por teste: @pytest.mark.db_budget(queries=10, commits=1).
+
+O marcador limita o que o corpo do teste (fase call) faz pelas conexões do pool: os
+statements executados (`queries`, um executemany conta como um), os commits e os cursores
+abertos. As contagens vêm do SqlRecorder do plugin_sql. Um teste que passa do budget
+falha com a lista dos statements mais repetidos, que são os candidatos a virar um só
+(JOIN, IN, executemany). Vale o marcador mais próximo do teste, então um budget de
+módulo (pytestmark) pode ser sobrescrito na função. O resultado de cada teste sai na seção
+"DB round-trip budgets".
+"""
+import pytest
+from .plugin_sql import sql_recorder_key
+
+BUDGETS = ('queries', 'commits', 'cursors')
+BUSIEST_STATEMENTS = 5
+
+db_budget_key = pytest.StashKey()
+
+
+def db_budgets(marker):
+    """{contador: limite} de um marcador db_budget"""
+    kwargs = dict(marker.kwargs)
+    unknown = sorted(set(kwargs) - set(BUDGETS))
+    if marker.args or unknown or not kwargs:
+        raise pytest.UsageError(
+            f"@pytest.mark.db_budget takes keyword budgets among {', '.join(BUDGETS)}, e.g. db_budget(queries=10); "
+            f"got args={marker.args!r} kwargs={sorted(kwargs)}"
+        )
+    for name, limit in kwargs.items():
+        if not isinstance(limit, int) or limit < 0:
+            raise pytest.UsageError(f"@pytest.mark.db_budget {name} must be a non-negative int, got {limit!r}")
+    return kwargs
+
+
+def budget_violations(counts, budgets):
+    return [f"{name}={counts[name]} > {limit}" for name, limit in budgets.items() if counts[name] > limit]
+
+
+def budget_line(counts, budgets):
+    return ' '.join(f"{name}={counts[name]}/{limit}" for name, limit in budgets.items())
+
+
+def pytest_itemcollected(item):
+    # Erros de digitação no marcador aparecem na coleta, não no meio da sessão
+    marker = item.get_closest_marker("db_budget")
+    if marker is not None:
+        db_budgets(marker)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("db_budget")
+    mode = item.config.getoption("--db-budget")
+    if marker is None or mode == "off":
+        return (yield)
+    with item.config.stash[sql_recorder_key].capture() as observed:
+        result = yield
+
+    budgets = db_budgets(marker)
+    counts = observed.counts()
+    violations = budget_violations(counts, budgets)
+    item.stash[db_budget_key] = {'budgets': budgets, 'counts': {name: counts[name] for name in BUDGETS},
+                                 'violations': violations}
+    if violations and mode == "enforce":
+        busiest = [f"  {stats.count}x {stats.shape}" for stats in observed.busiest(BUSIEST_STATEMENTS)]
+        pytest.fail("DB round-trip budget exceeded: " + ', '.join(violations)
+                    + "\nmost repeated statements:\n" + '\n'.join(busiest), pytrace=False)
+    return result
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = yield
+    # No relatório, para chegar ao controlador também com xdist
+    if report.when == 'call' and db_budget_key in item.stash:
+        report.db_budget = item.stash[db_budget_key]
+    return report
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = [(report.nodeid, report.db_budget) for reports in terminalreporter.stats.values()
+               for report in reports if getattr(report, 'db_budget', None)]
+    if not results:
+        return
+    terminalreporter.section("DB round-trip budgets")
+    for nodeid, result in sorted(results):
+        failed = bool(result['violations'])
+        line = f"{nodeid}: {budget_line(result['counts'], result['budgets'])}"
+        terminalreporter.write_line(line + (" FAIL" if failed else " ok"), red=failed, green=not failed)
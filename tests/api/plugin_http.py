@@ -0,0 +1,160 @@
+import pytest
+import pytest_asyncio
+from faker import Faker
+from .standin_api import NotesApiServer
+from .support_api_async import AsyncApiClient
+from .support_context import FIXTURES_DIR, FlowContext
+from .support_http import ApiClient
+from .support_latency import LatencyRecorder
+from .support_user_pool import test_reports_key, user_pools_key
+
+api_client_key = pytest.StashKey()
+async_api_clients_key = pytest.StashKey()
+latency_key = pytest.StashKey()
+
+
+class _HtmlLatencyReport:
+    """Tabela de latência por endpoint no resumo do relatório do pytest-html"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def pytest_html_results_summary(self, prefix, summary, postfix):
+        if self.latency.histograms:
+            postfix.append(self.latency.html_table())
+
+
+class _XdistLatencyMerge:
+    """Leva os histogramas de cada worker do xdist para o controlador"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def pytest_testnodedown(self, node, error):
+        rows = getattr(node, 'workeroutput', {}).get('http_latency')
+        if rows:
+            self.latency.merge(LatencyRecorder.from_dict(rows))
+
+
+def pytest_configure(config):
+    latency = config.stash[latency_key] = LatencyRecorder()
+    # Os hooks do pytest-html e do xdist só existem com os plugins instalados
+    if config.pluginmanager.hasplugin("html"):
+        config.pluginmanager.register(_HtmlLatencyReport(latency), "http-latency-html")
+    if config.pluginmanager.hasplugin("xdist"):
+        config.pluginmanager.register(_XdistLatencyMerge(latency), "http-latency-xdist")
+
+
+def pytest_sessionfinish(session):
+    workeroutput = getattr(session.config, 'workeroutput', None)
+    if workeroutput is not None:
+        workeroutput['http_latency'] = session.config.stash[latency_key].to_dict()
+
+
+def api_routes(config):
+    """{prefixo: base_url} do --api-route; o servidor local atende todos os caminhos"""
+    if config.getoption("--api-standin"):
+        return {}
+    routes = {}
+    for option in config.getoption("--api-route"):
+        prefix, sep, url = option.partition('=')
+        if not sep or not prefix.startswith('/') or not url.startswith(('http://', 'https://')):
+            raise pytest.UsageError(f"--api-route expects PREFIX=URL, e.g. /notes=http://localhost:8080/api; got {option!r}")
+        routes[prefix] = url
+    return routes
+
+
+@pytest.fixture(scope="session")
+def api_base_url(request):
+    """URL da API: a pública, ou a do servidor local com --api-standin"""
+    if not request.config.getoption("--api-standin"):
+        yield request.config.getoption("--api-base-url")
+        return
+    server = NotesApiServer().start()
+    yield server.base_url
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def api_client(request, api_base_url):
+    """Cliente HTTP keep-alive compartilhado por todos os testes e helpers da API"""
+    pause = request.config.getoption("--api-pause")
+    if pause is None:
+        # A API pública limita a taxa de requisições; o servidor local não precisa de pausa
+        pause = 0 if request.config.getoption("--api-standin") else 5
+    client = ApiClient(
+        base_url=api_base_url,
+        pool_size=request.config.getoption("--http-pool-size"),
+        pause_seconds=pause,
+        latency=request.config.stash[latency_key],
+        base_urls=api_routes(request.config),
+    )
+    request.config.stash[api_client_key] = client
+    yield client
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def api_rate_limit_pause(request):
+    """Pausa do rate limit no teardown dos testes que usam o api_client
+
+    No teardown a espera fica fora da fase call, que é o tempo comparado pelo gate de
+    desempenho (plugin_baseline) e pelos SLOs.
+    """
+    client = request.getfixturevalue('api_client') if 'api_client' in request.fixturenames else None
+    yield
+    if client is not None:
+        client.pause()
+
+
+@pytest_asyncio.fixture
+async def async_api_client(request, api_base_url):
+    """Cliente HTTP assíncrono para os fluxos de support_api_async (um por teste, no loop do teste)"""
+    pool_size = request.config.getoption("--http-pool-size")
+    async with AsyncApiClient(api_base_url, pool_size=pool_size, latency=request.config.stash[latency_key],
+                              base_urls=api_routes(request.config)) as client:
+        request.config.stash.setdefault(async_api_clients_key, []).append(client)
+        yield client
+
+
+@pytest.fixture
+def flow_context(request):
+    """Estado do fluxo do teste em memória; gravado em tests/fixtures só com --persist-flow-context"""
+    persist = request.config.getoption("--persist-flow-context")
+    return FlowContext(Faker().hexify(text='^^^^^^^^^^^^'), persist_dir=FIXTURES_DIR if persist else None)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    # Guarda o relatório de cada fase para as fixtures saberem, no teardown, se o teste passou
+    report = yield
+    item.stash.setdefault(test_reports_key, {})[report.when] = report
+    return report
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    pools = config.stash.get(user_pools_key, [])
+    if pools:
+        terminalreporter.section("API user pools")
+        for pool in pools:
+            terminalreporter.write_line(pool.summary_line())
+
+    latency = config.stash.get(latency_key, None)
+    if latency is not None and latency.histograms:
+        terminalreporter.section("HTTP latency")
+        for line in latency.summary_lines():
+            terminalreporter.write_line(line)
+
+    client = config.stash.get(api_client_key, None)
+    async_clients = config.stash.get(async_api_clients_key, [])
+    if (client is None or not client.requests) and not async_clients:
+        return
+    terminalreporter.section("HTTP connections")
+    if client is not None and client.requests:
+        terminalreporter.write_line(client.summary_line())
+    if async_clients:
+        requests = sum(async_client.requests for async_client in async_clients)
+        opened = sum(async_client.connections_opened for async_client in async_clients)
+        terminalreporter.write_line(
+            f"async ({len(async_clients)} clients): requests={requests} opened={opened} reused={requests - opened}"
+        )
@@ -0,0 +1,133 @@
+"""Breakdown do tempo de cada teste por fase (support_phases).
+
+O timer vai do início do setup ao fim do teardown, então o seed das fixtures de sessão
+aparece no primeiro teste que as usa. O breakdown vai no relatório de teardown
+(`report.phase_timings`), e com isso chega ao controlador também com xdist. Ele aparece
+na coluna Phases e no resumo do relatório do pytest-html, na seção "phase timings" dos
+testes que falharam e na seção "Test phase timings" do terminal (omitida quando nenhum
+teste passou por MySQL ou HTTP, a não ser com --phase-timings). Com --phase-timings
+também é gravado em JSON.
+"""
+import html
+import json
+import time
+from pathlib import Path
+import pytest
+from .support_phases import PHASES, start_timer, stop_timer
+
+phase_start_key = pytest.StashKey()
+
+ALL_PHASES = PHASES + ('other',)
+SLOWEST_TESTS = 10
+
+
+def phase_line(timings):
+    parts = ' '.join(f"{phase}={timings['phases'][phase]:.3f}s" for phase in ALL_PHASES)
+    overlap = " (concurrent phases overlap)" if timings['overlap'] else ""
+    return f"wall={timings['wall_s']:.3f}s {parts}{overlap}"
+
+
+class _PhaseTimings:
+    def __init__(self, config):
+        self.config = config
+        self.tests = []
+        self.by_nodeid = {}
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_logreport(self, report):
+        # tryfirst: o pytest-html monta a linha do teste no seu próprio logreport do teardown
+        timings = getattr(report, 'phase_timings', None)
+        if report.when == 'teardown' and timings is not None:
+            self.by_nodeid[report.nodeid] = timings
+            self.tests.append({'nodeid': report.nodeid, **timings})
+
+    def totals(self):
+        return {phase: sum(test['phases'][phase] for test in self.tests) for phase in ALL_PHASES}
+
+    def to_dict(self):
+        return {'phases': list(ALL_PHASES), 'totals': self.totals(), 'tests': self.tests}
+
+    def slowest(self):
+        return sorted(self.tests, key=lambda test: test['wall_s'], reverse=True)[:SLOWEST_TESTS]
+
+    def html_table(self):
+        head = ''.join(f'<th>{header}</th>' for header in ('Test', 'Wall (s)', *ALL_PHASES))
+        rows = [('Total', sum(test['wall_s'] for test in self.tests), self.totals())]
+        rows += [(test['nodeid'], test['wall_s'], test['phases']) for test in self.slowest()]
+        body = ''
+        for name, wall, phases in rows:
+            cells = [html.escape(name), f'{wall:.3f}'] + [f'{phases[phase]:.3f}' for phase in ALL_PHASES]
+            body += '<tr>' + ''.join(f'<td>{cell}</td>' for cell in cells) + '</tr>'
+        return (
+            f'<h2>Test phase timings (total and {SLOWEST_TESTS} slowest tests)</h2>'
+            f'<table id="phase-timings"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+        )
+
+
+class _HtmlPhaseReport:
+    def __init__(self, timings):
+        self.timings = timings
+
+    def pytest_html_results_summary(self, prefix, summary, postfix):
+        if self.timings.tests:
+            postfix.append(self.timings.html_table())
+
+    def pytest_html_results_table_header(self, cells):
+        cells.append('<th>Phases</th>')
+
+    def pytest_html_results_table_row(self, report, cells):
+        timings = self.timings.by_nodeid.get(report.nodeid)
+        cells.append(f'<td>{html.escape(phase_line(timings)) if timings else ""}</td>')
+
+
+def pytest_configure(config):
+    timings = _PhaseTimings(config)
+    config.pluginmanager.register(timings, "phase-timings")
+    if config.pluginmanager.hasplugin("html"):
+        config.pluginmanager.register(_HtmlPhaseReport(timings), "phase-timings-html")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    item.stash[phase_start_key] = time.perf_counter()
+    start_timer()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = yield
+    if report.when == 'teardown' and phase_start_key in item.stash:
+        timer = stop_timer()
+        if timer is not None:
+            report.phase_timings = timer.breakdown(time.perf_counter() - item.stash[phase_start_key])
+            report.sections.append(("phase timings", phase_line(report.phase_timings)))
+    return report
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    path = config.getoption("--phase-timings")
+    if path is None or hasattr(config, 'workerinput'):
+        return
+    timings = config.pluginmanager.get_plugin("phase-timings")
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as json_file:
+        json.dump(timings.to_dict(), json_file, indent=4)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    timings = config.pluginmanager.get_plugin("phase-timings")
+    if timings is None or not timings.tests:
+        return
+    totals = timings.totals()
+    path = config.getoption("--phase-timings")
+    # Runs só de testes unitários não passam por MySQL nem HTTP: tudo seria `other`
+    if path is None and not any(totals[phase] for phase in PHASES):
+        return
+    wall = sum(test['wall_s'] for test in timings.tests)
+    terminalreporter.section("Test phase timings")
+    for phase in ALL_PHASES:
+        share = totals[phase] / wall * 100 if wall else 0
+        terminalreporter.write_line(f"{phase:<12} {totals[phase]:>9.3f}s {share:>5.1f}%")
+    if path is not None:
+        terminalreporter.write_line(f"per-test breakdown: {path}")
@@ -0,0 +1,127 @@
+"""Perfil de CPU e de memória por teste, opt-in com --profile-tests e --trace-memory.
+
+Só a fase call (o corpo do teste) é medida. Os arquivos vão para --profile-dir,
+por padrão a pasta `profiles` ao lado do relatório do --html (ou ./reports/profiles):
+    <teste>.prof      estatísticas do cProfile (python -m pstats, snakeviz...)
+    <teste>.prof.txt  as funções com maior tempo acumulado
+    <teste>.mem.txt   as linhas que mais alocaram memória durante o teste (tracemalloc)
+O relatório do pytest-html ganha links para os arquivos de cada teste.
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import tracemalloc
+from pathlib import Path
+import pytest
+
+profile_files_key = pytest.StashKey()
+
+# Frames do próprio tracemalloc e do import system não interessam no top de alocações
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+
+def profile_dir(config):
+    configured = config.getoption("--profile-dir")
+    if configured:
+        return Path(configured)
+    html_path = config.getoption("htmlpath", None)
+    base = Path(html_path).parent if html_path else Path('reports')
+    return base / 'profiles'
+
+
+def file_stem(nodeid):
+    """Nome de arquivo seguro a partir do nodeid: tests/api/x_test.py::test_y[1] → x_test.py-test_y-1"""
+    path, _, name = nodeid.partition('::')
+    return re.sub(r'[^\w.-]+', '-', f"{Path(path).name}-{name}").strip('-')[:150]
+
+
+def write_cpu_profile(profiler, stem, directory, top):
+    prof_path = directory / f"{stem}.prof"
+    profiler.dump_stats(prof_path)
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(top)
+    text_path = directory / f"{stem}.prof.txt"
+    text_path.write_text(text.getvalue())
+    return [('cProfile', prof_path), ('cProfile top', text_path)]
+
+
+def write_memory_snapshot(before, after, stem, directory, top):
+    stats = after.filter_traces(_MEMORY_FILTERS).compare_to(before.filter_traces(_MEMORY_FILTERS), 'lineno')
+    lines = [f"Top {top} allocations during the test (size and count change, by line)", ""]
+    lines += [str(stat) for stat in stats[:top]]
+    path = directory / f"{stem}.mem.txt"
+    path.write_text('\n'.join(lines) + '\n')
+    return [('tracemalloc top', path)]
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    config = item.config
+    profile = config.getoption("--profile-tests")
+    trace_memory = config.getoption("--trace-memory")
+    if not profile and not trace_memory:
+        return (yield)
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(config.getoption("--trace-memory-frames"))
+    before = tracemalloc.take_snapshot() if trace_memory else None
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        return (yield)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        after = tracemalloc.take_snapshot() if trace_memory else None
+        if started_tracing:
+            tracemalloc.stop()
+
+        directory = profile_dir(config)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem, top = file_stem(item.nodeid), config.getoption("--profile-top")
+        files = []
+        if profiler is not None:
+            files += write_cpu_profile(profiler, stem, directory, top)
+        if trace_memory:
+            files += write_memory_snapshot(before, after, stem, directory, top)
+        item.stash[profile_files_key] = files
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = yield
+    files = item.stash.get(profile_files_key, None)
+    if report.when != 'call' or not files:
+        return report
+    report.profile_files = [str(path) for _, path in files]
+    html_path = item.config.getoption("htmlpath", None)
+    if html_path:
+        from pytest_html import extras
+        # Links relativos ao relatório, que fica na pasta pai de profiles/ por padrão
+        html_dir = Path(html_path).parent
+        report.extras = getattr(report, 'extras', []) + [
+            extras.url(os.path.relpath(path, html_dir), name=name) for name, path in files
+        ]
+    return report
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.getoption("--profile-tests") and not config.getoption("--trace-memory"):
+        return
+    # Os relatórios trazem os arquivos gravados, também os dos workers do xdist
+    files = [path for reports in terminalreporter.stats.values() for report in reports
+             for path in getattr(report, 'profile_files', ())]
+    if not files:
+        return
+    terminalreporter.section("Test profiles")
+    profiles = sum(path.endswith('.prof') for path in files)
+    snapshots = sum(path.endswith('.mem.txt') for path in files)
+    terminalreporter.write_line(f"{profiles} cProfile files and {snapshots} tracemalloc snapshots in {profile_dir(config)}")
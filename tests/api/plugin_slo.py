@@ -0,0 +1,151 @@
+"""Budgets de latência por endpoint: @pytest.mark.slo(endpoint="/notes", p95_ms=300).
+
+O marcador vale para as requisições feitas no corpo do teste (fase call), capturadas nos
+mesmos histogramas do plugin_http. Cada argumento `pN_ms` limita o percentil N e `max_ms`
+a requisição mais lenta; `method` restringe a um método HTTP. O endpoint cobre também os
+caminhos abaixo dele ("/notes" inclui "/notes/{id}") e um teste pode ter vários marcadores.
+
+As amostras de todas as execuções do mesmo teste (parametrizações, repetições) são somadas
+e checadas de novo no fim da sessão, já que um p95 de poucas amostras diz pouco; o
+resultado sai na seção "API latency SLOs". Os percentis vêm dos buckets logarítmicos e
+podem ficar até ~9% acima do valor exato.
+"""
+import re
+import pytest
+from .plugin_http import latency_key
+from .support_latency import LatencyHistogram
+
+slo_samples_key = pytest.StashKey()
+
+_BUDGET = re.compile(r'p(\d+(?:\.\d+)?)_ms|max_ms')
+
+
+def slo_budgets(marker):
+    """(endpoint, method, {budget: limite em ms}) de um marcador slo"""
+    kwargs = dict(marker.kwargs)
+    endpoint = kwargs.pop('endpoint', marker.args[0] if marker.args else None)
+    method = kwargs.pop('method', None)
+    if endpoint is None:
+        raise pytest.UsageError("@pytest.mark.slo needs an endpoint, e.g. slo(endpoint='/notes', p95_ms=300)")
+    unknown = [name for name in kwargs if not _BUDGET.fullmatch(name)]
+    if unknown or not kwargs:
+        raise pytest.UsageError(f"@pytest.mark.slo budgets must be pN_ms or max_ms, got {sorted(kwargs)}")
+    return endpoint, method, {name: float(limit) for name, limit in kwargs.items()}
+
+
+def observed_ms(histogram, budget):
+    if budget == 'max_ms':
+        return histogram.max_ms
+    return histogram.percentile(float(_BUDGET.fullmatch(budget).group(1)))
+
+
+def slo_violations(histogram, budgets):
+    violations = []
+    for budget, limit in budgets.items():
+        observed = observed_ms(histogram, budget)
+        if observed > limit:
+            violations.append(f"{budget}={observed:.1f} > {limit:g}")
+    return violations
+
+
+def _label(endpoint, method):
+    return f"{(method or 'ANY').upper()} {endpoint}"
+
+
+class _XdistSloMerge:
+    """Leva as amostras do SLO de cada worker do xdist para o controlador"""
+
+    def __init__(self, config):
+        self.config = config
+
+    def pytest_testnodedown(self, node, error):
+        samples = self.config.stash.setdefault(slo_samples_key, {})
+        for key, entry in getattr(node, 'workeroutput', {}).get('slo_samples', {}).items():
+            target = samples.setdefault(key, {'budgets': entry['budgets'], 'histogram': LatencyHistogram(), 'runs': 0})
+            target['histogram'].merge(LatencyHistogram.from_dict(entry['histogram']))
+            target['runs'] += entry['runs']
+
+
+def pytest_configure(config):
+    if config.pluginmanager.hasplugin("xdist"):
+        config.pluginmanager.register(_XdistSloMerge(config), "http-slo-xdist")
+
+
+def pytest_itemcollected(item):
+    # Erros de digitação no marcador aparecem na coleta, não no meio da sessão
+    for marker in item.iter_markers("slo"):
+        slo_budgets(marker)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    markers = list(item.iter_markers("slo"))
+    mode = slo_mode(item.config)
+    if not markers or mode == "off":
+        return (yield)
+    with item.config.stash[latency_key].capture() as observed:
+        result = yield
+
+    samples = item.config.stash.setdefault(slo_samples_key, {})
+    test_id = item.nodeid.partition('[')[0]
+    failures = []
+    for marker in markers:
+        endpoint, method, budgets = slo_budgets(marker)
+        histogram = observed.matching(endpoint, method)
+        entry = samples.setdefault(f"{test_id} {_label(endpoint, method)}",
+                                   {'budgets': budgets, 'histogram': LatencyHistogram(), 'runs': 0})
+        entry['histogram'].merge(histogram)
+        entry['runs'] += 1
+        if not histogram.count:
+            failures.append(f"{_label(endpoint, method)}: no requests made by the test")
+            continue
+        violations = slo_violations(histogram, budgets)
+        if violations:
+            failures.append(f"{_label(endpoint, method)} ({histogram.count} requests): {', '.join(violations)}")
+    if failures and mode == "enforce":
+        pytest.fail("latency SLO exceeded:\n" + "\n".join(failures), pytrace=False)
+    return result
+
+
+def slo_mode(config):
+    """--slo; sem ele, enforce só com --api-standin, já que a latência da API pública é ruidosa demais"""
+    mode = config.getoption("--slo")
+    if mode is None:
+        return "enforce" if config.getoption("--api-standin") else "report"
+    return mode
+
+
+def _aggregate_failures(config):
+    """Chaves dos SLOs estourados considerando todas as execuções de cada teste"""
+    return [key for key, entry in config.stash.get(slo_samples_key, {}).items()
+            if entry['runs'] > 1 and entry['histogram'].count and slo_violations(entry['histogram'], entry['budgets'])]
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    workeroutput = getattr(config, 'workeroutput', None)
+    if workeroutput is not None:
+        workeroutput['slo_samples'] = {
+            key: {'budgets': entry['budgets'], 'histogram': entry['histogram'].to_dict(), 'runs': entry['runs']}
+            for key, entry in config.stash.get(slo_samples_key, {}).items()
+        }
+        return
+    # Testes que passaram sozinhos, mas estouram o budget somando as repetições
+    if slo_mode(config) == "enforce" and session.exitstatus == pytest.ExitCode.OK and _aggregate_failures(config):
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    samples = config.stash.get(slo_samples_key, {})
+    if not samples:
+        return
+    terminalreporter.section("API latency SLOs")
+    for key, entry in sorted(samples.items()):
+        histogram = entry['histogram']
+        if not histogram.count:
+            terminalreporter.write_line(f"{key}: runs={entry['runs']} no requests", red=True)
+            continue
+        violations = slo_violations(histogram, entry['budgets'])
+        observed = ' '.join(f"{budget}={observed_ms(histogram, budget):.1f}/{limit:g}" for budget, limit in entry['budgets'].items())
+        line = f"{key}: runs={entry['runs']} requests={histogram.count} {observed}"
+        terminalreporter.write_line(line + (" FAIL" if violations else " ok"), red=bool(violations), green=not violations)
@@ -0,0 +1,136 @@
+"""Contagem e tempo dos statements SQL por teste, com EXPLAIN automático (support_sql).
+
+Todo statement executado pelas conexões do pool entra no SqlRecorder da sessão. O corpo
+de cada teste (fase call) também tem o seu, e as contagens dele vão no relatório
+(`report.sql_stats`), na coluna SQL do pytest-html e na seção "sql statements" dos
+testes que falharam. Ao fim de cada teste os formatos novos passam pelo EXPLAIN; os que
+demoraram mais que --sql-slow-ms ou que varrem tabelas com --sql-scan-rows linhas ou
+mais aparecem com o plano na seção "SQL statements" do terminal e no resumo do relatório.
+"""
+import html
+import pytest
+from .plugin_db import db_pools_key
+from .support_sql import SqlRecorder, start_recording, stop_recording
+
+sql_recorder_key = pytest.StashKey()
+sql_capture_key = pytest.StashKey()
+
+BUSIEST_TESTS = 5
+BUSIEST_STATEMENTS = 10
+
+
+def counts_line(counts):
+    return f"queries={counts['queries']} commits={counts['commits']} cursors={counts['cursors']} sql={counts['ms']:.1f}ms"
+
+
+class _SqlTestStats:
+    def __init__(self):
+        self.by_nodeid = {}
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_logreport(self, report):
+        counts = getattr(report, 'sql_stats', None)
+        if report.when == 'call' and counts is not None:
+            self.by_nodeid[report.nodeid] = counts
+
+    def busiest(self):
+        return sorted(self.by_nodeid.items(), key=lambda item: item[1]['queries'], reverse=True)[:BUSIEST_TESTS]
+
+
+class _HtmlSqlReport:
+    def __init__(self, recorder, tests):
+        self.recorder = recorder
+        self.tests = tests
+
+    def pytest_html_results_summary(self, prefix, summary, postfix):
+        if self.recorder.offenders():
+            postfix.append(self.recorder.html_table())
+
+    def pytest_html_results_table_header(self, cells):
+        cells.append('<th>SQL</th>')
+
+    def pytest_html_results_table_row(self, report, cells):
+        counts = self.tests.by_nodeid.get(report.nodeid)
+        cells.append(f'<td>{html.escape(counts_line(counts)) if counts else ""}</td>')
+
+
+class _XdistSqlMerge:
+    """Leva os statements de cada worker do xdist para o controlador"""
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def pytest_testnodedown(self, node, error):
+        data = getattr(node, 'workeroutput', {}).get('sql_statements')
+        if data:
+            self.recorder.merge(SqlRecorder.from_dict(data))
+
+
+def pytest_configure(config):
+    recorder = config.stash[sql_recorder_key] = start_recording(SqlRecorder(config.getoption("--sql-slow-ms")))
+    tests = _SqlTestStats()
+    config.pluginmanager.register(tests, "sql-test-stats")
+    if config.pluginmanager.hasplugin("html"):
+        config.pluginmanager.register(_HtmlSqlReport(recorder, tests), "sql-statements-html")
+    if config.pluginmanager.hasplugin("xdist"):
+        config.pluginmanager.register(_XdistSqlMerge(recorder), "sql-statements-xdist")
+
+
+def pytest_unconfigure(config):
+    stop_recording()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    config = item.config
+    recorder = config.stash[sql_recorder_key]
+    try:
+        with recorder.capture() as capture:
+            return (yield)
+    finally:
+        item.stash[sql_capture_key] = capture
+        pools = config.stash.get(db_pools_key, None)
+        if pools is not None and not config.getoption("--no-sql-explain"):
+            recorder.explain_pending(pools, config.getoption("--sql-scan-rows"))
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = yield
+    capture = item.stash.get(sql_capture_key, None)
+    if report.when != 'call' or capture is None or not capture.queries:
+        return report
+    report.sql_stats = capture.counts()
+    lines = [counts_line(report.sql_stats)]
+    lines += [f"{stats.count:>4}x {stats.total_ms:>8.1f}ms {stats.shape}" for stats in capture.busiest(BUSIEST_STATEMENTS)]
+    report.sections.append(("sql statements", '\n'.join(lines)))
+    return report
+
+
+def pytest_sessionfinish(session):
+    workeroutput = getattr(session.config, 'workeroutput', None)
+    if workeroutput is not None:
+        workeroutput['sql_statements'] = session.config.stash[sql_recorder_key].to_dict()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    recorder = config.stash.get(sql_recorder_key, None)
+    if recorder is None or not recorder.queries or hasattr(config, 'workerinput'):
+        return
+    terminalreporter.section("SQL statements")
+    terminalreporter.write_line(
+        f"{recorder.queries} statements in {len(recorder.statements)} shapes, {recorder.commits} commits, "
+        f"{recorder.cursors} cursors, {recorder.total_ms:.1f}ms"
+    )
+    tests = config.pluginmanager.get_plugin("sql-test-stats")
+    for nodeid, counts in tests.busiest():
+        terminalreporter.write_line(f"{counts_line(counts)} {nodeid}")
+    offenders = recorder.summary_lines()
+    if not offenders:
+        terminalreporter.write_line(
+            f"no statement slower than {config.getoption('--sql-slow-ms'):g}ms or scanning "
+            f"{config.getoption('--sql-scan-rows')}+ rows", green=True,
+        )
+        return
+    for line in offenders:
+        terminalreporter.write_line(line, yellow=not line.startswith(' '))
@@ -0,0 +1,336 @@
+"""Servidor local que imita a Notes API do expandtesting, com o estado em memória.
+
+Cobre os endpoints usados pela suíte e devolve o mesmo envelope
+(success, status, message, data) e as mesmas mensagens que os testes verificam.
+
+Uso isolado (a partir da raiz do repositório):
+    python -m tests.api.standin_api --port 8000
+"""
+import argparse
+import json
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+API_PREFIX = '/notes/api'
+NOTE_CATEGORIES = ('Home', 'Work', 'Personal')
+BOOLEANS = {'true': True, 'false': False, '1': True, '0': False}
+
+EMAIL_REGEX = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+OBJECT_ID_REGEX = re.compile(r'^[0-9a-f]{24}$')
+
+# base_url dos servidores rodando neste processo (ver is_running_standin)
+_running = set()
+_running_lock = threading.Lock()
+
+UNAUTHORIZED = "Access token is not valid or has expired, you will need to login"
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _now():
+    value = datetime.now(timezone.utc)
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+
+
+def _object_id():
+    return secrets.token_hex(12)
+
+
+def _length(body, field, minimum, maximum, message):
+    value = body.get(field, '')
+    if not minimum <= len(value) <= maximum:
+        raise ApiError(400, message)
+    return value
+
+
+def _email(body):
+    value = body.get('email', '')
+    if not EMAIL_REGEX.match(value):
+        raise ApiError(400, "A valid email address is required")
+    return value.lower()
+
+
+def _boolean(value):
+    if value not in BOOLEANS:
+        raise ApiError(400, "Note completed status must be boolean")
+    return BOOLEANS[value]
+
+
+class NotesApiState:
+    """Usuários, tokens e notas em memória, protegidos por um único lock"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = {}         # id -> usuário
+        self.emails = {}        # email -> id
+        self.tokens = {}        # token -> id
+        self.notes = {}         # id -> nota (dict na ordem de inserção)
+
+    def _user(self, headers):
+        user_id = self.tokens.get(headers.get('x-auth-token', ''))
+        if user_id is None:
+            raise ApiError(401, UNAUTHORIZED)
+        return self.users[user_id]
+
+    @staticmethod
+    def _public_user(user, *fields):
+        return {field: user[field] for field in fields}
+
+    def _note(self, user, note_id):
+        if not OBJECT_ID_REGEX.match(note_id):
+            raise ApiError(400, "Note ID must be a valid ID")
+        note = self.notes.get(note_id)
+        if note is None or note['user_id'] != user['id']:
+            raise ApiError(404, "No note was found with the provided ID, Maybe it was deleted")
+        return note
+
+    # Health
+    def health_check(self, headers, body):
+        return 200, "Notes API is Running", None
+
+    # Users
+    def register(self, headers, body):
+        name = _length(body, 'name', 4, 30, "User name must be between 4 and 30 characters")
+        email = _email(body)
+        password = _length(body, 'password', 6, 30, "Password must be between 6 and 30 characters")
+        if body.get('confirmPassword', password) != password:
+            raise ApiError(400, "Passwords don't match!")
+        if email in self.emails:
+            raise ApiError(409, "An account already exists with the same email address")
+        user = {'id': _object_id(), 'name': name, 'email': email, 'password': password, 'phone': '', 'company': ''}
+        self.users[user['id']] = user
+        self.emails[email] = user['id']
+        return 201, "User account created successfully", self._public_user(user, 'id', 'name', 'email')
+
+    def login(self, headers, body):
+        email = _email(body)
+        password = _length(body, 'password', 6, 30, "Password must be between 6 and 30 characters")
+        user = self.users.get(self.emails.get(email))
+        if user is None or user['password'] != password:
+            raise ApiError(401, "Incorrect email address or password")
+        token = secrets.token_hex(32)
+        self.tokens[token] = user['id']
+        return 200, "Login successful", dict(self._public_user(user, 'id', 'name', 'email'), token=token)
+
+    def profile(self, headers, body):
+        user = self._user(headers)
+        return 200, "Profile successful", self._public_user(user, 'id', 'name', 'email', 'phone', 'company')
+
+    def update_profile(self, headers, body):
+        user = self._user(headers)
+        name = _length(body, 'name', 4, 30, "User name must be between 4 and 30 characters")
+        phone = body.get('phone', user['phone'])
+        if phone and not 8 <= len(re.sub(r'\D', '', phone)) <= 20:
+            raise ApiError(400, "Phone number should be between 8 and 20 digits")
+        user.update(name=name, phone=phone, company=body.get('company', user['company']))
+        return 200, "Profile updated successful", self._public_user(user, 'id', 'name', 'email', 'phone', 'company')
+
+    def change_password(self, headers, body):
+        user = self._user(headers)
+        current = _length(body, 'currentPassword', 6, 30, "Current password must be between 6 and 30 characters")
+        new = _length(body, 'newPassword', 6, 30, "New password must be between 6 and 30 characters")
+        if current != user['password']:
+            raise ApiError(400, "The current password is incorrect")
+        if new == current:
+            raise ApiError(400, "The new password should be different from the current password")
+        user['password'] = new
+        return 200, "The password was successfully updated", None
+
+    def logout(self, headers, body):
+        self._user(headers)
+        del self.tokens[headers['x-auth-token']]
+        return 200, "User has been successfully logged out", None
+
+    def delete_account(self, headers, body):
+        user = self._user(headers)
+        del self.users[user['id']]
+        del self.emails[user['email']]
+        self.tokens = {token: user_id for token, user_id in self.tokens.items() if user_id != user['id']}
+        self.notes = {note_id: note for note_id, note in self.notes.items() if note['user_id'] != user['id']}
+        return 200, "Account successfully deleted", None
+
+    # Notes
+    def _note_fields(self, body):
+        title = _length(body, 'title', 4, 100, "Title must be between 4 and 100 characters")
+        description = _length(body, 'description', 4, 1000, "Description must be between 4 and 1000 characters")
+        category = body.get('category', '')
+        if category not in NOTE_CATEGORIES:
+            raise ApiError(400, "Category must be one of the categories: Home, Work, Personal")
+        return {'title': title, 'description': description, 'category': category}
+
+    def create_note(self, headers, body):
+        user = self._user(headers)
+        fields = self._note_fields(body)
+        now = _now()
+        note = dict(id=_object_id(), **fields, completed=False, created_at=now, updated_at=now, user_id=user['id'])
+        self.notes[note['id']] = note
+        return 200, "Note successfully created", dict(note)
+
+    def list_notes(self, headers, body):
+        user = self._user(headers)
+        # Mais recente primeiro, como a API real
+        notes = [dict(note) for note in reversed(self.notes.values()) if note['user_id'] == user['id']]
+        return 200, "Notes successfully retrieved", notes
+
+    def get_note(self, headers, body, note_id):
+        user = self._user(headers)
+        return 200, "Note successfully retrieved", dict(self._note(user, note_id))
+
+    def update_note(self, headers, body, note_id):
+        user = self._user(headers)
+        note = self._note(user, note_id)
+        fields = self._note_fields(body)
+        completed = _boolean(body.get('completed', ''))
+        note.update(fields, completed=completed, updated_at=_now())
+        return 200, "Note successfully Updated", dict(note)
+
+    def update_note_status(self, headers, body, note_id):
+        user = self._user(headers)
+        note = self._note(user, note_id)
+        note.update(completed=_boolean(body.get('completed', '')), updated_at=_now())
+        return 200, "Note successfully Updated", dict(note)
+
+    def delete_note(self, headers, body, note_id):
+        user = self._user(headers)
+        note = self._note(user, note_id)
+        del self.notes[note['id']]
+        return 200, "Note successfully deleted", None
+
+
+ROUTES = [
+    ('GET', re.compile(r'^/health-check$'), NotesApiState.health_check),
+    ('POST', re.compile(r'^/users/register$'), NotesApiState.register),
+    ('POST', re.compile(r'^/users/login$'), NotesApiState.login),
+    ('GET', re.compile(r'^/users/profile$'), NotesApiState.profile),
+    ('PATCH', re.compile(r'^/users/profile$'), NotesApiState.update_profile),
+    ('POST', re.compile(r'^/users/change-password$'), NotesApiState.change_password),
+    ('DELETE', re.compile(r'^/users/logout$'), NotesApiState.logout),
+    ('DELETE', re.compile(r'^/users/delete-account$'), NotesApiState.delete_account),
+    ('POST', re.compile(r'^/notes$'), NotesApiState.create_note),
+    ('GET', re.compile(r'^/notes$'), NotesApiState.list_notes),
+    ('GET', re.compile(r'^/notes/([^/]+)$'), NotesApiState.get_note),
+    ('PUT', re.compile(r'^/notes/([^/]+)$'), NotesApiState.update_note),
+    ('PATCH', re.compile(r'^/notes/([^/]+)$'), NotesApiState.update_note_status),
+    ('DELETE', re.compile(r'^/notes/([^/]+)$'), NotesApiState.delete_note),
+]
+
+
+class NotesApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, para o pool do ApiClient reaproveitar as conexões
+    disable_nagle_algorithm = True  # cabeçalho e corpo saem em writes separados; sem isso cada resposta espera o ACK atrasado
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length).decode() if length else ''
+        if 'json' in self.headers.get('Content-Type', ''):
+            return json.loads(raw or '{}')
+        return {key: values[-1] for key, values in parse_qs(raw, keep_blank_values=True).items()}
+
+    def _dispatch(self):
+        path = urlsplit(self.path).path
+        body = self._body()
+        if not path.startswith(API_PREFIX):
+            return 404, "Not found", None
+        path = unquote(path[len(API_PREFIX):]) or '/'
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        state = self.server.state
+        for method, pattern, handler in ROUTES:
+            match = pattern.match(path)
+            if method == self.command and match:
+                try:
+                    with state.lock:
+                        return handler(state, headers, body, *match.groups())
+                except ApiError as error:
+                    return error.status, error.message, None
+        return 404, "Not found", None
+
+    def _respond(self):
+        start = time.perf_counter()
+        status, message, data = self._dispatch()
+        envelope = {'success': 200 <= status < 300, 'status': status, 'message': message}
+        if data is not None:
+            envelope['data'] = data
+        payload = json.dumps(envelope).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.handled(time.perf_counter() - start)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass  # sem log por requisição, que derrubaria o throughput
+
+
+class NotesApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), NotesApiHandler)
+        self.state = NotesApiState()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.handling_seconds = 0.0  # da leitura do corpo da requisição ao envio da resposta
+
+    def handled(self, seconds):
+        with self._lock:
+            self.requests += 1
+            self.handling_seconds += seconds
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        """Sobe o servidor em uma thread e retorna o próprio servidor"""
+        self._thread = threading.Thread(target=self.serve_forever, name='notes-api-standin', daemon=True)
+        self._thread.start()
+        with _running_lock:
+            _running.add(self.base_url)
+        return self
+
+    def stop(self):
+        with _running_lock:
+            _running.discard(self.base_url)
+        self.shutdown()
+        self.server_close()
+
+
+def is_running_standin(api_url):
+    """True quando `api_url` é de um servidor local iniciado por este processo"""
+    with _running_lock:
+        return api_url.rstrip('/') in _running
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    server = NotesApiServer(args.host, args.port)
+    print(f"Notes API stand-in em {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,24 @@
-import json
-import os
-import requests
+from datetime import datetime
 from faker import Faker
+from .support_cleanup import forget_account, record_account, record_token
+from .support_db import claim_seed_row
 
 
-def create_user_api(randomData, setup_database):
+def api_datetime(value):
+    """Converte o timestamp da API ('2025-01-01T10:00:00.000Z') para o DATETIME(3) em UTC do banco"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+def api_timestamp(value):
+    """Formata um DATETIME(3) do banco no mesmo formato de timestamp devolvido pela API"""
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+
+
+def create_user_api(context, setup_database, api_client):
+    # Reserva uma linha de seed livre (embaralhada) para este teste
+    user_index = claim_seed_row(setup_database, 'users', context.flow_id)
+
     cursor = setup_database.cursor(dictionary=True)
-    
-    # Seleciona um usuário aleatório do banco de dados
-    cursor.execute("SELECT `index`, name, email, password FROM users ORDER BY RAND() LIMIT 1")
+    cursor.execute("SELECT `index`, name, email, password FROM users WHERE `index` = %s", (user_index,))
     user = cursor.fetchone()
 
     user_index = user["index"]
@@ -18,8 +28,8 @@ def create_user_api(randomData, setup_database):
 
     body = {'confirmPassword': user_password, 'email': user_email, 'name': user_name, 'password': user_password}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/register", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    resp = api_client.post("/users/register", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -28,6 +38,7 @@ def create_user_api(randomData, setup_database):
     # Atualiza o ID do usuário na mesma linha no banco de dados
     cursor.execute("UPDATE users SET id = %s WHERE `index` = %s", (user_id, user_index))
     setup_database.commit()
+    record_account(setup_database, api_client.base_url, user_id, user_email, user_password)
 
     cursor.execute("SELECT id FROM users WHERE `index` = %s", (user_index,))
     db_user = cursor.fetchone()
@@ -40,17 +51,12 @@ def create_user_api(randomData, setup_database):
     assert user_name == respJS['data']['name']
     assert db_user['id'] == user_id #database validation
 
-    # Armazena apenas o índice do usuário escolhido
-    user_index_data = {"user_index": user_index}
+    # Guarda o índice do usuário escolhido para os próximos passos do fluxo
+    context.set_user(user_index)
 
-    with open(f"./tests/fixtures/file-{randomData}.json", 'w') as json_file:
-        json.dump(user_index_data, json_file, indent=4)
-
-def login_user_api(randomData, setup_database):
+def login_user_api(context, setup_database, api_client):
    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+    user_index = context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -65,8 +71,8 @@ def login_user_api(randomData, setup_database):
 
     body = {'email': user_email, 'password': user_password}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/login", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    resp = api_client.post("/users/login", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -76,6 +82,7 @@ def login_user_api(randomData, setup_database):
     # Atualiza o banco de dados com o token obtido
     cursor.execute("UPDATE users SET token = %s WHERE `index` = %s", (user_token, user_index))
     setup_database.commit()
+    record_token(setup_database, user_id, user_token)
 
     # Consulta o token no banco para validação
     cursor.execute("SELECT token FROM users WHERE `index` = %s", (user_index,))
@@ -89,43 +96,13 @@ def login_user_api(randomData, setup_database):
     assert user_id == respJS['data']['id']
     assert user_name == respJS['data']['name']
     assert db_user['token'] == user_token  # database validation
-
-    # Atualiza o objeto com o índice do usuário escolhido
-    user_index_data = {"user_index": user_index}
-
-    # Não precisa mais salvar no arquivo JSON, a informação foi atualizada no banco de dados
-    # Escreve o índice do usuário no arquivo JSON (se necessário)
-    with open(f"./tests/fixtures/file-{randomData}.json", 'w') as json_file:
-        json.dump(user_index_data, json_file, indent=4)
     
-def delete_user_api(randomData, setup_database):
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
-
-    # Conecta ao banco de dados para buscar o token do usuário pelo index
-    cursor = setup_database.cursor(dictionary=True)
-    cursor.execute("SELECT token FROM users WHERE `index` = %s", (user_index,))
-    user = cursor.fetchone()
-
-    # Atribui o valor do token à variável user_token
-    user_token = user["token"]
-
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.delete("https://practice.expandtesting.com/notes/api/users/delete-account", headers=headers)
-    respJS = resp.json()
-    print(respJS)
-
-    assert True == respJS['success']
-    assert 200 == respJS['status']
-    assert "Account successfully deleted" == respJS['message']
+def create_user4Notes_api(context, setup_database4Notes, api_client):
+    # Reserva uma linha de seed livre (embaralhada) para este teste
+    user_index = claim_seed_row(setup_database4Notes, 'users', context.flow_id)
 
-def create_user4Notes_api(randomData, setup_database4Notes):
     cursor = setup_database4Notes.cursor(dictionary=True)
-    
-    # Seleciona um usuário aleatório do banco de dados
-    cursor.execute("SELECT `index`, name, email, password FROM notes ORDER BY RAND() LIMIT 1")
+    cursor.execute("SELECT `index`, name, email, password FROM users WHERE `index` = %s", (user_index,))
     user = cursor.fetchone()
 
     user_index = user["index"]
@@ -135,8 +112,8 @@ def create_user4Notes_api(randomData, setup_database4Notes):
 
     body = {'confirmPassword': user_password, 'email': user_email, 'name': user_name, 'password': user_password}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/register", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    resp = api_client.post("/users/register", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -145,11 +122,12 @@ def create_user4Notes_api(randomData, setup_database4Notes):
     user_id = respJS['data']['id']
 
     # Atualiza o ID do usuário na mesma linha no banco de dados
-    cursor.execute("UPDATE notes SET id = %s WHERE `index` = %s", (user_id, user_index))
+    cursor.execute("UPDATE users SET id = %s WHERE `index` = %s", (user_id, user_index))
     setup_database4Notes.commit()
+    record_account(setup_database4Notes, api_client.base_url, user_id, user_email, user_password)
 
     # Consulta novamente o banco para verificar se o ID foi atualizado
-    cursor.execute("SELECT id FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("SELECT id FROM users WHERE `index` = %s", (user_index,))
     db_user = cursor.fetchone()
     cursor.close()
 
@@ -163,21 +141,16 @@ def create_user4Notes_api(randomData, setup_database4Notes):
     # Assertions com os dados do banco de dados (apenas para o 'id')
     assert db_user['id'] == user_id
 
-    # Armazena apenas o índice do usuário escolhido
-    user_index_data = {"user_index": user_index}
+    # Guarda o índice do usuário escolhido para os próximos passos do fluxo
+    context.set_user(user_index)
 
-    with open(f"./tests/fixtures/file-{randomData}.json", 'w') as json_file:
-        json.dump(user_index_data, json_file, indent=4)
-
-def login_user4Notes_api(randomData, setup_database4Notes):
+def login_user4Notes_api(context, setup_database4Notes, api_client):
    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+    user_index = context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT id, name, email, password FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("SELECT id, name, email, password FROM users WHERE `index` = %s", (user_index,))
     user = cursor.fetchone()
 
     # Atribui os valores do banco de dados às variáveis
@@ -188,8 +161,8 @@ def login_user4Notes_api(randomData, setup_database4Notes):
 
     body = {'email': user_email, 'password': user_password}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/login", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    resp = api_client.post("/users/login", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -197,11 +170,12 @@ def login_user4Notes_api(randomData, setup_database4Notes):
     user_token = respJS['data']['token']
 
     # Atualiza o banco de dados com o token obtido
-    cursor.execute("UPDATE notes SET token = %s WHERE `index` = %s", (user_token, user_index))
+    cursor.execute("UPDATE users SET token = %s WHERE `index` = %s", (user_token, user_index))
     setup_database4Notes.commit()
+    record_token(setup_database4Notes, user_id, user_token)
 
     # Consulta o banco para verificar se o token foi atualizado
-    cursor.execute("SELECT token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("SELECT token FROM users WHERE `index` = %s", (user_index,))
     db_user = cursor.fetchone()
     cursor.close()
 
@@ -215,58 +189,50 @@ def login_user4Notes_api(randomData, setup_database4Notes):
 
     # Assertion para validar o token no banco de dados
     assert db_user['token'] == user_token
-
-    # Atualiza o objeto com o índice do usuário escolhido
-    user_index_data = {"user_index": user_index}
-
-    # Não precisa mais salvar no arquivo JSON, a informação foi atualizada no banco de dados
-    # Escreve o índice do usuário no arquivo JSON (se necessário)
-    with open(f"./tests/fixtures/file-{randomData}.json", 'w') as json_file:
-        json.dump(user_index_data, json_file, indent=4)
     
-def delete_user4Notes_api(randomData, setup_database4Notes):
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def delete_user4Notes_api(context, setup_database4Notes, api_client):
+    user_index = context.user_index
 
-    # Conecta ao banco de dados para buscar o token do usuário pelo index
+    # Conecta ao banco de dados para buscar o id e o token do usuário pelo index
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("SELECT id, token FROM users WHERE `index` = %s", (user_index,))
     user = cursor.fetchone()
 
     # Atribui o valor do token à variável user_token
     user_token = user["token"]
 
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.delete("https://practice.expandtesting.com/notes/api/users/delete-account", headers=headers)
+    headers = {'x-auth-token': user_token}
+    resp = api_client.delete("/users/delete-account", headers=headers)
     respJS = resp.json()
     print(respJS)
 
     assert True == respJS['success']
     assert 200 == respJS['status']
     assert "Account successfully deleted" == respJS['message']
+    forget_account(setup_database4Notes, user["id"])
 
-def delete_note_api(randomData, setup_database4Notes):    
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def delete_note_api(context, setup_database4Notes, api_client):    
+    user_index = context.user_index
 
-    # Conecta ao banco de dados para buscar o note_id e o token do usuário pelo index
+    # Conecta ao banco de dados para buscar a última nota criada e o token do usuário pelo index
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteId, token FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT n.noteId, u.token FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
     user = cursor.fetchone()
+    cursor.close()
 
     # Atribui os valores do banco de dados às variáveis
     note_id = user["noteId"]
     user_token = user["token"]
 
     # Cabeçalhos da requisição
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
+    headers = {'x-auth-token': user_token}
     
     # Envia a requisição para deletar a nota
-    resp = requests.delete(f"https://practice.expandtesting.com/notes/api/notes/{note_id}", headers=headers)
+    resp = api_client.delete(f"/notes/{note_id}", headers=headers)
     respJS = resp.json()
     
     # Imprime a resposta e verifica se a operação foi bem-sucedida
@@ -275,15 +241,16 @@ def delete_note_api(randomData, setup_database4Notes):
     assert 200 == respJS['status']
     assert "Note successfully deleted" == respJS['message']
 
-def create_note_api(randomData, setup_database4Notes):
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def create_note_api(context, setup_database4Notes, api_client):
+    user_index = context.user_index
 
-    # Conecta ao banco de dados para buscar os dados do usuário e da nota pelo index
+    # Conecta ao banco de dados para buscar os dados do usuário e da nota modelo (noteId NULL) pelo index
     cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT id, token, noteTitle, noteDescription, noteCategory FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("""
+        SELECT u.id, u.token, n.noteTitle, n.noteDescription, n.noteCategory
+        FROM users u JOIN notes n ON n.user_index = u.`index` AND n.noteId IS NULL
+        WHERE u.`index` = %s
+    """, (user_index,))
     user_note = cursor.fetchone()
 
     # Atribui os valores do banco de dados às variáveis
@@ -295,8 +262,8 @@ def create_note_api(randomData, setup_database4Notes):
 
     body = {'category': note_category, 'description': note_description, 'title': note_title}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/notes", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    resp = api_client.post("/notes", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -314,34 +281,38 @@ def create_note_api(randomData, setup_database4Notes):
     assert note_title == respJS['data']['title']
     assert user_id == respJS['data']['user_id']
 
-    # Atualiza os dados da nota na linha do usuário correspondente ao user_index
-    cursor = setup_database4Notes.cursor()
+    # Grava a nota criada como uma nova linha do usuário (append, a nota modelo fica intacta)
     cursor.execute("""
-        UPDATE notes 
-        SET noteId = %s, noteCompleted = %s, 
-            noteCreatedAt = %s, noteUpdatedAt = %s
-        WHERE `index` = %s
-    """, (note_id, note_completed, note_created_at, note_updated_at, user_index))
+        INSERT INTO notes (user_index, noteId, noteTitle, noteDescription, noteCompleted, noteCreatedAt, noteUpdatedAt, noteCategory)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, (user_index, note_id, note_title, note_description, note_completed,
+          api_datetime(note_created_at), api_datetime(note_updated_at), note_category))
     setup_database4Notes.commit()
 
     # Consulta novamente para validar os dados salvos
-    cursor = setup_database4Notes.cursor(dictionary=True)
-    cursor.execute("SELECT noteId, noteCompleted, noteCreatedAt, noteUpdatedAt FROM notes WHERE `index` = %s", (user_index,))
+    cursor.execute("SELECT noteId, noteCompleted, noteCreatedAt, noteUpdatedAt FROM notes WHERE noteId = %s", (note_id,))
     db_note = cursor.fetchone()
     cursor.close()
 
     # Assertions com os dados do banco de dados
     assert db_note['noteId'] == note_id
-    assert bool(int(db_note['noteCompleted'])) == note_completed
-    assert db_note['noteCreatedAt'] == note_created_at
-    assert db_note['noteUpdatedAt'] == note_updated_at
+    assert bool(db_note['noteCompleted']) == note_completed
+    assert api_timestamp(db_note['noteCreatedAt']) == note_created_at
+    assert api_timestamp(db_note['noteUpdatedAt']) == note_updated_at
 
-    # Armazena apenas o índice do usuário escolhido no arquivo JSON
-    user_index_data = {"user_index": user_index}
-    
-    with open(f"./tests/fixtures/file-{randomData}.json", 'w') as json_file:
-        json.dump(user_index_data, json_file, indent=4)
+def clear_user_notes_api(user_index, setup_database4Notes, api_client):
+    """Exclui na API e no banco as notas criadas pelo usuário, deixando só a nota modelo"""
+    cursor = setup_database4Notes.cursor(dictionary=True)
+    cursor.execute("SELECT token FROM users WHERE `index` = %s", (user_index,))
+    user_token = cursor.fetchone()["token"]
 
-def delete_json_file(randomData):
-    os.remove(f"./tests/fixtures/file-{randomData}.json")
+    headers = {'x-auth-token': user_token}
+    respJS = api_client.get("/notes", headers=headers).json()
+    assert 200 == respJS['status'], respJS
+    for note in respJS['data']:
+        respJS = api_client.delete(f"/notes/{note['id']}", headers=headers).json()
+        assert 200 == respJS['status'], respJS
 
+    cursor.execute("DELETE FROM notes WHERE user_index = %s AND noteId IS NOT NULL", (user_index,))
+    setup_database4Notes.commit()
+    cursor.close()
@@ -0,0 +1,333 @@
+"""Versões assíncronas dos fluxos de usuário e nota do support_api.
+
+Cada ciclo de vida tem o seu próprio FlowContext em memória, então centenas de ciclos
+independentes podem rodar ao mesmo tempo no mesmo processo.
+As chamadas ao MySQL são bloqueantes e rodam em threads (asyncio.to_thread), cada uma
+com uma conexão emprestada do pool compartilhado (db_pool).
+"""
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+import httpx
+from .support_api import api_datetime
+from .support_cleanup import forget_account, record_account, record_token
+from .support_db import claim_seed_row
+from .support_http import DEFAULT_HEADERS, route, route_table
+from .support_latency import endpoint
+from .support_phases import timed, timed_json
+
+FORM = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+class AsyncApiClient:
+    """Cliente HTTP assíncrono (httpx.AsyncClient) com a mesma interface do ApiClient
+
+    `pool_size` limita as conexões abertas com a API; as requisições excedentes esperam
+    uma conexão livre em vez de falhar por timeout. Com um `latency` (LatencyRecorder) a
+    duração de cada requisição vai para o histograma do seu método e endpoint. `base_urls`
+    manda prefixos de caminho para outras bases, como no ApiClient.
+    """
+
+    def __init__(self, base_url, pool_size=10, headers=None, latency=None, base_urls=None):
+        self.base_url = base_url.rstrip('/')
+        self.base_path = urlsplit(self.base_url).path
+        self.routes = route_table(self.base_url, base_urls)
+        self.latency = latency
+        self.pool_size = pool_size
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url + '/',
+            headers=DEFAULT_HEADERS if headers is None else headers,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(30.0, pool=None),
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    async def _trace(self, event_name, info):
+        # Evento do httpcore emitido a cada nova conexão TCP
+        if event_name == 'connection.connect_tcp.complete':
+            with self._lock:
+                self.connections_opened += 1
+
+    @property
+    def connections_reused(self):
+        return self.requests - self.connections_opened
+
+    async def request(self, method, path, **kwargs):
+        with self._lock:
+            self.requests += 1
+        extensions = dict(kwargs.pop('extensions', None) or {}, trace=self._trace)
+        base_url, base_path = route(self.routes, path)
+        # Caminho relativo ao base_url do httpx; os prefixos mapeados vão com a URL completa
+        url = path.lstrip('/') if base_url == self.base_url else f"{base_url}/{path.lstrip('/')}"
+        start = time.perf_counter()
+        with timed('http'):
+            response = await self.client.request(method, url, extensions=extensions, **kwargs)
+        if self.latency is not None:
+            self.latency.record(method, endpoint(path, base_path), time.perf_counter() - start)
+        return timed_json(response)
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
+
+    async def put(self, path, **kwargs):
+        return await self.request('PUT', path, **kwargs)
+
+    async def patch(self, path, **kwargs):
+        return await self.request('PATCH', path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request('DELETE', path, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+def _fetch_one(db_pool, database, query, params):
+    with db_pool.lease(database) as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        cursor.close()
+    return row
+
+
+def _update_and_fetch(db_pool, database, update, update_params, query, params):
+    with db_pool.lease(database) as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(update, update_params)
+        conn.commit()
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        cursor.close()
+    return row
+
+
+def _with_connection(db_pool, database, function, *args):
+    with db_pool.lease(database) as conn:
+        return function(conn, *args)
+
+
+def _claim_user(db_pool, database, flow_id):
+    with db_pool.lease(database) as conn:
+        user_index = claim_seed_row(conn, 'users', flow_id)
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT `index`, name, email, password FROM users WHERE `index` = %s", (user_index,))
+        user = cursor.fetchone()
+        cursor.close()
+    return user
+
+
+async def create_user4Notes_api_async(context, db_pool, database, api_client):
+    """Reserva um usuário de seed, registra na API, grava o id e guarda o user_index no contexto"""
+    user = await asyncio.to_thread(_claim_user, db_pool, database, context.flow_id)
+    body = {'confirmPassword': user['password'], 'email': user['email'], 'name': user['name'], 'password': user['password']}
+    resp = await api_client.post("/users/register", headers=FORM, data=body)
+    respJS = resp.json()
+
+    assert True == respJS['success']
+    assert 201 == respJS['status']
+    assert "User account created successfully" == respJS['message']
+    assert user['email'] == respJS['data']['email']
+    assert user['name'] == respJS['data']['name']
+
+    user_id = respJS['data']['id']
+    db_user = await asyncio.to_thread(
+        _update_and_fetch, db_pool, database,
+        "UPDATE users SET id = %s WHERE `index` = %s", (user_id, user['index']),
+        "SELECT id FROM users WHERE `index` = %s", (user['index'],)
+    )
+    assert db_user['id'] == user_id  # database validation
+    await asyncio.to_thread(
+        _with_connection, db_pool, database, record_account, api_client.base_url, user_id, user['email'], user['password']
+    )
+    context.set_user(user['index'])
+
+
+async def login_user4Notes_api_async(context, db_pool, database, api_client):
+    user_index = context.user_index
+    user = await asyncio.to_thread(
+        _fetch_one, db_pool, database, "SELECT id, name, email, password FROM users WHERE `index` = %s", (user_index,)
+    )
+    body = {'email': user['email'], 'password': user['password']}
+    resp = await api_client.post("/users/login", headers=FORM, data=body)
+    respJS = resp.json()
+
+    assert True == respJS['success']
+    assert 200 == respJS['status']
+    assert "Login successful" == respJS['message']
+    assert user['email'] == respJS['data']['email']
+    assert user['id'] == respJS['data']['id']
+    assert user['name'] == respJS['data']['name']
+
+    user_token = respJS['data']['token']
+    db_user = await asyncio.to_thread(
+        _update_and_fetch, db_pool, database,
+        "UPDATE users SET token = %s WHERE `index` = %s", (user_token, user_index),
+        "SELECT token FROM users WHERE `index` = %s", (user_index,)
+    )
+    assert db_user['token'] == user_token  # database validation
+    await asyncio.to_thread(_with_connection, db_pool, database, record_token, user['id'], user_token)
+    return user_token
+
+
+async def create_note_api_async(context, db_pool, database, api_client):
+    """Cria na API a nota modelo do usuário e grava a nota criada como uma nova linha; retorna o noteId"""
+    user_index = context.user_index
+    user_note = await asyncio.to_thread(_fetch_one, db_pool, database, """
+        SELECT u.id, u.token, n.noteTitle, n.noteDescription, n.noteCategory
+        FROM users u JOIN notes n ON n.user_index = u.`index` AND n.noteId IS NULL
+        WHERE u.`index` = %s
+    """, (user_index,))
+    body = {'category': user_note['noteCategory'], 'description': user_note['noteDescription'], 'title': user_note['noteTitle']}
+    resp = await api_client.post("/notes", headers=dict(FORM, **{'x-auth-token': user_note['token']}), data=body)
+    respJS = resp.json()
+
+    assert True == respJS['success']
+    assert 200 == respJS['status']
+    assert "Note successfully created" == respJS['message']
+    assert user_note['noteCategory'] == respJS['data']['category']
+    assert user_note['noteDescription'] == respJS['data']['description']
+    assert user_note['noteTitle'] == respJS['data']['title']
+    assert user_note['id'] == respJS['data']['user_id']
+
+    note = respJS['data']
+    db_note = await asyncio.to_thread(
+        _update_and_fetch, db_pool, database, """
+            INSERT INTO notes (user_index, noteId, noteTitle, noteDescription, noteCompleted, noteCreatedAt, noteUpdatedAt, noteCategory)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (user_index, note['id'], note['title'], note['description'], note['completed'],
+              api_datetime(note['created_at']), api_datetime(note['updated_at']), note['category']),
+        "SELECT noteId FROM notes WHERE noteId = %s", (note['id'],)
+    )
+    assert db_note['noteId'] == note['id']  # database validation
+    return note['id']
+
+
+_LATEST_NOTE = """
+    SELECT n.noteId, n.noteTitle, n.noteDescription, n.noteCategory, u.token
+    FROM notes n JOIN users u ON u.`index` = n.user_index
+    WHERE n.user_index = %s AND n.noteId IS NOT NULL
+    ORDER BY n.`index` DESC LIMIT 1
+"""
+
+
+async def get_notes_api_async(context, db_pool, database, api_client):
+    """Lista as notas do usuário na API; retorna os noteIds"""
+    user = await asyncio.to_thread(_fetch_one, db_pool, database, "SELECT token FROM users WHERE `index` = %s", (context.user_index,))
+    resp = await api_client.get("/notes", headers={'x-auth-token': user['token']})
+    respJS = resp.json()
+
+    assert True == respJS['success']
+    assert 200 == respJS['status']
+    assert "Notes successfully retrieved" == respJS['message']
+    return [note['id'] for note in respJS['data']]
+
+
+async def update_note_api_async(context, db_pool, database, api_client):
+    """Atualiza na API a última nota criada (título, descrição e categoria invertidos) e grava no banco"""
+    note = await asyncio.to_thread(_fetch_one, db_pool, database, _LATEST_NOTE, (context.user_index,))
+    body = {'category': note['noteCategory'], 'completed': "false",
+            'description': note['noteDescription'][::-1], 'title': note['noteTitle'][::-1]}
+    resp = await api_client.put(f"/notes/{note['noteId']}", headers=dict(FORM, **{'x-auth-token': note['token']}), data=body)
+    respJS = resp.json()
+
+    assert True == respJS['success']
+    assert 200 == respJS['status']
+    assert "Note successfully Updated" == respJS['message']
+    assert body['title'] == respJS['data']['title']
+    assert body['description'] == respJS['data']['description']
+
+    data = respJS['data']
+    db_note = await asyncio.to_thread(
+        _update_and_fetch, db_pool, database, """
+            UPDATE notes SET noteTitle = %s, noteDescription = %s, noteCategory = %s, noteCompleted = %s, noteUpdatedAt = %s
+            WHERE noteId = %s
+        """, (data['title'], data['description'], data['category'], data['completed'], api_datetime(data['updated_at']), data['id']),
+        "SELECT noteTitle FROM notes WHERE noteId = %s", (data['id'],)
+    )
+    assert db_note['noteTitle'] == data['title']  # database validation
+
+
+async def update_note_status_api_async(context, db_pool, database, api_client):
+    """Marca na API a última nota criada como concluída e grava no banco"""
+    note = await asyncio.to_thread(_fetch_one, db_pool, database, _LATEST_NOTE, (context.user_index,))
+    resp = await api_client.patch(f"/notes/{note['noteId']}", headers=dict(FORM, **{'x-auth-token': note['token']}),
+                                  data={'completed': "true"})
+    respJS = resp.json()
+
+    assert True == respJS['success']
+    assert 200 == respJS['status']
+    assert "Note successfully Updated" == respJS['message']
+    assert True == respJS['data']['completed']
+
+    data = respJS['data']
+    db_note = await asyncio.to_thread(
+        _update_and_fetch, db_pool, database,
+        "UPDATE notes SET noteCompleted = %s, noteUpdatedAt = %s WHERE noteId = %s",
+        (data['completed'], api_datetime(data['updated_at']), data['id']),
+        "SELECT noteCompleted FROM notes WHERE noteId = %s", (data['id'],)
+    )
+    assert bool(db_note['noteCompleted']) == data['completed']  # database validation
+
+
+async def delete_note_api_async(context, db_pool, database, api_client):
+    user_index = context.user_index
+    note = await asyncio.to_thread(_fetch_one, db_pool, database, """
+        SELECT n.noteId, u.token FROM notes n JOIN users u ON u.`index` = n.user_index
+        WHERE n.user_index = %s AND n.noteId IS NOT NULL
+        ORDER BY n.`index` DESC LIMIT 1
+    """, (user_index,))
+    resp = await api_client.delete(f"/notes/{note['noteId']}", headers={'x-auth-token': note['token']})
+    respJS = resp.json()
+
+    assert True == respJS['success']
+    assert 200 == respJS['status']
+    assert "Note successfully deleted" == respJS['message']
+
+
+async def delete_user4Notes_api_async(context, db_pool, database, api_client):
+    user_index = context.user_index
+    user = await asyncio.to_thread(_fetch_one, db_pool, database, "SELECT id, token FROM users WHERE `index` = %s", (user_index,))
+    resp = await api_client.delete("/users/delete-account", headers={'x-auth-token': user['token']})
+    respJS = resp.json()
+
+    assert True == respJS['success']
+    assert 200 == respJS['status']
+    assert "Account successfully deleted" == respJS['message']
+    await asyncio.to_thread(_with_connection, db_pool, database, forget_account, user['id'])
+
+
+async def note_lifecycle_api_async(context, db_pool, database, api_client):
+    """Ciclo completo: cria usuário → login → cria nota → exclui nota → exclui usuário; retorna o user_index"""
+    await create_user4Notes_api_async(context, db_pool, database, api_client)
+    await login_user4Notes_api_async(context, db_pool, database, api_client)
+    await create_note_api_async(context, db_pool, database, api_client)
+    await delete_note_api_async(context, db_pool, database, api_client)
+    await delete_user4Notes_api_async(context, db_pool, database, api_client)
+    return context.user_index
+
+
+async def run_concurrently(flows, concurrency):
+    """Executa as corrotinas de `flows` com no máximo `concurrency` ao mesmo tempo
+
+    Todas rodam até o fim; os resultados (ou exceções) voltam na ordem de `flows`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(flow):
+        async with semaphore:
+            return await flow
+
+    return await asyncio.gather(*(limited(flow) for flow in flows), return_exceptions=True)
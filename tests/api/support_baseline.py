@@ -0,0 +1,91 @@
+"""Baseline de desempenho: amostras de runs anteriores e o modelo de ruído da comparação.
+
+O arquivo guarda, para cada teste (tempo da fase call), cada endpoint (p50 da latência)
+e cada etapa do setup da sessão (seed de uma tabela, preenchimento de um pool de
+usuários, ver record_setup), as últimas `window` amostras, uma por run salvo. Um valor atual só é
+regressão quando passa da mediana das amostras por mais do que o maior entre:
+    a tolerância relativa (ex.: 20% da mediana);
+    o delta mínimo absoluto (ms), para testes e endpoints muito rápidos;
+    `mad_k` desvios do ruído observado (MAD das amostras × 1.4826 ≈ desvio padrão).
+Com menos de `min_samples` amostras a regressão é só sinalizada, nunca falha o run.
+"""
+import json
+import statistics
+from collections import namedtuple
+from pathlib import Path
+import pytest
+
+# 2: testes medidos só na fase call (na 1 eram setup + call + teardown)
+BASELINE_VERSION = 2
+SECTIONS = ('tests', 'endpoints', 'setup')
+# Converte o MAD em uma estimativa do desvio padrão para dados ~normais
+MAD_TO_SIGMA = 1.4826
+
+Regression = namedtuple('Regression', 'section key current median limit samples gating')
+
+setup_timings_key = pytest.StashKey()
+
+
+def record_setup(config, key, ms):
+    """Guarda o tempo de uma etapa do setup da sessão para o baseline (seção `setup`)
+
+    As fixtures de sessão rodam no setup do primeiro teste que as pede, fora do tempo
+    comparado de cada teste; assim uma regressão no seed ou no pool continua visível.
+    """
+    config.stash.setdefault(setup_timings_key, {}).setdefault(key, []).append(ms)
+
+
+def empty_baseline():
+    return {'version': BASELINE_VERSION, **{section: {} for section in SECTIONS}}
+
+
+def load_baseline(path):
+    """Baseline gravado em `path`, ou None se o arquivo não existe"""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    with open(path) as json_file:
+        baseline = json.load(json_file)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported baseline version {baseline.get('version')!r}")
+    # Baselines gravados antes da seção `setup` existir
+    for section in SECTIONS:
+        baseline.setdefault(section, {})
+    return baseline
+
+
+def merge_samples(baseline, current, window):
+    """Acrescenta os valores do run atual às amostras, mantendo as `window` mais recentes"""
+    merged = empty_baseline() if baseline is None else baseline
+    for section in SECTIONS:
+        for key, value in current.get(section, {}).items():
+            merged[section][key] = (merged[section].get(key, []) + [value])[-window:]
+    return merged
+
+
+def save_baseline(path, baseline):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as json_file:
+        json.dump(baseline, json_file, indent=4, sort_keys=True)
+
+
+def noise_limit(samples, tolerance, mad_k, min_delta):
+    """(mediana, limite) a partir do qual um valor novo é mais lento que o ruído"""
+    median = statistics.median(samples)
+    mad = statistics.median(abs(sample - median) for sample in samples)
+    return median, median + max(median * tolerance, min_delta, mad_k * MAD_TO_SIGMA * mad)
+
+
+def compare(baseline, current, tolerance, mad_k, min_delta, min_samples):
+    """Regressões do run atual em relação ao baseline, das maiores para as menores"""
+    regressions = []
+    for section in SECTIONS:
+        for key, value in current.get(section, {}).items():
+            samples = baseline[section].get(key)
+            if not samples:
+                continue
+            median, limit = noise_limit(samples, tolerance, mad_k, min_delta)
+            if value > limit:
+                regressions.append(Regression(section, key, value, median, limit, len(samples), len(samples) >= min_samples))
+    return sorted(regressions, key=lambda regression: regression.current / regression.median if regression.median else float('inf'), reverse=True)
@@ -0,0 +1,79 @@
+from .support_baseline import (
+    BASELINE_VERSION, MAD_TO_SIGMA, compare, empty_baseline, load_baseline, merge_samples, noise_limit, save_baseline,
+)
+
+
+def baseline_with(tests=None, endpoints=None):
+    baseline = empty_baseline()
+    baseline['tests'].update(tests or {})
+    baseline['endpoints'].update(endpoints or {})
+    return baseline
+
+
+def test_noise_limit_zero_mad_uses_tolerance_or_min_delta():
+    # Amostras idênticas: MAD zero, o limite vem só da tolerância ou do delta mínimo
+    assert noise_limit([100.0, 100.0, 100.0], tolerance=0.2, mad_k=3, min_delta=5) == (100.0, 120.0)
+    assert noise_limit([10.0, 10.0, 10.0], tolerance=0.2, mad_k=3, min_delta=50) == (10.0, 60.0)
+
+
+def test_noise_limit_uses_mad_when_noisier_than_tolerance():
+    median, limit = noise_limit([100.0, 60.0, 140.0], tolerance=0.2, mad_k=3, min_delta=5)
+    assert median == 100.0
+    assert limit == 100.0 + 3 * MAD_TO_SIGMA * 40.0
+
+
+def test_noise_limit_single_sample():
+    assert noise_limit([200.0], tolerance=0.1, mad_k=3, min_delta=5) == (200.0, 220.0)
+
+
+def test_compare_flags_but_does_not_gate_below_min_samples():
+    baseline = baseline_with(tests={'t::a': [100.0, 100.0]})
+    regressions = compare(baseline, {'tests': {'t::a': 150.0}, 'endpoints': {}},
+                          tolerance=0.2, mad_k=3, min_delta=5, min_samples=3)
+    assert [(r.key, r.samples, r.gating) for r in regressions] == [('t::a', 2, False)]
+
+
+def test_compare_gates_with_min_samples():
+    baseline = baseline_with(endpoints={'GET /notes': [100.0, 100.0, 100.0]})
+    regressions = compare(baseline, {'tests': {}, 'endpoints': {'GET /notes': 121.0}},
+                          tolerance=0.2, mad_k=3, min_delta=5, min_samples=3)
+    assert len(regressions) == 1
+    assert regressions[0].section == 'endpoints'
+    assert regressions[0].median == 100.0
+    assert regressions[0].limit == 120.0
+    assert regressions[0].gating
+
+
+def test_compare_ignores_values_within_limit_and_unknown_keys():
+    baseline = baseline_with(tests={'t::a': [100.0, 100.0, 100.0]})
+    current = {'tests': {'t::a': 120.0, 't::new': 999.0}, 'endpoints': {}}
+    assert compare(baseline, current, tolerance=0.2, mad_k=3, min_delta=5, min_samples=3) == []
+
+
+def test_compare_sorts_by_relative_slowdown():
+    baseline = baseline_with(tests={'t::a': [100.0] * 3, 't::b': [10.0] * 3, 't::zero': [0.0] * 3})
+    current = {'tests': {'t::a': 300.0, 't::b': 100.0, 't::zero': 10.0}, 'endpoints': {}}
+    regressions = compare(baseline, current, tolerance=0.2, mad_k=3, min_delta=5, min_samples=3)
+    # Mediana zero não tem razão definida e vai na frente
+    assert [r.key for r in regressions] == ['t::zero', 't::b', 't::a']
+
+
+def test_merge_samples_keeps_window():
+    merged = merge_samples(None, {'tests': {'t::a': 1.0}, 'endpoints': {}}, window=2)
+    merged = merge_samples(merged, {'tests': {'t::a': 2.0}, 'endpoints': {}}, window=2)
+    merged = merge_samples(merged, {'tests': {'t::a': 3.0}, 'endpoints': {}}, window=2)
+    assert merged['tests'] == {'t::a': [2.0, 3.0]}
+
+
+def test_setup_section_is_compared_like_tests():
+    baseline = baseline_with()
+    baseline['setup']['seed users.users (1000 rows)'] = [400.0, 410.0, 390.0]
+    current = {'tests': {}, 'endpoints': {}, 'setup': {'seed users.users (1000 rows)': 900.0}}
+    (regression,) = compare(baseline, current, tolerance=0.2, mad_k=3, min_delta=50, min_samples=3)
+    assert (regression.section, regression.gating) == ('setup', True)
+
+
+def test_load_baseline_adds_missing_sections(tmp_path):
+    path = tmp_path / 'baseline.json'
+    save_baseline(path, {'version': BASELINE_VERSION, 'tests': {'t::a': [1.0]}, 'endpoints': {}})
+    assert load_baseline(path)['setup'] == {}
@@ -0,0 +1,165 @@
+"""Registro das contas criadas na API e limpeza concorrente no fim da sessão.
+
+Toda conta registrada pelos testes é gravada, com e-mail, senha e o último token, na
+tabela `accounts` do banco ACCOUNTS_DATABASE, que nunca é excluído. Cada registro leva o
+SESSION_OWNER do processo que criou a conta. Os testes não excluem mais as contas um a
+um: no fim da sessão as contas desta sessão são excluídas em paralelo. As que sobram de
+runs interrompidos são varridas no início de uma sessão seguinte, só depois de
+ORPHAN_MIN_AGE segundos, para não excluir as contas de outra sessão em andamento que use
+o mesmo banco; ou com o sweeper (python -m tests.api.account_sweeper).
+Contas do servidor local (--api-standin) não são registradas: elas vivem na memória do
+processo e somem com ele, e a porta aleatória não seria encontrada por nenhuma varredura.
+"""
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from .standin_api import is_running_standin
+from .support_db import create_seed_database, report_line
+
+ACCOUNTS_DATABASE = os.getenv('DB_ACCOUNTS_NAME', 'api_accounts')
+ACCOUNTS = f"`{ACCOUNTS_DATABASE}`.accounts"
+# Um por processo: cada worker do xdist é dono só das contas que ele mesmo criou
+SESSION_OWNER = uuid.uuid4().hex
+ORPHAN_MIN_AGE = int(os.getenv('ACCOUNT_ORPHAN_MINUTES', '60')) * 60
+FORM = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+ACCOUNTS_TABLE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {ACCOUNTS} (
+        user_id CHAR(24) PRIMARY KEY,
+        api_url VARCHAR(255) NOT NULL,
+        source_database VARCHAR(64) NOT NULL,
+        email VARCHAR(255) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        token CHAR(64) NULL,
+        owner CHAR(32) NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        INDEX accounts_source (api_url, source_database),
+        INDEX accounts_owner (owner)
+    )
+"""
+
+
+def create_accounts_table(pools):
+    create_seed_database(pools, ACCOUNTS_DATABASE)
+    with pools.lease() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ACCOUNTS_TABLE_DDL)
+        # Registros criados antes da coluna owner: viram órfãos comuns, varridos por idade
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'accounts' AND COLUMN_NAME = 'owner'
+        """, (ACCOUNTS_DATABASE,))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"ALTER TABLE {ACCOUNTS} ADD COLUMN owner CHAR(32) NULL AFTER token, ADD INDEX accounts_owner (owner)")
+        cursor.close()
+
+
+def _execute(connection, statement, params):
+    cursor = connection.cursor()
+    cursor.execute(statement, params)
+    connection.commit()
+    cursor.close()
+
+
+def record_account(connection, api_url, user_id, email, password, owner=SESSION_OWNER):
+    """Registra a conta recém-criada; o banco de seed da conexão vira o `source_database`"""
+    if is_running_standin(api_url):
+        return
+    _execute(connection, f"""
+        INSERT INTO {ACCOUNTS} (user_id, api_url, source_database, email, password, owner)
+        VALUES (%s, %s, DATABASE(), %s, %s, %s) AS new
+        ON DUPLICATE KEY UPDATE email = new.email, password = new.password, owner = new.owner
+    """, (user_id, api_url, email, password, owner))
+
+
+def record_token(connection, user_id, token):
+    _execute(connection, f"UPDATE {ACCOUNTS} SET token = %s WHERE user_id = %s", (token, user_id))
+
+
+def record_password(connection, user_id, password):
+    _execute(connection, f"UPDATE {ACCOUNTS} SET password = %s WHERE user_id = %s", (password, user_id))
+
+
+def forget_account(connection, user_id):
+    """Remove a conta do registro depois que o próprio teste a excluiu"""
+    _execute(connection, f"DELETE FROM {ACCOUNTS} WHERE user_id = %s", (user_id,))
+
+
+def forget_source(connection, api_url, database):
+    """Remove do registro, sem chamar a API, as contas de uma API e banco de seed"""
+    _execute(connection, f"DELETE FROM {ACCOUNTS} WHERE api_url = %s AND source_database = %s", (api_url, database))
+
+
+def delete_account(api_client, account):
+    """Exclui a conta na API; retorna True quando ela não existe mais
+
+    Se o token registrado não vale mais (logout, expiração), faz login de novo com
+    e-mail e senha. Login recusado com 401 significa que a conta já foi excluída.
+    """
+    try:
+        if account['token']:
+            respJS = api_client.delete("/users/delete-account", headers={'x-auth-token': account['token']}).json()
+            if respJS['status'] == 200:
+                return True
+        body = {'email': account['email'], 'password': account['password']}
+        respJS = api_client.post("/users/login", headers=FORM, data=body).json()
+        if respJS['status'] == 401:
+            return True
+        if respJS['status'] != 200:
+            return False
+        respJS = api_client.delete("/users/delete-account", headers={'x-auth-token': respJS['data']['token']}).json()
+        return respJS['status'] == 200
+    except (requests.RequestException, ValueError, KeyError):
+        return False  # fica no registro para a próxima varredura
+
+
+def delete_recorded_accounts(pools, api_client, database=None, owner=None, min_age=None):
+    """Exclui em paralelo as contas registradas para a API do `api_client`
+
+    Com `database` só as contas criadas a partir daquele banco de seed, com `owner` só as
+    da sessão dona, e com `min_age` só as registradas há pelo menos tantos segundos.
+    Retorna (excluídas, falhas).
+    """
+    query = f"SELECT user_id, email, password, token FROM {ACCOUNTS} WHERE api_url = %s"
+    params = (api_client.base_url,)
+    if database is not None:
+        query += " AND source_database = %s"
+        params += (database,)
+    if owner is not None:
+        query += " AND owner = %s"
+        params += (owner,)
+    if min_age is not None:
+        query += " AND created_at < NOW() - INTERVAL %s SECOND"
+        params += (min_age,)
+    with pools.lease() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(query, params)
+        accounts = cursor.fetchall()
+        cursor.close()
+    if not accounts:
+        return 0, 0
+
+    with ThreadPoolExecutor(max_workers=max(1, min(len(accounts), api_client.pool_size))) as executor:
+        results = list(executor.map(lambda account: delete_account(api_client, account), accounts))
+    deleted = [account['user_id'] for account, ok in zip(accounts, results) if ok]
+    if deleted:
+        with pools.lease() as conn:
+            placeholders = ', '.join(['%s'] * len(deleted))
+            _execute(conn, f"DELETE FROM {ACCOUNTS} WHERE user_id IN ({placeholders})", tuple(deleted))
+    return len(deleted), len(accounts) - len(deleted)
+
+
+def sweep_accounts(config, pools, database, api_client, reason, owner=None, min_age=None):
+    """Exclui as contas registradas a partir de `database` (filtros do delete_recorded_accounts) e informa no terminal"""
+    create_accounts_table(pools)
+    start = time.perf_counter()
+    deleted, failed = delete_recorded_accounts(pools, api_client, database, owner, min_age)
+    if deleted or failed:
+        elapsed = time.perf_counter() - start
+        message = f"\n🧹 {deleted} contas {reason} de {database} excluídas em {elapsed:.2f}s"
+        if failed:
+            message += f" ({failed} falharam e ficam registradas para o sweeper)"
+        report_line(config, message)
+    return deleted, failed
@@ -0,0 +1,34 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from .support_phases import timed
+
+# Pasta dos arquivos de depuração, resolvida a partir deste módulo (independe do diretório atual)
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / 'fixtures'
+
+
+@dataclass
+class FlowContext:
+    """Estado passado entre os helpers de um mesmo teste (antes no arquivo JSON da fixture)
+
+    `flow_id` identifica o teste ao reservar linhas de seed. Com `persist_dir` o estado
+    também é gravado em `file-{flow_id}.json` a cada alteração, só para depuração.
+    """
+    flow_id: str
+    user_index: Optional[int] = None
+    persist_dir: Optional[Path] = None
+
+    @property
+    def persist_path(self):
+        return None if self.persist_dir is None else self.persist_dir / f"file-{self.flow_id}.json"
+
+    def set_user(self, user_index):
+        self.user_index = user_index
+        self.save()
+
+    def save(self):
+        if self.persist_path is None:
+            return
+        with timed('file_io'), open(self.persist_path, 'w') as json_file:
+            json.dump({"user_index": self.user_index}, json_file, indent=4)
@@ -0,0 +1,166 @@
+import numpy as np
+from faker import Faker
+from faker.providers.company.en_US import Provider as _CompanyProvider
+from faker.providers.internet.en_US import Provider as _InternetProvider
+from faker.providers.lorem.en_US import Provider as _LoremProvider
+from faker.providers.person.en_US import Provider as _PersonProvider
+
+# Colunas preenchidas pelo seed (id, token e os campos da nota criada via API ficam NULL)
+USER_COLUMNS = ('name', 'email', 'password', 'company', 'phone')
+NOTE_COLUMNS = ('noteTitle', 'noteDescription', 'noteCategory')
+NOTE_CATEGORIES = ('Home', 'Personal', 'Work')
+
+fake = Faker()
+
+
+def _unique_email(emails):
+    # A coluna email é UNIQUE, então evita repetições mesmo em cargas grandes
+    while True:
+        email = fake.lexify(text='??').lower() + fake.company_email().replace("-", "")
+        if email not in emails:
+            emails.add(email)
+            return email
+
+
+def fake_users(count):
+    """Gera `count` linhas para a tabela users, na ordem de USER_COLUMNS"""
+    emails = set()
+    for _ in range(count):
+        name = fake.name()
+        email = _unique_email(emails)
+        password = fake.password(length=12, special_chars=False, digits=True, upper_case=True, lower_case=True)
+        company = fake.company()[:24]
+        phone = fake.bothify(text='############')
+        yield (name, email, password, company, phone)
+
+
+def fake_notes(count):
+    """Gera `count` notas modelo, na ordem de NOTE_COLUMNS"""
+    for _ in range(count):
+        noteTitle = fake.sentence(4)
+        noteDescription = fake.sentence(5)
+        noteCategory = fake.random_element(elements=NOTE_CATEGORIES)
+        yield (noteTitle, noteDescription, noteCategory)
+
+
+# Gerador vetorizado: monta colunas inteiras de uma vez a partir dos vocabulários do Faker
+_FIRST_NAMES = np.array(list(_PersonProvider.first_names))
+_FIRST_WEIGHTS = np.array(list(_PersonProvider.first_names.values()), dtype=float)
+_FIRST_WEIGHTS /= _FIRST_WEIGHTS.sum()
+_LAST_NAMES = np.array(list(_PersonProvider.last_names))
+_LAST_WEIGHTS = np.array(list(_PersonProvider.last_names.values()), dtype=float)
+_LAST_WEIGHTS /= _LAST_WEIGHTS.sum()
+_COMPANY_SUFFIXES = np.array(_CompanyProvider.company_suffixes)
+_TLDS = np.array(_InternetProvider.tlds)
+_WORDS = np.array(_LoremProvider.word_list)
+_CATEGORIES = np.array(NOTE_CATEGORIES)
+
+_DIGITS = np.frombuffer(b'0123456789', dtype='S1')
+_LOWER = np.frombuffer(b'abcdefghijklmnopqrstuvwxyz', dtype='S1')
+_UPPER = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', dtype='S1')
+_ALNUM = np.concatenate([_LOWER, _UPPER, _DIGITS])
+_BASE36 = np.concatenate([_DIGITS, _LOWER])
+
+
+def _join(*parts):
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return result
+
+
+def _as_strings(chars):
+    # Reinterpreta uma matriz (n, largura) de bytes como n strings de tamanho fixo
+    width = chars.shape[1]
+    return np.ascontiguousarray(chars).view(f'S{width}').ravel().astype(f'U{width}')
+
+
+def _random_chars(rng, alphabet, n, width):
+    return _as_strings(alphabet[rng.integers(0, len(alphabet), size=(n, width))])
+
+
+def _base36(numbers, width=6):
+    powers = 36 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return _as_strings(_BASE36[(numbers[:, None] // powers) % 36])
+
+
+def _passwords(rng, n):
+    # 12 caracteres com pelo menos uma minúscula, uma maiúscula e um dígito, como o fake.password()
+    chars = _ALNUM[rng.integers(0, len(_ALNUM), size=(n, 12))]
+    positions = rng.permuted(np.tile(np.arange(12), (n, 1)), axis=1)[:, :3]
+    rows = np.arange(n)
+    chars[rows, positions[:, 0]] = _LOWER[rng.integers(0, len(_LOWER), n)]
+    chars[rows, positions[:, 1]] = _UPPER[rng.integers(0, len(_UPPER), n)]
+    chars[rows, positions[:, 2]] = _DIGITS[rng.integers(0, len(_DIGITS), n)]
+    return _as_strings(chars)
+
+
+def _companies(rng, n):
+    last = [_LAST_NAMES[rng.choice(len(_LAST_NAMES), n, p=_LAST_WEIGHTS)] for _ in range(3)]
+    formats = rng.integers(0, 3, n)
+    suffixed = _join(last[0], ' ', _COMPANY_SUFFIXES[rng.integers(0, len(_COMPANY_SUFFIXES), n)])
+    hyphenated = _join(last[0], '-', last[1])
+    listed = _join(last[0], ', ', last[1], ' and ', last[2])
+    companies = np.where(formats == 0, suffixed, np.where(formats == 1, hyphenated, listed))
+    return companies.astype('U24')  # mesmo corte do fake.company()[:24]
+
+
+def _sentences(rng, n, words):
+    columns = _WORDS[rng.integers(0, len(_WORDS), size=(words, n))]
+    parts = [columns[0]]
+    for column in columns[1:]:
+        parts += [' ', column]
+    return np.char.add(np.char.capitalize(_join(*parts)), '.')
+
+
+def generate_user_columns(n, start=0, rng=None):
+    """Gera as colunas de USER_COLUMNS para n linhas, com e-mails únicos a partir de `start`"""
+    rng = rng or np.random.default_rng()
+    first = _FIRST_NAMES[rng.choice(len(_FIRST_NAMES), n, p=_FIRST_WEIGHTS)]
+    last = _LAST_NAMES[rng.choice(len(_LAST_NAMES), n, p=_LAST_WEIGHTS)]
+    domains = np.char.lower(_LAST_NAMES[rng.integers(0, len(_LAST_NAMES), n)])
+
+    name = _join(first, ' ', last)
+    # O sufixo em base 36 vem do número da linha e garante a unicidade da coluna email
+    email = _join(np.char.lower(first), '.', _base36(np.arange(start, start + n, dtype=np.int64)),
+                  '@', domains, '.', _TLDS[rng.integers(0, len(_TLDS), n)])
+    password = _passwords(rng, n)
+    company = _companies(rng, n)
+    phone = _random_chars(rng, _DIGITS, n, 12)
+    return [name, email, password, company, phone]
+
+
+def generate_note_columns(n, start=0, rng=None):
+    """Gera as colunas de NOTE_COLUMNS para n linhas"""
+    rng = rng or np.random.default_rng()
+    noteTitle = _sentences(rng, n, 4)
+    noteDescription = _sentences(rng, n, 5)
+    noteCategory = _CATEGORIES[rng.integers(0, len(_CATEGORIES), n)]
+    return [noteTitle, noteDescription, noteCategory]
+
+
+def _rows(generate_columns, count, chunk_size, seed, start=0):
+    rng = np.random.default_rng(seed)
+    for offset in range(0, count, chunk_size):
+        n = min(chunk_size, count - offset)
+        columns = generate_columns(n, start + offset, rng)
+        yield from zip(*(column.tolist() for column in columns))
+
+
+def vectorized_users(count, chunk_size=100_000, seed=None, start=0):
+    """Gera `count` linhas para a tabela users em blocos vetorizados, numeradas a partir de `start`"""
+    return _rows(generate_user_columns, count, chunk_size, seed, start)
+
+
+def vectorized_notes(count, chunk_size=100_000, seed=None):
+    """Gera `count` notas modelo em blocos vetorizados"""
+    return _rows(generate_note_columns, count, chunk_size, seed)
+
+
+def user_rows(count, generator='vectorized', start=0):
+    # `start` separa a partição de seed de cada worker do xdist; o loop de Faker sorteia os e-mails
+    return vectorized_users(count, start=start) if generator == 'vectorized' else fake_users(count)
+
+
+def note_rows(count, generator='vectorized'):
+    return vectorized_notes(count) if generator == 'vectorized' else fake_notes(count)
@@ -0,0 +1,471 @@
+import csv
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+import mysql.connector
+from mysql.connector import Error as MySQLError, PoolError
+from .support_baseline import record_setup
+from .support_phases import timed
+from .support_sql import InstrumentedConnection
+
+
+def xdist_worker():
+    """Id do worker do pytest-xdist (gw0, gw1, ...), ou None fora do xdist"""
+    return os.environ.get('PYTEST_XDIST_WORKER')
+
+
+def worker_database(name):
+    """Banco deste worker: `notes_gw0`, `notes_gw1`... com xdist, o próprio `name` sem xdist
+
+    Cada worker cria, usa e exclui só o seu banco, então o teardown de um worker não
+    derruba as tabelas que os outros ainda estão usando.
+    """
+    worker = xdist_worker()
+    return name if worker is None else f"{name}_{worker}"
+
+
+def shared_database_name(database):
+    """Nome do banco sem o sufixo do worker (`notes_gw1` → `notes`), igual em todos os workers"""
+    worker = xdist_worker()
+    return database.removesuffix(f"_{worker}") if worker else database
+
+
+def worker_seed_start(rows):
+    """Primeira linha da partição de seed do worker (gw0 → 0, gw1 → rows, gw2 → 2 * rows...)
+
+    Os e-mails do seed são numerados a partir dela, então usuários de workers
+    diferentes nunca colidem ao se registrar na mesma API.
+    """
+    worker = xdist_worker()
+    return 0 if worker is None else int(worker[2:]) * rows
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert_executemany(connection, table, columns, rows, batch_size):
+    column_list = ', '.join(f"`{column}`" for column in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    query = f"INSERT INTO `{table}` ({column_list}) VALUES ({placeholders})"
+
+    cursor = connection.cursor()
+    count = 0
+    for batch in _batches(rows, batch_size):
+        # O conector reescreve o executemany de um INSERT em um único INSERT multi-linha
+        cursor.executemany(query, batch)
+        count += len(batch)
+    connection.commit()
+    cursor.close()
+    return count
+
+
+def _insert_load_data(connection, table, columns, rows, batch_size):
+    column_list = ', '.join(f"`{column}`" for column in columns)
+    query = f"""
+        LOAD DATA LOCAL INFILE %s INTO TABLE `{table}`
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+        LINES TERMINATED BY '\\n'
+        ({column_list})
+    """
+
+    # Gera o CSV em blocos para não manter todas as linhas na memória
+    csv_file = tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8', delete=False)
+    count = 0
+    try:
+        with csv_file, timed('file_io'):
+            writer = csv.writer(csv_file, quoting=csv.QUOTE_ALL, lineterminator='\n')
+            for batch in _batches(rows, batch_size):
+                writer.writerows(batch)
+                count += len(batch)
+
+        cursor = connection.cursor()
+        cursor.execute(query, (csv_file.name,))
+        connection.commit()
+        cursor.close()
+    finally:
+        os.remove(csv_file.name)
+    return count
+
+
+def bulk_insert(connection, table, columns, rows, batch_size=5000, method='executemany'):
+    """Insere as linhas em lote e retorna (linhas inseridas, segundos gastos)"""
+    start = time.perf_counter()
+    if method == 'load-data':
+        count = _insert_load_data(connection, table, columns, rows, batch_size)
+    else:
+        count = _insert_executemany(connection, table, columns, rows, batch_size)
+    return count, time.perf_counter() - start
+
+
+def report_line(config, message):
+    """Escreve uma linha no terminal do pytest mesmo com a captura de saída ativa"""
+    reporter = config.pluginmanager.get_plugin('terminalreporter')
+    capture = config.pluginmanager.get_plugin('capturemanager')
+    if reporter is None or capture is None:
+        print(message)
+        return
+    with capture.global_and_fixture_disabled():
+        reporter.write_line(message)
+
+
+def report_seed_rate(config, table, count, elapsed):
+    rate = count / elapsed if elapsed > 0 else float('inf')
+    report_line(config, f"\n🌱 {count} linhas inseridas em {table} em {elapsed:.2f}s ({rate:,.0f} linhas/s)")
+
+
+class SeedPoolExhausted(RuntimeError):
+    """Não há mais linhas de seed livres para reservar"""
+
+
+def claim_seed_row(connection, table, claimant):
+    """Reserva atomicamente uma linha de seed ainda não usada e retorna o seu `index`
+
+    As linhas já nascem embaralhadas (claim_order DEFAULT (RAND())) e o índice
+    claim_queue (claimed_by, claim_order) entrega a próxima linha livre sem varrer a
+    tabela. O UPDATE bloqueia a linha escolhida, então dois workers nunca recebem a
+    mesma linha, e o LAST_INSERT_ID(expr) devolve o `index` no próprio UPDATE.
+    """
+    cursor = connection.cursor()
+    cursor.execute(f"""
+        UPDATE `{table}` SET claimed_by = %s, `index` = LAST_INSERT_ID(`index`)
+        WHERE claimed_by IS NULL
+        ORDER BY claim_order
+        LIMIT 1
+    """, (claimant,))
+    claimed = cursor.rowcount
+    row_index = cursor.lastrowid
+    connection.commit()
+    cursor.close()
+
+    if claimed == 0:
+        raise SeedPoolExhausted(
+            f"All seed rows in `{table}` were already claimed. "
+            f"Run with a larger --seed-rows (or SEED_ROWS) so every test gets its own row."
+        )
+    return row_index
+
+
+def seed_fingerprint(schema, config):
+    """Identifica o schema e o seed: muda quando o DDL ou as opções de seed mudam
+
+    `schema` é a sequência de (tabela, DDL) do banco, na ordem de criação.
+    """
+    parts = [
+        *(' '.join(ddl.split()) for _, ddl in schema),
+        str(config.getoption("--seed-rows")),
+        config.getoption("--seed-generator"),
+    ]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+def seed_is_current(connection, table, fingerprint):
+    """Indica se a tabela já existe com o mesmo schema e seed do run atual"""
+    cursor = connection.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS seed_fingerprints (
+            table_name VARCHAR(64) PRIMARY KEY,
+            fingerprint CHAR(64) NOT NULL,
+            seeded_at DATETIME NOT NULL
+        )
+    """)
+    cursor.execute("SELECT fingerprint FROM seed_fingerprints WHERE table_name = %s", (table,))
+    row = cursor.fetchone()
+    cursor.close()
+    return row is not None and row[0] == fingerprint
+
+
+def recreate_tables(connection, schema):
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM seed_fingerprints WHERE table_name = %s", (schema[0][0],))
+    cursor.execute(f"DROP TABLE IF EXISTS `{snapshot_table(schema[0][0])}`")
+    # Remove na ordem inversa por causa das chaves estrangeiras
+    for table, _ in reversed(schema):
+        cursor.execute(f"DROP TABLE IF EXISTS `{table}`")
+    for _, ddl in schema:
+        cursor.execute(ddl)
+    connection.commit()
+    cursor.close()
+
+
+def record_fingerprint(connection, table, fingerprint):
+    # Só é gravado depois do seed completo: um seed interrompido força a recriação no próximo run
+    cursor = connection.cursor()
+    cursor.execute("""
+        REPLACE INTO seed_fingerprints (table_name, fingerprint, seeded_at)
+        VALUES (%s, %s, NOW())
+    """, (table, fingerprint))
+    connection.commit()
+    cursor.close()
+
+
+def snapshot_table(table):
+    return f"{table}_seed_snapshot"
+
+
+def snapshot_seed(connection, table):
+    """Copia as linhas de seed recém-inseridas, para o release_claimed_rows restaurá-las"""
+    snapshot = snapshot_table(table)
+    cursor = connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{snapshot}`")
+    cursor.execute(f"CREATE TABLE `{snapshot}` LIKE `{table}`")
+    cursor.execute(f"INSERT INTO `{snapshot}` SELECT * FROM `{table}`")
+    connection.commit()
+    cursor.close()
+
+
+def has_seed_snapshot(connection, table):
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (snapshot_table(table),))
+    exists = cursor.fetchone()[0] > 0
+    cursor.close()
+    return exists
+
+
+def release_claimed_rows(connection, table, reset_columns, cleanup=()):
+    """Devolve ao pool as linhas reservadas por runs anteriores
+
+    Os comandos de `cleanup` removem o que os testes acrescentaram (ex.: notas criadas
+    via API), as colunas preenchidas pela API voltam a NULL e as demais voltam ao valor do
+    seed, copiado do snapshot (os testes de atualização mudam nome, empresa, senha...).
+    As linhas devolvidas vão para o fim da fila (claim_order + 1), depois das que nunca
+    foram usadas.
+    """
+    snapshot = snapshot_table(table)
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COLUMN_NAME FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+    """, (snapshot,))
+    skipped = {'index', 'claimed_by', 'claim_order', 'updated_at', *reset_columns}
+    restored = [column for (column,) in cursor.fetchall() if column not in skipped]
+    assignments = ', '.join([f"t.`{column}` = s.`{column}`" for column in restored]
+                            + [f"t.`{column}` = NULL" for column in reset_columns])
+    for statement in cleanup:
+        cursor.execute(statement)
+    cursor.execute(f"""
+        UPDATE `{table}` AS t JOIN `{snapshot}` AS s ON s.`index` = t.`index`
+        SET {assignments}, t.claimed_by = NULL, t.claim_order = t.claim_order + 1
+        WHERE t.claimed_by IS NOT NULL
+    """)
+    released = cursor.rowcount
+    connection.commit()
+    cursor.close()
+    return released
+
+
+@contextmanager
+def rolled_back(connection):
+    """Executa o bloco dentro de uma transação que é sempre desfeita no final"""
+    connection.rollback()  # encerra qualquer transação implícita aberta por um SELECT anterior
+    connection.start_transaction()
+    try:
+        yield connection
+    finally:
+        connection.rollback()
+
+
+class ConnectionPool:
+    """Pool de conexões MySQL com espera limitada quando todas estão emprestadas
+
+    Abre até `size` conexões sob demanda e guarda as devolvidas para o próximo
+    empréstimo. Quem pede com o pool esgotado espera numa threading.Condition até uma
+    conexão voltar ou `timeout` segundos passarem.
+    """
+
+    def __init__(self, name, size, timeout, **connect_args):
+        self.name = name
+        self.database = connect_args.get('database')
+        self.size = size
+        self.timeout = timeout
+        self._connect_args = connect_args
+        self._idle = []  # conexões devolvidas; a última devolvida é a próxima emprestada
+        self._opened = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._returned = threading.Condition(self._lock)
+        self._uses = Counter()  # empréstimos por conexão física (connection_id do servidor)
+        self.leases = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+
+    def _acquire(self):
+        start = time.perf_counter()
+        with self._returned:
+            available = lambda: self._idle or self._opened < self.size
+            waited = not available()
+            if not self._returned.wait_for(available, self.timeout):
+                raise PoolError(
+                    f"No free connection in pool '{self.name}' after {time.perf_counter() - start:.1f}s "
+                    f"(size {self.size}). Increase --db-pool-size or --db-pool-timeout."
+                )
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                self._opened += 1
+        if conn is None:
+            try:
+                conn = mysql.connector.connect(**self._connect_args)
+            except BaseException:
+                self._discard()
+                raise
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.leases += 1
+            self._uses[conn.connection_id] += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += elapsed
+                self.max_wait = max(self.max_wait, elapsed)
+        return conn
+
+    def _discard(self):
+        with self._returned:
+            self._opened -= 1
+            self._returned.notify()
+
+    def _release(self, conn):
+        # Como o pooling do mysql-connector: sessão resetada, transações abertas desfeitas
+        try:
+            if not self._closed:
+                conn.reset_session()
+                with self._returned:
+                    self._idle.append(conn)
+                    self._returned.notify()
+                return
+        except MySQLError:
+            pass
+        conn.close()
+        self._discard()
+
+    @contextmanager
+    def lease(self):
+        conn = self._acquire()
+        try:
+            yield InstrumentedConnection(conn, self.database)
+        finally:
+            self._release(conn)
+
+    @property
+    def reuses(self):
+        return self.leases - len(self._uses)
+
+    def close(self):
+        """Fecha as conexões livres; as emprestadas fecham ao voltar"""
+        with self._returned:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._closed = True
+        for conn in idle:
+            conn.close()
+
+
+class DatabasePools:
+    """Um ConnectionPool por banco (None = conexão sem banco, usada para CREATE/DROP DATABASE)"""
+
+    def __init__(self, size, timeout, **connect_args):
+        self.size = size
+        self.timeout = timeout
+        self.connect_args = connect_args
+        self.pools = {}
+        self._lock = threading.Lock()
+
+    def pool(self, database=None):
+        with self._lock:
+            if database not in self.pools:
+                connect_args = dict(self.connect_args)
+                if database is not None:
+                    connect_args['database'] = database
+                self.pools[database] = ConnectionPool(database or 'server', self.size, self.timeout, **connect_args)
+            return self.pools[database]
+
+    def lease(self, database=None):
+        """Empresta uma conexão do pool do banco informado (use com `with`)"""
+        return self.pool(database).lease()
+
+    def summary_lines(self):
+        lines = []
+        for pool in self.pools.values():
+            lines.append(
+                f"{pool.name}: size={pool.size} leases={pool.leases} reuses={pool.reuses} "
+                f"waits={pool.waits} wait_total={pool.wait_seconds:.3f}s wait_max={pool.max_wait:.3f}s"
+            )
+        return lines
+
+    def close(self):
+        for pool in self.pools.values():
+            pool.close()
+
+
+def create_seed_database(pools, database):
+    with pools.lease() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+        cursor.close()
+
+
+def prepare_seed_tables(pools, config, database, schema, reset_columns, cleanup=()):
+    """Cria as tabelas, ou reaproveita as do run anterior se o fingerprint não mudou
+
+    A primeira tabela do schema é a que guarda a fila de linhas de seed (claim_queue).
+    Retorna True quando as tabelas foram recriadas e precisam receber o seed.
+    """
+    table = schema[0][0]
+    fingerprint = seed_fingerprint(schema, config)
+    with pools.lease(database) as conn:
+        # Sem o snapshot (seed de antes dele) as linhas usadas não teriam como ser restauradas
+        if (config.getoption("--db-isolation") == 'transaction' and seed_is_current(conn, table, fingerprint)
+                and has_seed_snapshot(conn, table)):
+            released = release_claimed_rows(conn, table, reset_columns, cleanup)
+            report_line(config, f"\n♻️ Tabelas de {database} reaproveitadas ({released} linhas devolvidas ao pool)")
+            return False
+        recreate_tables(conn, schema)
+    return True
+
+
+def seed_tables(pools, config, database, schema, seeds):
+    """Insere o seed de cada tabela; `seeds` é a sequência de (tabela, colunas, linhas)"""
+    with pools.lease(database) as conn:
+        for table, columns, rows in seeds:
+            count, elapsed = bulk_insert(
+                conn, table, columns, rows,
+                batch_size=config.getoption("--seed-batch-size"),
+                method=config.getoption("--seed-method")
+            )
+            report_seed_rate(config, table, count, elapsed)
+            record_setup(config, f"seed {shared_database_name(database)}.{table} ({count} rows)", elapsed * 1000)
+        if config.getoption("--db-isolation") == 'transaction':
+            # O banco fica para o próximo run: guarda o seed para restaurar as linhas usadas
+            snapshot_seed(conn, schema[0][0])
+        record_fingerprint(conn, schema[0][0], seed_fingerprint(schema, config))
+
+
+def drop_seed_database(pools, config, database):
+    if config.getoption("--db-isolation") == 'transaction':
+        # Mantém o schema e o seed para o próximo run
+        print("\n💾 Banco de dados mantido para o próximo run!")
+        return
+
+    with pools.lease() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        conn.commit()
+        cursor.close()
+    print("\n🔥 Banco de dados excluído após os testes!")
@@ -0,0 +1,132 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from .support_latency import endpoint
+from .support_phases import timed, timed_json
+
+DEFAULT_HEADERS = {'accept': 'application/json'}
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter que conta as conexões TCP/TLS realmente abertas pelo urllib3"""
+
+    def __init__(self, client, **kwargs):
+        self.client = client
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        client = self.client
+
+        def counted(pool_class):
+            class CountedPool(pool_class):
+                def _new_conn(self):
+                    client._connection_opened()
+                    return super()._new_conn()
+            return CountedPool
+
+        classes = self.poolmanager.pool_classes_by_scheme
+        self.poolmanager.pool_classes_by_scheme = {scheme: counted(cls) for scheme, cls in classes.items()}
+
+
+def route_table(base_url, base_urls=None):
+    """[(prefixo, base_url, caminho da base)] com os prefixos mais longos primeiro; '' é a base padrão"""
+    routes = {'': base_url, **(base_urls or {})}
+    table = [('/' + prefix.strip('/') if prefix.strip('/') else '', url.rstrip('/')) for prefix, url in routes.items()]
+    return sorted(((prefix, url, urlsplit(url).path) for prefix, url in table), key=lambda route: len(route[0]), reverse=True)
+
+
+def route(table, path):
+    """(base_url, caminho da base) do prefixo mais longo que casa com o caminho, em segmentos inteiros"""
+    path = '/' + path.lstrip('/')
+    for prefix, url, base_path in table:
+        if not prefix or path == prefix or path.startswith(prefix + '/'):
+            return url, base_path
+
+
+class ApiClient:
+    """Cliente HTTP compartilhado: requests.Session com pool de conexões keep-alive
+
+    Os caminhos são relativos ao `base_url` (ex.: client.post("/users/login", data=body)) e os
+    `headers` padrão vão em todas as requisições, somados aos headers de cada chamada.
+    `pause_seconds` é a espera entre testes para respeitar o rate limit da API pública
+    (feita no teardown pelo plugin_http).
+    Com um `latency` (LatencyRecorder) a duração de cada requisição vai para o histograma
+    do seu método e endpoint. `base_urls` manda prefixos de caminho para outras bases
+    (ex.: {'/notes': 'http://notes.local/api'}); o prefixo mais longo ganha e o resto vai
+    para o `base_url`.
+    """
+
+    def __init__(self, base_url, pool_size=10, headers=None, pause_seconds=0, latency=None, base_urls=None):
+        self.base_url = base_url.rstrip('/')
+        self.base_path = urlsplit(self.base_url).path
+        self.routes = route_table(self.base_url, base_urls)
+        self.latency = latency
+        self.pool_size = pool_size
+        self.pause_seconds = pause_seconds
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS if headers is None else headers)
+        # Um pool de conexões por host das bases
+        hosts = len({urlsplit(url).netloc for _, url, _ in self.routes})
+        adapter = _CountingAdapter(self, pool_connections=hosts, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def _connection_opened(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    @property
+    def connections_reused(self):
+        return self.requests - self.connections_opened
+
+    def url(self, path):
+        if path.startswith(('http://', 'https://')):
+            return path
+        base_url, _ = route(self.routes, path)
+        return f"{base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        with self._lock:
+            self.requests += 1
+        _, base_path = route(self.routes, path)
+        start = time.perf_counter()
+        with timed('http'):
+            response = self.session.request(method, self.url(path), **kwargs)
+        if self.latency is not None:
+            self.latency.record(method, endpoint(path, base_path), time.perf_counter() - start)
+        return timed_json(response)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request('PATCH', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def pause(self):
+        if self.pause_seconds:
+            time.sleep(self.pause_seconds)
+
+    def summary_line(self):
+        routed = ''.join(f" {prefix}={url}" for prefix, url, _ in self.routes if prefix)
+        return (
+            f"{self.base_url}{routed}: pool_size={self.pool_size} requests={self.requests} "
+            f"opened={self.connections_opened} reused={self.connections_reused}"
+        )
+
+    def close(self):
+        self.session.close()
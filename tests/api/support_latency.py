@@ -0,0 +1,165 @@
+import html
+import math
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+PERCENTILES = (50, 95, 99)
+
+# Segmentos de caminho que são palavras (users, delete-account...) ficam; ids e lixo viram {id}
+_WORD_SEGMENT = re.compile(r'[a-z][a-z-]*')
+
+
+def endpoint(path, base_path=''):
+    """Caminho sem o prefixo da API e com os ids trocados por {id}: /notes/{id}"""
+    path = urlsplit(path).path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    segments = [segment if _WORD_SEGMENT.fullmatch(segment) else '{id}' for segment in path.strip('/').split('/') if segment]
+    return '/' + '/'.join(segments)
+
+
+class LatencyHistogram:
+    """Histograma com buckets logarítmicos: cada bucket é 2^(1/8) (~9%) maior que o anterior
+
+    Guarda só a contagem dos buckets usados, então a memória não cresce com o número de
+    amostras, e os percentis têm erro relativo de no máximo ~9% (o máximo é exato).
+    """
+    BUCKETS_PER_DOUBLING = 8
+    MIN_MS = 0.01
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @classmethod
+    def _bucket(cls, ms):
+        if ms <= cls.MIN_MS:
+            return 0
+        return math.ceil(math.log2(ms / cls.MIN_MS) * cls.BUCKETS_PER_DOUBLING)
+
+    @classmethod
+    def _upper_bound(cls, bucket):
+        return cls.MIN_MS * 2 ** (bucket / cls.BUCKETS_PER_DOUBLING)
+
+    def record(self, ms):
+        self.buckets[self._bucket(ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, percentile):
+        """Limite superior do bucket que contém o percentil (nunca acima do máximo observado)"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(percentile / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self._upper_bound(bucket), self.max_ms)
+        return self.max_ms
+
+    def merge(self, other):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def to_dict(self):
+        return {'buckets': dict(self.buckets), 'count': self.count, 'total_ms': self.total_ms, 'max_ms': self.max_ms}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.buckets.update({int(bucket): count for bucket, count in data['buckets'].items()})
+        histogram.count = data['count']
+        histogram.total_ms = data['total_ms']
+        histogram.max_ms = data['max_ms']
+        return histogram
+
+
+class LatencyRecorder:
+    """Um LatencyHistogram por (método, endpoint), compartilhado pelos clientes HTTP da sessão"""
+
+    def __init__(self):
+        self.histograms = {}
+        self._captures = []
+        self._lock = threading.Lock()
+
+    def record(self, method, endpoint, seconds):
+        with self._lock:
+            key = (method.upper(), endpoint)
+            if key not in self.histograms:
+                self.histograms[key] = LatencyHistogram()
+            self.histograms[key].record(seconds * 1000)
+            captures = list(self._captures)
+        for capture in captures:
+            capture.record(method, endpoint, seconds)
+
+    @contextmanager
+    def capture(self):
+        """Recorder que recebe, além deste, só as requisições feitas dentro do bloco"""
+        capture = LatencyRecorder()
+        with self._lock:
+            self._captures.append(capture)
+        try:
+            yield capture
+        finally:
+            with self._lock:
+                self._captures.remove(capture)
+
+    def matching(self, endpoint, method=None):
+        """Histograma único com as amostras de `endpoint` e dos caminhos abaixo dele"""
+        histogram = LatencyHistogram()
+        prefix = endpoint.rstrip('/') + '/'
+        with self._lock:
+            for (key_method, key_endpoint), samples in self.histograms.items():
+                if method is not None and key_method != method.upper():
+                    continue
+                if key_endpoint == endpoint or key_endpoint.startswith(prefix):
+                    histogram.merge(samples)
+        return histogram
+
+    def merge(self, other):
+        with self._lock:
+            for key, histogram in other.histograms.items():
+                self.histograms.setdefault(key, LatencyHistogram()).merge(histogram)
+
+    def to_dict(self):
+        return [{'method': method, 'endpoint': path, **histogram.to_dict()}
+                for (method, path), histogram in sorted(self.histograms.items(), key=lambda item: (item[0][1], item[0][0]))]
+
+    @classmethod
+    def from_dict(cls, rows):
+        recorder = cls()
+        for row in rows:
+            recorder.histograms[(row['method'], row['endpoint'])] = LatencyHistogram.from_dict(row)
+        return recorder
+
+    def rows(self):
+        """(método, endpoint, count, p50, p95, p99, max) ordenados por endpoint"""
+        for (method, path), histogram in sorted(self.histograms.items(), key=lambda item: (item[0][1], item[0][0])):
+            yield (method, path, histogram.count, *(histogram.percentile(p) for p in PERCENTILES), histogram.max_ms)
+
+    def summary_lines(self):
+        lines = [f"{'method':<7} {'endpoint':<24} {'count':>6}" + ''.join(f" {f'p{p} ms':>8}" for p in PERCENTILES) + f" {'max ms':>8}"]
+        for method, path, count, *values in self.rows():
+            lines.append(f"{method:<7} {path:<24} {count:>6}" + ''.join(f" {value:>8.1f}" for value in values))
+        return lines
+
+    def html_table(self):
+        headers = ['Method', 'Endpoint', 'Count'] + [f'p{p} (ms)' for p in PERCENTILES] + ['Max (ms)']
+        head = ''.join(f'<th>{header}</th>' for header in headers)
+        body = ''
+        for method, path, count, *values in self.rows():
+            cells = [html.escape(method), html.escape(path), str(count)] + [f'{value:.1f}' for value in values]
+            body += '<tr>' + ''.join(f'<td>{cell}</td>' for cell in cells) + '</tr>'
+        return (
+            '<h2>HTTP latency per endpoint</h2>'
+            f'<table id="http-latency"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+        )
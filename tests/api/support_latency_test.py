@@ -0,0 +1,62 @@
+import pytest
+from .support_latency import LatencyHistogram, endpoint
+
+
+def histogram_of(*samples):
+    histogram = LatencyHistogram()
+    for ms in samples:
+        histogram.record(ms)
+    return histogram
+
+
+def test_percentile_of_empty_histogram_is_none():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.percentile(100) is None
+
+
+@pytest.mark.parametrize("percentile", [0, 1, 50, 99, 100])
+def test_single_sample_is_every_percentile(percentile):
+    # O limite do bucket passa do valor, mas o percentil nunca passa do máximo observado
+    assert histogram_of(12.3).percentile(percentile) == 12.3
+
+
+def test_p100_is_exact_max():
+    histogram = histogram_of(*range(1, 101))
+    assert histogram.percentile(100) == 100
+    assert histogram.max_ms == 100
+
+
+def test_values_below_first_bucket():
+    histogram = histogram_of(0.0, 0.001, 0.005)
+    assert histogram.buckets == {0: 3}
+    assert histogram.percentile(50) == 0.005
+    # Abaixo de MIN_MS o limite é o do primeiro bucket, se o máximo passar dele
+    histogram.record(5.0)
+    assert histogram.percentile(50) == LatencyHistogram.MIN_MS
+
+
+def test_percentiles_within_bucket_error():
+    histogram = histogram_of(*range(1, 1001))
+    growth = 2 ** (1 / LatencyHistogram.BUCKETS_PER_DOUBLING)
+    for percentile, exact in ((50, 500), (95, 950), (99, 990)):
+        assert exact <= histogram.percentile(percentile) <= exact * growth
+
+
+def test_merge_and_round_trip_keep_percentiles():
+    left, right = histogram_of(1, 2, 3), histogram_of(100, 200)
+    left.merge(right)
+    restored = LatencyHistogram.from_dict(left.to_dict())
+    assert restored.count == 5
+    assert restored.max_ms == 200
+    assert restored.percentile(50) == left.percentile(50)
+    assert restored.percentile(100) == 200
+
+
+@pytest.mark.parametrize("path, base_path, expected", [
+    ("/notes/api/notes/65f1a2b3c4", "/notes/api", "/notes/{id}"),
+    ("https://host/notes/api/users/delete-account", "/notes/api", "/users/delete-account"),
+    ("/health-check?x=1", "", "/health-check"),
+])
+def test_endpoint(path, base_path, expected):
+    assert endpoint(path, base_path) == expected
@@ -0,0 +1,78 @@
+"""Tempo de cada teste dividido por fase.
+
+As fases são consultas e commits no MySQL, requisições HTTP, decodificação de JSON e
+arquivos de fixture. O que sobra do tempo total (asserts, Faker, Python do teste) vai
+para `other`. A instrumentação (support_http, support_api_async, support_sql,
+support_context) chama `timed(fase)`, que não faz nada fora de um teste. O plugin_phases
+liga um PhaseTimer por teste.
+
+Threads e corrotinas do mesmo teste somam no mesmo timer, então num teste concorrente
+a soma das fases pode passar do tempo total (`overlap` no breakdown).
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+PHASES = ('db_query', 'db_commit', 'http', 'json_decode', 'file_io')
+
+_active = None
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.seconds[phase] += seconds
+            self.calls[phase] += 1
+
+    def breakdown(self, wall):
+        """Segundos e chamadas por fase, com `other` = tempo total menos as fases medidas"""
+        busy = sum(self.seconds.values())
+        return {
+            'wall_s': wall,
+            'phases': {**self.seconds, 'other': max(0.0, wall - busy)},
+            'calls': dict(self.calls),
+            'overlap': busy > wall,
+        }
+
+
+def start_timer():
+    global _active
+    _active = PhaseTimer()
+    return _active
+
+
+def stop_timer():
+    global _active
+    timer, _active = _active, None
+    return timer
+
+
+@contextmanager
+def timed(phase):
+    """Soma a duração do bloco na `phase` do teste em andamento"""
+    timer = _active
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(phase, time.perf_counter() - start)
+
+
+def timed_json(response):
+    """Faz o `response.json()` (requests ou httpx) contar como json_decode"""
+    decode = response.json
+
+    def json(**kwargs):
+        with timed('json_decode'):
+            return decode(**kwargs)
+
+    response.json = json
+    return response
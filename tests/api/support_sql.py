@@ -0,0 +1,365 @@
+"""Conexões e cursores MySQL instrumentados.
+
+O ConnectionPool do support_db empresta as conexões já embrulhadas em
+InstrumentedConnection, então toda consulta e todo commit da suíte (fixtures, helpers e
+testes) passa por aqui sem mudar o código que usa a conexão. O resto da interface do
+mysql-connector é repassado sem alteração.
+
+Com um SqlRecorder instalado (start_recording, feito pelo plugin_sql) cada statement
+também é contado e cronometrado pelo seu formato (o SQL com literais trocados por ?,
+espaços normalizados e listas `IN (%s, ...)` colapsadas). explain_pending roda o EXPLAIN uma vez por formato,
+numa conexão separada, e marca as varreduras completas, filesorts e tabelas temporárias
+em tabelas grandes.
+"""
+import html
+import re
+import threading
+import time
+from contextlib import contextmanager
+from mysql.connector import Error as MySQLError
+from .support_phases import timed
+
+_WHITESPACE = re.compile(r'\s+')
+# Literais escritos no SQL (f-strings, LIMIT 5) contam como parâmetros: viram ?
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER = re.compile(r'(?<![\w$.`])\d+(?:\.\d+)?(?:e[+-]?\d+)?(?![\w$`])', re.IGNORECASE)
+_IN_LIST = re.compile(r'\bIN \((?:(?:%s|\?), ?)*(?:%s|\?)\)', re.IGNORECASE)
+# Só leituras e alterações com WHERE têm plano que interessa; INSERT ... VALUES e DDL não
+_EXPLAINABLE = re.compile(r'^(?:(?:SELECT|WITH)\b.*\bFROM\b|UPDATE\b|DELETE\b)', re.IGNORECASE | re.DOTALL)
+# Tipos de acesso do EXPLAIN que leem a tabela (ALL) ou o índice (index) inteiro
+_SCAN_TYPES = {'ALL': 'full scan', 'index': 'full index scan'}
+
+_recorder = None
+
+
+def statement_shape(operation):
+    """SQL com literais trocados por ?, sem espaços repetidos e com `IN (%s, %s, ...)` trocado por `IN (...)`"""
+    if isinstance(operation, (bytes, bytearray)):
+        operation = operation.decode('utf-8', 'replace')
+    operation = _NUMBER.sub('?', _STRING.sub('?', operation))
+    return _IN_LIST.sub('IN (...)', _WHITESPACE.sub(' ', operation).strip())
+
+
+def plan_problems(plan, scan_rows):
+    """Problemas do plano em tabelas com pelo menos `scan_rows` linhas estimadas"""
+    problems = []
+    for row in plan:
+        rows = row.get('rows') or 0
+        if rows < scan_rows:
+            continue
+        table, extra = row.get('table'), row.get('Extra') or ''
+        if row.get('type') in _SCAN_TYPES:
+            problems.append(f"{_SCAN_TYPES[row['type']]} of {table} (~{rows} rows)")
+        if 'Using filesort' in extra:
+            problems.append(f"filesort on {table}")
+        if 'Using temporary' in extra:
+            problems.append(f"temporary table for {table}")
+    return problems
+
+
+def plan_lines(plan):
+    return [
+        f"{row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')} "
+        f"filtered={row.get('filtered')} {row.get('Extra') or ''}".rstrip()
+        for row in plan
+    ]
+
+
+class StatementStats:
+    """Execuções de um formato de statement em um banco"""
+
+    def __init__(self, database, shape):
+        self.database = database
+        self.shape = shape
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow = 0
+        self.sample = None  # (operation, params) da execução mais lenta, usado no EXPLAIN
+        self.plan = None
+        self.problems = []
+
+    def record(self, ms, slow_ms, operation=None, params=None):
+        if ms >= self.max_ms and operation is not None:
+            self.sample = (operation, params)
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if slow_ms is not None and ms > slow_ms:
+            self.slow += 1
+
+    @property
+    def explainable(self):
+        return _EXPLAINABLE.match(self.shape) is not None
+
+    def offending(self):
+        return self.slow > 0 or bool(self.problems)
+
+    def merge(self, other):
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.slow += other.slow
+        if self.plan is None and other.plan is not None:
+            self.plan, self.problems = other.plan, other.problems
+
+    def to_dict(self):
+        return {
+            'database': self.database, 'shape': self.shape, 'count': self.count, 'total_ms': self.total_ms,
+            'max_ms': self.max_ms, 'slow': self.slow, 'plan': self.plan, 'problems': self.problems,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['database'], data['shape'])
+        stats.count = data['count']
+        stats.total_ms = data['total_ms']
+        stats.max_ms = data['max_ms']
+        stats.slow = data['slow']
+        stats.plan = data['plan']
+        stats.problems = data['problems']
+        return stats
+
+
+class SqlRecorder:
+    """Statements, commits e cursores abertos, com um StatementStats por (banco, formato)"""
+
+    def __init__(self, slow_ms=None):
+        self.slow_ms = slow_ms
+        self.statements = {}
+        self.queries = 0
+        self.commits = 0
+        self.cursors = 0
+        self._captures = []
+        self._explained = set()
+        self._lock = threading.Lock()
+
+    def statement(self, database, operation, params, seconds, keep_sample=True):
+        ms = seconds * 1000
+        key = (database, statement_shape(operation))
+        with self._lock:
+            if key not in self.statements:
+                self.statements[key] = StatementStats(*key)
+            sample = (operation, params) if keep_sample else (None, None)
+            self.statements[key].record(ms, self.slow_ms, *sample)
+            self.queries += 1
+            captures = list(self._captures)
+        for capture in captures:
+            capture.statement(database, operation, params, seconds, keep_sample=False)
+
+    def commit(self):
+        with self._lock:
+            self.commits += 1
+            captures = list(self._captures)
+        for capture in captures:
+            capture.commit()
+
+    def cursor(self):
+        with self._lock:
+            self.cursors += 1
+            captures = list(self._captures)
+        for capture in captures:
+            capture.cursor()
+
+    @contextmanager
+    def capture(self):
+        """Recorder que recebe, além deste, só o que foi executado dentro do bloco"""
+        capture = SqlRecorder(self.slow_ms)
+        with self._lock:
+            self._captures.append(capture)
+        try:
+            yield capture
+        finally:
+            with self._lock:
+                self._captures.remove(capture)
+
+    @property
+    def total_ms(self):
+        return sum(stats.total_ms for stats in self.statements.values())
+
+    def counts(self):
+        return {'queries': self.queries, 'commits': self.commits, 'cursors': self.cursors, 'ms': self.total_ms}
+
+    def explain_pending(self, pools, scan_rows):
+        """EXPLAIN de cada formato ainda sem plano, numa conexão do pool do mesmo banco
+
+        A conexão usada pelo teste pode ter resultados pendentes, por isso o EXPLAIN vai
+        numa conexão separada, com o cursor cru para não entrar na contagem.
+        """
+        with self._lock:
+            pending = [stats for key, stats in self.statements.items()
+                       if key not in self._explained and stats.sample is not None and stats.explainable]
+            self._explained.update((stats.database, stats.shape) for stats in pending)
+        for stats in pending:
+            operation, params = stats.sample
+            try:
+                with pools.lease(stats.database) as conn:
+                    cursor = conn.raw_cursor(dictionary=True)
+                    cursor.execute(f"EXPLAIN {operation}", params)
+                    plan = cursor.fetchall()
+                    cursor.close()
+            except MySQLError as error:
+                stats.plan, stats.problems = [{'table': None, 'Extra': f"EXPLAIN failed: {error}"}], []
+                continue
+            stats.plan = [{key: value for key, value in row.items() if value is not None} for row in plan]
+            stats.problems = plan_problems(stats.plan, scan_rows)
+
+    def merge(self, other):
+        with self._lock:
+            for key, stats in other.statements.items():
+                self.statements.setdefault(key, StatementStats(*key)).merge(stats)
+            self.queries += other.queries
+            self.commits += other.commits
+            self.cursors += other.cursors
+
+    def to_dict(self):
+        return {
+            'queries': self.queries, 'commits': self.commits, 'cursors': self.cursors,
+            'statements': [stats.to_dict() for stats in self.statements.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        recorder = cls()
+        recorder.queries = data['queries']
+        recorder.commits = data['commits']
+        recorder.cursors = data['cursors']
+        for row in data['statements']:
+            stats = StatementStats.from_dict(row)
+            recorder.statements[(stats.database, stats.shape)] = stats
+        return recorder
+
+    def busiest(self, limit=None):
+        """Formatos com mais execuções, e depois com mais tempo"""
+        ranked = sorted(self.statements.values(), key=lambda stats: (stats.count, stats.total_ms), reverse=True)
+        return ranked[:limit]
+
+    def offenders(self):
+        """Formatos lentos ou com plano problemático, dos que mais custaram para os que menos"""
+        return sorted((stats for stats in self.statements.values() if stats.offending()),
+                      key=lambda stats: stats.total_ms, reverse=True)
+
+    def summary_lines(self, width=160):
+        lines = []
+        for stats in self.offenders():
+            reasons = ([f"{stats.slow} slow"] if stats.slow else []) + stats.problems
+            shape = stats.shape if len(stats.shape) <= width else stats.shape[:width - 3] + '...'
+            lines.append(f"[{', '.join(reasons)}] {stats.count}x total={stats.total_ms:.1f}ms "
+                         f"max={stats.max_ms:.1f}ms db={stats.database}: {shape}")
+            lines += [f"    {line}" for line in plan_lines(stats.plan or [])]
+        return lines
+
+    def html_table(self):
+        head = ''.join(f'<th>{header}</th>' for header in
+                       ('Problems', 'Database', 'Statement', 'Count', 'Total (ms)', 'Max (ms)', 'EXPLAIN'))
+        body = ''
+        for stats in self.offenders():
+            reasons = ([f"{stats.slow} slow"] if stats.slow else []) + stats.problems
+            cells = [
+                html.escape(', '.join(reasons)), html.escape(str(stats.database)), html.escape(stats.shape),
+                str(stats.count), f'{stats.total_ms:.1f}', f'{stats.max_ms:.1f}',
+                f"<pre>{html.escape(chr(10).join(plan_lines(stats.plan or [])))}</pre>",
+            ]
+            body += '<tr>' + ''.join(f'<td>{cell}</td>' for cell in cells) + '</tr>'
+        return (
+            '<h2>SQL statements: slow or with full scans</h2>'
+            f'<table id="sql-offenders"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+        )
+
+
+def start_recording(recorder):
+    global _recorder
+    _recorder = recorder
+    return recorder
+
+
+def stop_recording():
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+class InstrumentedCursor:
+    """Cursor do mysql-connector com execute/fetch contados como db_query"""
+
+    def __init__(self, cursor, database=None):
+        self._cursor = cursor
+        self._database = database
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+    def _record(self, operation, params, start):
+        recorder = _recorder
+        if recorder is not None:
+            recorder.statement(self._database, operation, params, time.perf_counter() - start)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with timed('db_query'):
+                return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._record(operation, params, start)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with timed('db_query'):
+                return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            # Um lote vira um INSERT de várias linhas; a amostra não guarda os parâmetros
+            self._record(operation, None, start)
+
+    def fetchone(self):
+        with timed('db_query'):
+            return self._cursor.fetchone()
+
+    def fetchmany(self, *args, **kwargs):
+        with timed('db_query'):
+            return self._cursor.fetchmany(*args, **kwargs)
+
+    def fetchall(self):
+        with timed('db_query'):
+            return self._cursor.fetchall()
+
+
+class InstrumentedConnection:
+    """Conexão emprestada do pool com cursores instrumentados e commit/rollback contados como db_commit"""
+
+    def __init__(self, connection, database=None):
+        self._connection = connection
+        self._database = database
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        recorder = _recorder
+        if recorder is not None:
+            recorder.cursor()
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._database)
+
+    def raw_cursor(self, *args, **kwargs):
+        """Cursor do mysql-connector sem instrumentação: fora das contagens e das fases"""
+        return self._connection.cursor(*args, **kwargs)
+
+    def commit(self):
+        recorder = _recorder
+        if recorder is not None:
+            recorder.commit()
+        with timed('db_commit'):
+            self._connection.commit()
+
+    def rollback(self):
+        with timed('db_commit'):
+            self._connection.rollback()
@@ -0,0 +1,105 @@
+import pytest
+from .support_sql import InstrumentedConnection, SqlRecorder, start_recording, statement_shape, stop_recording
+
+
+class FakeCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, operation, params=None):
+        self.executed.append((operation, params))
+
+    def executemany(self, operation, seq_params):
+        self.executed.append((operation, list(seq_params)))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, *args, **kwargs):
+        self.cursors.append(FakeCursor())
+        return self.cursors[-1]
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def recorder():
+    recorder = start_recording(SqlRecorder())
+    yield recorder
+    stop_recording()
+
+
+@pytest.mark.parametrize("operation, shape", [
+    ("SELECT * FROM notes WHERE id = 42", "SELECT * FROM notes WHERE id = ?"),
+    ("SELECT * FROM notes WHERE id = 1 LIMIT 10", "SELECT * FROM notes WHERE id = ? LIMIT ?"),
+    ("UPDATE users SET score = 1.5e3 WHERE id = %s", "UPDATE users SET score = ? WHERE id = %s"),
+    # Números dentro de nomes ficam: bancos por worker, colunas com dígitos
+    ("SELECT col2 FROM notes_gw0.`notes_2024` WHERE t1.id = 7", "SELECT col2 FROM notes_gw0.`notes_2024` WHERE t1.id = ?"),
+])
+def test_shape_normalizes_numbers(operation, shape):
+    assert statement_shape(operation) == shape
+
+
+@pytest.mark.parametrize("operation, shape", [
+    ("SELECT * FROM users WHERE email = 'a@b.com'", "SELECT * FROM users WHERE email = ?"),
+    ("SELECT * FROM users WHERE name = 'O''Brien 42'", "SELECT * FROM users WHERE name = ?"),
+    (r"SELECT * FROM users WHERE name = 'it\'s' AND id = 3", "SELECT * FROM users WHERE name = ? AND id = ?"),
+    ('SELECT * FROM users WHERE name = "x  y"', "SELECT * FROM users WHERE name = ?"),
+    ("SELECT * FROM users WHERE email = %s", "SELECT * FROM users WHERE email = %s"),
+])
+def test_shape_normalizes_strings(operation, shape):
+    assert statement_shape(operation) == shape
+
+
+@pytest.mark.parametrize("operation", [
+    "DELETE FROM notes WHERE id IN (%s)",
+    "DELETE FROM notes WHERE id IN (%s, %s, %s)",
+    "DELETE FROM notes WHERE id IN (%s,%s)",
+    "DELETE FROM notes WHERE id IN (1, 2, 3)",
+    "DELETE FROM notes WHERE id in ('a', 'b')",
+    "DELETE\n  FROM notes\n WHERE id IN (%s, %s)",
+])
+def test_shape_folds_in_lists(operation):
+    assert statement_shape(operation).upper() == "DELETE FROM NOTES WHERE ID IN (...)"
+
+
+def test_shape_decodes_bytes():
+    assert statement_shape(b"SELECT 1") == "SELECT ?"
+
+
+def test_same_shape_counts_together(recorder):
+    conn = InstrumentedConnection(FakeConnection(), 'notes')
+    with conn.cursor() as cursor:
+        for note_id in (1, 2, 3):
+            cursor.execute(f"SELECT * FROM notes WHERE id = {note_id}")
+    assert recorder.counts()['queries'] == 3
+    assert recorder.cursors == 1
+    assert [(stats.shape, stats.count) for stats in recorder.busiest()] == [("SELECT * FROM notes WHERE id = ?", 3)]
+
+
+def test_executemany_counts_as_one_statement(recorder):
+    conn = InstrumentedConnection(FakeConnection(), 'notes')
+    with recorder.capture() as capture:
+        with conn.cursor() as cursor:
+            cursor.executemany("INSERT INTO notes (title) VALUES (%s)", [('a',), ('b',), ('c',)])
+    assert capture.queries == 1
+    (stats,) = recorder.busiest()
+    assert (stats.database, stats.shape, stats.count) == ('notes', "INSERT INTO notes (title) VALUES (%s)", 1)
+    # A amostra do EXPLAIN não guarda os parâmetros de um lote
+    assert stats.sample == ("INSERT INTO notes (title) VALUES (%s)", None)
+
+
+def test_raw_cursor_is_not_counted(recorder):
+    raw = FakeConnection()
+    conn = InstrumentedConnection(raw, 'notes')
+    cursor = conn.raw_cursor(dictionary=True)
+    cursor.execute("EXPLAIN SELECT 1")
+    assert cursor is raw.cursors[-1]
+    assert recorder.counts()['queries'] == 0
+    assert recorder.cursors == 0
@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from .support_baseline import record_setup
+from .support_cleanup import record_account, record_token
+from .support_db import claim_seed_row, report_line, shared_database_name
+
+FORM = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+user_pools_key = pytest.StashKey()
+test_reports_key = pytest.StashKey()
+
+
+def node_passed(node):
+    """Se as fases do teste já executadas passaram (relatórios guardados pelo plugin_http)"""
+    return all(report.passed for report in node.stash.get(test_reports_key, {}).values())
+
+
+class UserPool:
+    """Usuários de seed já registrados e logados na API, emprestados aos testes
+
+    `fill()` registra e loga `size` usuários em paralelo no início da sessão e grava id e
+    token no banco. Cada teste recebe um usuário com `lease()` e o devolve com `release()`:
+    se o teste passou o usuário volta ao pool (depois do `reset`, quando houver); se falhou
+    ele é aposentado, porque o seu estado na API é desconhecido. As contas ficam no
+    registro do support_cleanup e são excluídas em paralelo no fim da sessão.
+    Quando o pool está vazio um novo usuário é registrado na hora.
+    """
+
+    def __init__(self, db_pool, database, api_client, size, reset=None):
+        self.db_pool = db_pool
+        self.database = database
+        self.api_client = api_client
+        self.size = size
+        self.reset = reset
+        self.available = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self.registered = 0
+        self.leased = 0
+        self.retired = 0
+
+    def _workers(self, count):
+        return max(1, min(count, self.api_client.pool_size))
+
+    def register(self, claimant):
+        """Reserva um usuário de seed, registra e loga na API; retorna o `index` da linha"""
+        with self.db_pool.lease(self.database) as conn:
+            user_index = claim_seed_row(conn, 'users', claimant)
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT name, email, password FROM users WHERE `index` = %s", (user_index,))
+            user = cursor.fetchone()
+            cursor.close()
+
+        body = {'confirmPassword': user['password'], 'email': user['email'], 'name': user['name'], 'password': user['password']}
+        respJS = self.api_client.post("/users/register", headers=FORM, data=body).json()
+        assert 201 == respJS['status'], respJS
+        user_id = respJS['data']['id']
+
+        body = {'email': user['email'], 'password': user['password']}
+        respJS = self.api_client.post("/users/login", headers=FORM, data=body).json()
+        assert 200 == respJS['status'], respJS
+        user_token = respJS['data']['token']
+
+        with self.db_pool.lease(self.database) as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET id = %s, token = %s WHERE `index` = %s", (user_id, user_token, user_index))
+            conn.commit()
+            cursor.close()
+            record_account(conn, self.api_client.base_url, user_id, user['email'], user['password'])
+            record_token(conn, user_id, user_token)
+        with self._lock:
+            self.registered += 1
+        return user_index
+
+    def fill(self, config=None):
+        """Registra e loga `size` usuários em paralelo"""
+        if config is not None:
+            config.stash.setdefault(user_pools_key, []).append(self)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self._workers(self.size)) as executor:
+            for user_index in executor.map(self.register, [f"user-pool-{n}" for n in range(self.size)]):
+                self.available.put(user_index)
+        if config is not None:
+            elapsed = time.perf_counter() - start
+            report_line(config, f"\n👥 {self.size} usuários registrados e logados em {self.database} em {elapsed:.2f}s")
+            record_setup(config, f"user pool {shared_database_name(self.database)} ({self.size} users)", elapsed * 1000)
+        return self
+
+    def lease(self, context):
+        """Empresta um usuário limpo ao teste e guarda o seu `index` no contexto"""
+        try:
+            user_index = self.available.get_nowait()
+        except queue.Empty:
+            user_index = self.register(context.flow_id)
+        else:
+            with self._lock:
+                self.leased += 1
+        context.set_user(user_index)
+        return user_index
+
+    def disposable(self, context):
+        """Usuário novo, só deste teste, para testes que excluem a conta; nunca volta ao pool"""
+        user_index = self.register(context.flow_id)
+        context.set_user(user_index)
+        return user_index
+
+    def release(self, user_index, clean=True):
+        """Devolve o usuário ao pool, ou o aposenta quando o teste não terminou limpo"""
+        if clean and self.reset is not None:
+            with self.db_pool.lease(self.database) as conn:
+                self.reset(user_index, conn, self.api_client)
+        if clean:
+            self.available.put(user_index)
+        else:
+            self.retire(user_index)
+
+    def retire(self, user_index):
+        """Tira o usuário de circulação; a conta é excluída na limpeza do fim da sessão"""
+        with self._lock:
+            self.retired += 1
+
+    def summary_line(self):
+        return f"{self.database}: size={self.size} registered={self.registered} leased={self.leased} retired={self.retired}"
@@ -0,0 +1,166 @@
+import hashlib
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Quantas linhas inválidas de cada regra são trazidas para a mensagem de erro
+VALIDATION_SAMPLE = 5
+
+# Coluna mantida pelo MySQL (ON UPDATE CURRENT_TIMESTAMP) que marca as linhas alteradas
+CHANGED_AT_COLUMN = 'updated_at'
+# Margem para linhas alteradas por transações que ainda não tinham feito commit na validação
+WATERMARK_LAG = timedelta(seconds=10)
+
+
+class ColumnRule:
+    """Regra declarativa de uma coluna, expressa como a condição SQL que identifica uma violação
+
+    Com `optional=True` a regra só vale para valores preenchidos (NULL é ignorado), como nos
+    testes "if exists"; sem ela um NULL também conta como violação.
+    """
+
+    def __init__(self, column, description, condition, params=(), optional=False):
+        self.column = column
+        self.description = description
+        self.condition = condition
+        self.params = tuple(params)
+        self.optional = optional
+
+    def violation_sql(self):
+        column = f"`{self.column}`"
+        condition = self.condition.format(column=column)
+        if self.optional:
+            return f"({column} IS NOT NULL AND ({condition}))"
+        return f"({column} IS NULL OR ({condition}))"
+
+
+def length_between(column, minimum, maximum, optional=False):
+    return ColumnRule(
+        column, f"{column} length between {minimum} and {maximum}",
+        "CHAR_LENGTH({column}) NOT BETWEEN %s AND %s", (minimum, maximum), optional
+    )
+
+
+def digits_between(column, minimum, maximum, optional=False):
+    return ColumnRule(
+        column, f"{column} digit count between {minimum} and {maximum}",
+        "CHAR_LENGTH(REGEXP_REPLACE({column}, '[^0-9]', '')) NOT BETWEEN %s AND %s", (minimum, maximum), optional
+    )
+
+
+def fixed_length(column, length, optional=False):
+    return ColumnRule(column, f"{column} length {length}", "CHAR_LENGTH({column}) <> %s", (length,), optional)
+
+
+def matches(column, pattern, optional=False):
+    # 'c': comparação sensível a maiúsculas/minúsculas, como o re do Python
+    return ColumnRule(column, f"{column} matches {pattern}", "NOT REGEXP_LIKE({column}, %s, 'c')", (pattern,), optional)
+
+
+def alphanumeric(column, optional=False):
+    return ColumnRule(column, f"{column} alphanumeric", "NOT REGEXP_LIKE({column}, '^[[:alnum:]]+$')", (), optional)
+
+
+def lowercase(column, optional=False):
+    return ColumnRule(
+        column, f"{column} lowercase", "CAST({column} AS BINARY) <> CAST(LOWER({column}) AS BINARY)", (), optional
+    )
+
+
+def one_of(column, values, optional=False):
+    values = tuple(values)
+    placeholders = ', '.join(['%s'] * len(values))
+    return ColumnRule(
+        column, f"{column} in ({', '.join(map(str, values))})", f"{{column}} NOT IN ({placeholders})", values, optional
+    )
+
+
+RuleViolation = namedtuple('RuleViolation', 'rule count sample')
+
+
+def _changed_since(since):
+    # Filtro pelo índice changed_rows: só as linhas alteradas depois do watermark
+    if since is None:
+        return "", ()
+    return f" WHERE `{CHANGED_AT_COLUMN}` > %s", (since,)
+
+
+def compile_rules(table, rules, since=None):
+    """Monta uma única consulta agregada que conta as linhas verificadas e as violações de cada regra"""
+    counters = ', '.join(
+        ['COUNT(*)'] + [f"SUM(CASE WHEN {rule.violation_sql()} THEN 1 ELSE 0 END)" for rule in rules]
+    )
+    where, where_params = _changed_since(since)
+    params = tuple(param for rule in rules for param in rule.params) + where_params
+    return f"SELECT {counters} FROM `{table}`{where}", params
+
+
+def check_columns(connection, table, rules, sample_size=VALIDATION_SAMPLE, since=None):
+    """Valida as regras no próprio MySQL e retorna (linhas verificadas, violações com amostra)
+
+    A tabela é percorrida uma vez só, ou apenas as linhas alteradas depois de `since`;
+    as amostras (LIMIT sample_size) são buscadas apenas para as regras que falharam.
+    """
+    rules = list(rules)
+    query, params = compile_rules(table, rules, since)
+    cursor = connection.cursor()
+    cursor.execute(query, params)
+    checked, *counts = cursor.fetchone()
+
+    where, where_params = _changed_since(since)
+    violations = []
+    for rule, count in zip(rules, counts):
+        if not count:  # SUM de uma tabela vazia é NULL
+            continue
+        condition = f"{where} AND {rule.violation_sql()}" if where else f" WHERE {rule.violation_sql()}"
+        cursor.execute(
+            f"SELECT `index`, `{rule.column}` FROM `{table}`{condition} LIMIT %s",
+            where_params + rule.params + (sample_size,)
+        )
+        violations.append(RuleViolation(rule, int(count), cursor.fetchall()))
+    cursor.close()
+    return checked, violations
+
+
+def watermark_key(connection, table, rules):
+    """Chave do watermark no cache do pytest: servidor, banco, tabela e as próprias regras"""
+    query, params = compile_rules(table, rules)
+    digest = hashlib.sha256(f"{query}|{params!r}".encode()).hexdigest()[:16]
+    return f"validation/{connection.server_host}/{connection.database}/{table}/{digest}"
+
+
+def validation_cache(config):
+    """Cache onde os watermarks ficam entre runs, ou None com --full-validation"""
+    if config.getoption("--full-validation"):
+        return None
+    return getattr(config, 'cache', None)  # None com -p no:cacheprovider
+
+
+def assert_columns_valid(connection, table, rules, sample_size=VALIDATION_SAMPLE, cache=None):
+    """Falha com uma amostra das linhas inválidas se alguma regra for violada
+
+    Com `cache` (ver validation_cache) só as linhas alteradas desde a última validação
+    bem-sucedida das mesmas regras são verificadas. O watermark só avança quando não há
+    violações, então uma linha inválida continua falhando nos próximos runs.
+    """
+    rules = list(rules)
+    since = None
+    if cache is not None:
+        key = watermark_key(connection, table, rules)
+        stored = cache.get(key, None)
+        since = datetime.fromisoformat(stored) if stored else None
+        cursor = connection.cursor()
+        cursor.execute("SELECT NOW(6)")  # relógio do MySQL, o mesmo que preenche updated_at
+        started_at = cursor.fetchone()[0]
+        cursor.close()
+
+    checked, violations = check_columns(connection, table, rules, sample_size, since)
+    if violations:
+        scope = f"{checked} row(s) changed since {since}" if since else f"{checked} row(s)"
+        lines = [f"{len(violations)} rule(s) failed on `{table}` ({scope} checked):"]
+        for violation in violations:
+            sample = ', '.join(f"index {index}: {value!r}" for index, value in violation.sample)
+            lines.append(f"  {violation.rule.description}: {violation.count} invalid row(s), e.g. {sample}")
+        raise AssertionError('\n'.join(lines))
+
+    if cache is not None:
+        cache.set(key, (started_at - WATERMARK_LAG).isoformat())
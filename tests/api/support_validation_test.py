@@ -0,0 +1,120 @@
+from datetime import datetime
+from .support_validation import (
+    CHANGED_AT_COLUMN, check_columns, compile_rules, digits_between, length_between, matches, one_of,
+)
+
+
+class FakeCursor:
+    """Devolve as contagens da consulta agregada e uma amostra por regra violada"""
+
+    def __init__(self, counts, samples):
+        self.counts = counts
+        self.samples = list(samples)
+        self.executed = []
+
+    def execute(self, operation, params=None):
+        self.executed.append((operation, params))
+
+    def fetchone(self):
+        return self.counts
+
+    def fetchall(self):
+        return self.samples.pop(0)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+# Duas regras na mesma coluna (phone) e uma regra opcional (company)
+RULES = [
+    digits_between('phone', 8, 20),
+    matches('phone', r'^[0-9 ()+-]+$'),
+    length_between('company', 4, 30, optional=True),
+]
+
+
+def assert_bound(query, params):
+    """Cada %s da consulta tem o seu parâmetro"""
+    assert query.count('%s') == len(params)
+
+
+def test_violation_sql_null_handling():
+    # Obrigatória: NULL é violação; opcional: NULL é ignorado
+    required, optional = RULES[0].violation_sql(), RULES[2].violation_sql()
+    assert '`phone` IS NULL OR' in required
+    assert '`company` IS NOT NULL AND' in optional
+    assert 'company' not in required and 'phone' not in optional
+
+
+def test_compile_rules_one_counter_per_rule_in_order():
+    query, params = compile_rules('users', RULES)
+    assert_bound(query, params)
+    assert query.startswith('SELECT COUNT(*)')
+    assert 'FROM `users`' in query
+    assert 'WHERE' not in query.split('FROM `users`')[1]
+    # As colunas de violação seguem a ordem das regras, e cada uma carrega a condição da sua regra
+    positions = [query.index(rule.violation_sql()) for rule in RULES]
+    assert positions == sorted(positions)
+    assert query.count('SUM(CASE WHEN') == len(RULES)
+
+
+def test_compile_rules_binds_params_in_rule_order():
+    _, params = compile_rules('users', RULES)
+    assert params == RULES[0].params + RULES[1].params + RULES[2].params
+    assert params == (8, 20, r'^[0-9 ()+-]+$', 4, 30)
+
+
+def test_compile_rules_since_filters_changed_rows():
+    since = datetime(2026, 1, 1, 12, 0)
+    rule = one_of('category', ['Home', 'Work'])
+    query, params = compile_rules('notes', [rule], since)
+    assert_bound(query, params)
+    where = query.split('FROM `notes`')[1]
+    assert f"`{CHANGED_AT_COLUMN}` >" in where
+    # O watermark vem depois dos parâmetros das regras
+    assert params == ('Home', 'Work', since)
+
+
+def test_check_columns_maps_counts_to_rules():
+    # phone digits ok (0), phone pattern violado (2), company opcional violado (1)
+    cursor = FakeCursor((50, 0, 2, 1), [[(3, '12-ab'), (9, 'x')], [(7, 'Co')]])
+    checked, violations = check_columns(FakeConnection(cursor), 'users', RULES, sample_size=5)
+
+    assert checked == 50
+    assert [(v.rule, v.count, v.sample) for v in violations] == [
+        (RULES[1], 2, [(3, '12-ab'), (9, 'x')]),
+        (RULES[2], 1, [(7, 'Co')]),
+    ]
+    # Uma amostra por regra violada: a coluna e a condição da regra, com os parâmetros dela
+    samples = cursor.executed[1:]
+    assert len(samples) == 2
+    for (query, params), rule in zip(samples, (RULES[1], RULES[2])):
+        assert_bound(query, params)
+        assert f"`{rule.column}` FROM `users`" in query
+        assert rule.violation_sql() in query
+        assert params == rule.params + (5,)
+
+
+def test_check_columns_empty_table_sums_are_null():
+    cursor = FakeCursor((0, None, None, None), [])
+    assert check_columns(FakeConnection(cursor), 'users', RULES) == (0, [])
+    assert len(cursor.executed) == 1
+
+
+def test_check_columns_sample_since_watermark():
+    since = datetime(2026, 1, 1)
+    cursor = FakeCursor((4, 0, 0, 1), [[(2, 'abc')]])
+    check_columns(FakeConnection(cursor), 'users', RULES, sample_size=3, since=since)
+    query, params = cursor.executed[1]
+    assert_bound(query, params)
+    assert f"`{CHANGED_AT_COLUMN}` >" in query
+    assert RULES[2].violation_sql() in query
+    assert params == (since,) + RULES[2].params + (3,)
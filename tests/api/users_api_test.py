@@ -1,124 +1,128 @@
 import os
-import mysql.connector
 import pytest
 from faker import Faker
 from dotenv import load_dotenv
-import time
-import json
-import requests
-import re
-from .support_api import create_user_api, delete_json_file, delete_user_api, login_user_api
+from .support_api import create_user_api, login_user_api
+from .support_cleanup import ORPHAN_MIN_AGE, SESSION_OWNER, forget_account, record_password, record_token, sweep_accounts
+from .support_data import USER_COLUMNS, user_rows
+from .support_validation import alphanumeric, assert_columns_valid, digits_between, fixed_length, length_between, lowercase, matches, validation_cache
+from .support_user_pool import UserPool, node_passed
+from .support_db import create_seed_database, drop_seed_database, prepare_seed_tables, rolled_back, seed_tables, worker_database, worker_seed_start
 
 # Carregar variáveis de ambiente do arquivo .env
 load_dotenv()
 
+# Host, usuário e senha ficam no pool compartilhado (plugin_db); com xdist cada worker usa o seu banco (users_gw0...)
 db_config = {
-    'host': os.getenv('DB_HOST', 'localhost'),
-    'user': os.getenv('DB_USER', 'root'),
-    'password': os.getenv('DB_PASSWORD', ''),
-    'database': os.getenv('DB_NAME', 'users'),
+    'database': worker_database(os.getenv('DB_NAME', 'users')),
 }
 
+USERS_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS users (
+        `index` INT AUTO_INCREMENT PRIMARY KEY,
+        id VARCHAR(255) NULL,
+        name VARCHAR(255) NOT NULL,
+        email VARCHAR(255) NOT NULL UNIQUE,
+        password VARCHAR(255) NOT NULL,
+        company VARCHAR(255) NOT NULL,
+        phone VARCHAR(255) NOT NULL,
+        token VARCHAR(255) NULL,
+        claimed_by VARCHAR(64) NULL,
+        claim_order DOUBLE NOT NULL DEFAULT (RAND()),
+        updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+        INDEX claim_queue (claimed_by, claim_order),
+        INDEX changed_rows (updated_at)
+    )
+"""
+USERS_SCHEMA = (('users', USERS_TABLE_DDL),)
+
 # Inicializa o Faker
 fake = Faker()
 
 @pytest.fixture(scope="session")
-def connection():
-    """Cria uma conexão com o MySQL"""
-    try:
-        conn = mysql.connector.connect(
-            host=db_config['host'],
-            user=db_config['user'],
-            password=db_config['password']
-        )
-        yield conn
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-@pytest.fixture(scope="session")
-def create_database(connection):
+def create_database(db_pool):
     """Cria o banco de dados se ele não existir"""
-    cursor = connection.cursor()
-    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_config['database']}")
-    cursor.close()
+    create_seed_database(db_pool, db_config['database'])
 
-@pytest.fixture(scope="session")
-def setup_database(connection, create_database):
-    """Conecta no banco de dados criado"""
-    conn = mysql.connector.connect(
-        host=db_config['host'],
-        user=db_config['user'],
-        password=db_config['password'],
-        database=db_config['database']
-    )
-    yield conn
-    if conn.is_connected():
-        conn.close()
+@pytest.fixture
+def setup_database(db_pool, create_database):
+    """Empresta ao teste uma conexão do pool compartilhado"""
+    with db_pool.lease(db_config['database']) as conn:
+        yield conn
 
 @pytest.fixture(scope="session")
-def create_table(setup_database):
-    """Cria a tabela de usuários"""
-    cursor = setup_database.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            `index` INT AUTO_INCREMENT PRIMARY KEY,
-            id VARCHAR(255) NULL,
-            name VARCHAR(255) NOT NULL,
-            email VARCHAR(255) NOT NULL UNIQUE,
-            password VARCHAR(255) NOT NULL,
-            company VARCHAR(255) NOT NULL,
-            phone VARCHAR(255) NOT NULL,
-            token VARCHAR(255) NULL
-        )
-    """)
-    cursor.close()
+def create_table(request, db_pool, create_database):
+    """Cria a tabela de usuários, ou reaproveita a do run anterior se o fingerprint não mudou"""
+    return prepare_seed_tables(db_pool, request.config, db_config['database'], USERS_SCHEMA, ('id', 'token'))
 
 @pytest.fixture(scope="session")
-def insert_users(setup_database, create_table):
-    """Insere 250 usuários na tabela"""
-    cursor = setup_database.cursor()
-    
-    for _ in range(250):
-        name = fake.name()
-        email = fake.lexify(text='??').lower() + fake.company_email().replace("-", "")
-        password = fake.password(length=12, special_chars=False, digits=True, upper_case=True, lower_case=True)
-        company = fake.company()[:24]
-        phone = fake.bothify(text='############')
-        token = None  # Deixando o token em branco (NULL)
-
-        # Inserção no banco de dados (não inserindo `id` ou `token`, que serão NULL)
-        cursor.execute("""
-            INSERT INTO users (name, email, password, company, phone)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (name, email, password, company, phone))
-    
-    setup_database.commit()  # Confirma a inserção
-    cursor.close()
+def insert_users(request, db_pool, create_table):
+    """Insere os usuários de seed na tabela em lotes"""
+    if not create_table:
+        return
+
+    # Inserção no banco de dados (não inserindo `id` ou `token`, que serão NULL)
+    seed_rows = request.config.getoption("--seed-rows")
+    rows = user_rows(seed_rows, request.config.getoption("--seed-generator"), start=worker_seed_start(seed_rows))
+    seed_tables(db_pool, request.config, db_config['database'], USERS_SCHEMA, [('users', USER_COLUMNS, rows)])
 
 @pytest.fixture(scope="session", autouse=True)
-def teardown_database(setup_database):
+def teardown_database(request, db_pool, create_database):
     """Exclui o banco de dados após todos os testes serem executados"""
     yield  # Executa os testes antes de remover o banco
-    
-    cursor = setup_database.cursor()
-    cursor.execute(f"DROP DATABASE IF EXISTS {db_config['database']}")
-    setup_database.commit()
-    cursor.close()
-    setup_database.close()
-    print("\n🔥 Banco de dados excluído após os testes!")
+    drop_seed_database(db_pool, request.config, db_config['database'])
+
+@pytest.fixture(scope="session")
+def account_cleanup(request, db_pool, create_database, api_client):
+    """Varre as contas antigas que runs interrompidos deixaram na API e, no fim da sessão, exclui em paralelo as desta sessão"""
+    sweep_accounts(request.config, db_pool, db_config['database'], api_client, "órfãs", min_age=ORPHAN_MIN_AGE)
+    yield
+    sweep_accounts(request.config, db_pool, db_config['database'], api_client, "criadas na sessão", owner=SESSION_OWNER)
 
-def test_user_table_has_250_rows(setup_database, create_table, insert_users):
+@pytest.fixture(scope="session")
+def user_pool(request, db_pool, create_table, insert_users, api_client, account_cleanup):
+    """Usuários registrados e logados em paralelo no início da sessão, emprestados aos testes da API"""
+    pool = UserPool(db_pool, db_config['database'], api_client, request.config.getoption("--user-pool-size"))
+    return pool.fill(request.config)
+
+@pytest.fixture
+def pooled_user(request, user_pool, flow_context):
+    """Empresta ao teste um usuário já logado; ele volta ao pool se o teste passar"""
+    user_pool.lease(flow_context)
+    yield flow_context
+    user_pool.release(flow_context.user_index, clean=node_passed(request.node))
+
+@pytest.fixture
+def disposable_user(request, user_pool, flow_context):
+    """Usuário registrado e logado só para este teste, que exclui a conta"""
+    user_pool.disposable(flow_context)
+    yield flow_context
+    if not node_passed(request.node):
+        user_pool.retire(flow_context.user_index)
+
+@pytest.fixture(autouse=True)
+def db_only_transaction(request):
+    """Desfaz tudo o que um teste db_only fez no banco, no modo --db-isolation=transaction"""
+    if request.config.getoption("--db-isolation") != 'transaction' or request.node.get_closest_marker('db_only') is None:
+        yield
+        return
+    with rolled_back(request.getfixturevalue('setup_database')):
+        yield
+
+@pytest.mark.db_only
+def test_user_table_has_seed_rows(request, setup_database, create_table, insert_users):
+    seed_rows = request.config.getoption("--seed-rows")
     cursor = setup_database.cursor()
     cursor.execute("SELECT COUNT(*) FROM users")
     count = cursor.fetchone()[0]
     cursor.close()
-    assert count == 250, f"Expected 250 users, but found {count}"
+    assert count == seed_rows, f"Expected {seed_rows} users, but found {count}"
 
+@pytest.mark.db_only
 def test_user_table_structure(setup_database, create_table, insert_users):
     expected_columns = {
-        'index', 'id', 'name', 'email', 'password', 'company', 'phone', 'token'
+        'index', 'id', 'name', 'email', 'password', 'company', 'phone', 'token',
+        'claimed_by', 'claim_order', 'updated_at'
     }
     cursor = setup_database.cursor()
     cursor.execute("DESCRIBE users")
@@ -126,155 +130,74 @@ def test_user_table_structure(setup_database, create_table, insert_users):
     cursor.close()
     assert expected_columns == columns, f"Expected columns: {expected_columns}, but found: {columns}"
 
-def test_user_name_length(setup_database, create_table, insert_users):
-    cursor = setup_database.cursor()
-    cursor.execute("SELECT name FROM users")
-    names = cursor.fetchall()
-    cursor.close()
-    for (name,) in names:
-        assert 4 <= len(name) <= 30, f"Invalid name: '{name}' with {len(name)} characters"
-
-def test_company_name_length(setup_database, create_table, insert_users):
-    cursor = setup_database.cursor()
-    cursor.execute("SELECT company FROM users")
-    companies = cursor.fetchall()
-    cursor.close()
-    for (company,) in companies:
-        assert 4 <= len(company) <= 30, f"Invalid company: '{company}' with {len(company)} characters"
-
-def test_phone_number_length(setup_database, create_table, insert_users):
-    cursor = setup_database.cursor()
-    cursor.execute("SELECT phone FROM users")
-    phones = cursor.fetchall()
-    cursor.close()
-    for (phone,) in phones:
-        digits = ''.join(filter(str.isdigit, phone))
-        assert 8 <= len(digits) <= 20, f"Invalid phone: '{phone}' with {len(digits)} digits"
-
-def test_password_length(setup_database, create_table, insert_users):
-    cursor = setup_database.cursor()
-    cursor.execute("SELECT password FROM users")
-    passwords = cursor.fetchall()
-    cursor.close()
-    for (pwd,) in passwords:
-        assert 6 <= len(pwd) <= 30, f"Invalid password with {len(pwd)} characters: {pwd}"
-
-def test_token_length_if_exists(setup_database, create_table, insert_users):
-    cursor = setup_database.cursor()
-    cursor.execute("SELECT token FROM users")
-    tokens = cursor.fetchall()
-    cursor.close()
-    for (token,) in tokens:
-        if token is not None:
-            assert len(token) == 64, f"Invalid token: '{token}' with {len(token)} characters"
-
-def test_email_format(setup_database, create_table, insert_users):
-    cursor = setup_database.cursor()
-    cursor.execute("SELECT email FROM users")
-    emails = cursor.fetchall()
-    cursor.close()
-
-    email_regex = re.compile(r'^[a-z0-9][a-z0-9._%+-]*@[a-z0-9.-]+\.[a-z]{2,}$')
-
-    for (email,) in emails:
-        assert email == email.lower(), f"Email is not in lowercase: {email}"
-        assert email_regex.match(email), f"Invalid email: {email}"
-
-def test_user_id_format_if_exists_in_users_table(setup_database, create_table, insert_users):
-    cursor = setup_database.cursor()
-    cursor.execute("SELECT id FROM users")
-    user_ids = cursor.fetchall()
-    cursor.close()
-    for (user_id,) in user_ids:
-        if user_id:
-            assert user_id.isalnum(), f"id contains invalid characters: {user_id}"
-            assert len(user_id) == 24, f"id must be 24 characters long: {user_id}"
-
-def test_token_format_if_exists_in_users_table(setup_database, create_table, insert_users):
-    cursor = setup_database.cursor()
-    cursor.execute("SELECT token FROM users")
-    tokens = cursor.fetchall()
-    cursor.close()
-    for (token,) in tokens:
-        if token:
-            assert token.isalnum(), f"Token contains non-alphanumeric characters: {token}"
-            assert len(token) == 64, f"Token must be 64 characters long: {token}"
-
-def test_create_user_api(setup_database, create_table, insert_users):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
+@pytest.mark.db_only
+def test_user_name_length(request, setup_database, create_table, insert_users):
+    assert_columns_valid(setup_database, 'users', [length_between('name', 4, 30)], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_company_name_length(request, setup_database, create_table, insert_users):
+    assert_columns_valid(setup_database, 'users', [length_between('company', 4, 30)], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_phone_number_length(request, setup_database, create_table, insert_users):
+    assert_columns_valid(setup_database, 'users', [digits_between('phone', 8, 20)], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_password_length(request, setup_database, create_table, insert_users):
+    assert_columns_valid(setup_database, 'users', [length_between('password', 6, 30)], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_token_length_if_exists(request, setup_database, create_table, insert_users):
+    assert_columns_valid(setup_database, 'users', [fixed_length('token', 64, optional=True)], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_email_format(request, setup_database, create_table, insert_users):
+    assert_columns_valid(setup_database, 'users', [
+        lowercase('email'),
+        matches('email', r'^[a-z0-9][a-z0-9._%+-]*@[a-z0-9.-]+\.[a-z]{2,}$'),
+    ], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_user_id_format_if_exists_in_users_table(request, setup_database, create_table, insert_users):
+    assert_columns_valid(setup_database, 'users', [
+        alphanumeric('id', optional=True),
+        fixed_length('id', 24, optional=True),
+    ], cache=validation_cache(request.config))
+
+@pytest.mark.db_only
+def test_token_format_if_exists_in_users_table(request, setup_database, create_table, insert_users):
+    assert_columns_valid(setup_database, 'users', [
+        alphanumeric('token', optional=True),
+        fixed_length('token', 64, optional=True),
+    ], cache=validation_cache(request.config))
+
+@pytest.mark.slo(endpoint="/users", p95_ms=1500)
+def test_create_user_api(setup_database, create_table, insert_users, api_client, flow_context, account_cleanup):
+    # Registra uma linha de seed livre; a conta vai para o registro e é excluída no fim da sessão
+    create_user_api(flow_context, setup_database, api_client)
+
+def test_create_user_api_bad_request(setup_database, api_client):
+    # O e-mail enviado é inválido, então qualquer linha de seed serve e nenhuma é reservada
     cursor = setup_database.cursor(dictionary=True)
-    
-    # Seleciona um usuário aleatório do banco de dados
-    cursor.execute("SELECT `index`, name, email, password FROM users ORDER BY RAND() LIMIT 1")
+    cursor.execute("SELECT name, email, password FROM users ORDER BY `index` LIMIT 1")
     user = cursor.fetchone()
-
-    user_index = user["index"]
-    user_name = user["name"]
-    user_email = user["email"]
-    user_password = user["password"]
-
-    body = {'confirmPassword': user_password, 'email': user_email, 'name': user_name, 'password': user_password}
-    print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/register", headers=headers, data=body)
-    respJS = resp.json()
-    print(respJS)
-
-    user_id = respJS['data']['id']
-
-    # Atualiza o ID do usuário na mesma linha no banco de dados
-    cursor.execute("UPDATE users SET id = %s WHERE `index` = %s", (user_id, user_index))
-    setup_database.commit()
-
-    cursor.execute("SELECT id FROM users WHERE `index` = %s", (user_index,))
-    db_user = cursor.fetchone()
     cursor.close()
-
-    assert True == respJS['success']
-    assert 201 == respJS['status']
-    assert "User account created successfully" == respJS['message']
-    assert user_email == respJS['data']['email']
-    assert user_name == respJS['data']['name']
-    assert db_user['id'] == user_id #database validation
-
-    # Armazena apenas o índice do usuário escolhido
-    user_index_data = {"user_index": user_index}
-
-    with open(f"./tests/fixtures/file-{randomData}.json", 'w') as json_file:
-        json.dump(user_index_data, json_file, indent=4)
-
-    login_user_api(randomData,  setup_database)
-    delete_user_api(randomData,  setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_create_user_api_bad_request(setup_database):
-    cursor = setup_database.cursor(dictionary=True)
-    # Seleciona um usuário aleatório do banco de dados
-    cursor.execute("SELECT `index`, name, email, password FROM users ORDER BY RAND() LIMIT 1")
-    user = cursor.fetchone()
     user_name = user["name"]
     user_email = user["email"]
     user_password = user["password"]
     body = {'confirmPassword': user_password, 'email': '@'+user_email, 'name': user_name, 'password': user_password}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/register", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    resp = api_client.post("/users/register", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 400 == respJS['status']
     assert "A valid email address is required" == respJS['message']
-    time.sleep(5)
 
-def test_login_user_api(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+@pytest.mark.slo(endpoint="/users", p95_ms=1500)
+def test_login_user_api(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -289,8 +212,8 @@ def test_login_user_api(setup_database):
 
     body = {'email': user_email, 'password': user_password}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/login", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    resp = api_client.post("/users/login", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -300,6 +223,7 @@ def test_login_user_api(setup_database):
     # Atualiza o banco de dados com o token obtido
     cursor.execute("UPDATE users SET token = %s WHERE `index` = %s", (user_token, user_index))
     setup_database.commit()
+    record_token(setup_database, user_id, user_token)
 
     # Consulta o token no banco para validação
     cursor.execute("SELECT token FROM users WHERE `index` = %s", (user_index,))
@@ -314,25 +238,9 @@ def test_login_user_api(setup_database):
     assert user_name == respJS['data']['name']
     assert db_user['token'] == user_token  # database validation
 
-    # Atualiza o objeto com o índice do usuário escolhido
-    user_index_data = {"user_index": user_index}
-
-    # Não precisa mais salvar no arquivo JSON, a informação foi atualizada no banco de dados
-    # Escreve o índice do usuário no arquivo JSON (se necessário)
-    with open(f"./tests/fixtures/file-{randomData}.json", 'w') as json_file:
-        json.dump(user_index_data, json_file, indent=4)
-
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_login_user_api_bad_request(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_login_user_api_bad_request(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -344,25 +252,16 @@ def test_login_user_api_bad_request(setup_database):
     user_password = user["password"]
     body = {'email': '@'+user_email, 'password': user_password}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/login", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    resp = api_client.post("/users/login", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 400 == respJS['status']
     assert "A valid email address is required" == respJS['message']
-    login_user_api(randomData, setup_database)
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_login_user_api_unauthorized(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+
+def test_login_user_api_unauthorized(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -374,27 +273,17 @@ def test_login_user_api_unauthorized(setup_database):
     user_password = user["password"]
     body = {'email': user_email, 'password': '@'+user_password}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded'}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/login", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+    resp = api_client.post("/users/login", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Incorrect email address or password" == respJS['message']
-    login_user_api(randomData, setup_database)
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_get_user_api(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
 
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+@pytest.mark.slo(endpoint="/users", p95_ms=1500)
+def test_get_user_api(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -407,8 +296,8 @@ def test_get_user_api(setup_database):
     user_id = user["id"]
     user_token = user["token"]
 
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.get("https://practice.expandtesting.com/notes/api/users/profile", headers=headers)
+    headers = {'x-auth-token': user_token}
+    resp = api_client.get("/users/profile", headers=headers)
     respJS = resp.json()
     print(respJS)
 
@@ -419,18 +308,9 @@ def test_get_user_api(setup_database):
     assert user_id == respJS['data']['id']
     assert user_name == respJS['data']['name']
 
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_get_user_api_unauthorized(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_get_user_api_unauthorized(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -439,26 +319,17 @@ def test_get_user_api_unauthorized(setup_database):
 
     # Atribui os valores das colunas do banco às variáveis
     user_token = user["token"]
-    headers = {'accept': 'application/json', 'x-auth-token': "@"+user_token}
-    resp = requests.get("https://practice.expandtesting.com/notes/api/users/profile", headers=headers)
+    headers = {'x-auth-token': "@"+user_token}
+    resp = api_client.get("/users/profile", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message']
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_update_user_api(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
-
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+@pytest.mark.slo(endpoint="/users", p95_ms=1500)
+def test_update_user_api(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -476,15 +347,15 @@ def test_update_user_api(setup_database):
     # Atualiza alguns dados do usuário para enviar na requisição
     new_user_name = Faker().name()
     new_user_phone = Faker().bothify(text='############')
-    new_user_company = Faker().company()
+    new_user_company = Faker().company()[:24]  # mesmo corte do seed (company de 4 a 30 caracteres)
     body = {'company': new_user_company, 'phone': new_user_phone, 'name': new_user_name}
     print(body)
 
     # Cabeçalhos da requisição
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
 
     # Realiza a requisição para atualizar o perfil
-    resp = requests.patch("https://practice.expandtesting.com/notes/api/users/profile", headers=headers, data=body)
+    resp = api_client.patch("/users/profile", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -517,19 +388,9 @@ def test_update_user_api(setup_database):
     assert db_user['phone'] == new_user_phone  # database validation
     assert db_user['company'] == new_user_company  # database validation
 
-    # Deleta o usuário e o arquivo JSON após o teste
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_update_user_api_bad_request(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_update_user_api_bad_request(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -550,26 +411,16 @@ def test_update_user_api_bad_request(setup_database):
     new_user_company = Faker().company()
     body = {'company': new_user_company, 'phone': new_user_phone, 'name': new_user_name}
     print(body)
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
-    resp = requests.patch("https://practice.expandtesting.com/notes/api/users/profile", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    resp = api_client.patch("/users/profile", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 400 == respJS['status']
     assert "User name must be between 4 and 30 characters" == respJS['message']
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_update_user_api_unauthorized(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
 
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_update_user_api_unauthorized(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -592,10 +443,10 @@ def test_update_user_api_unauthorized(setup_database):
     print(body)
 
     # Cabeçalhos da requisição, simulando um erro de autorização ao alterar o token
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': '@' + user_token}
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': '@' + user_token}
 
     # Realiza a requisição para atualizar o perfil
-    resp = requests.patch("https://practice.expandtesting.com/notes/api/users/profile", headers=headers, data=body)
+    resp = api_client.patch("/users/profile", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -604,20 +455,10 @@ def test_update_user_api_unauthorized(setup_database):
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message']
 
-    # Deleta o usuário e o arquivo JSON após o teste
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_update_user_password_api(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
-
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+@pytest.mark.slo(endpoint="/users", p95_ms=1500)
+def test_update_user_password_api(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -636,8 +477,8 @@ def test_update_user_password_api(setup_database):
     print(body)
 
     # Realiza a requisição para atualizar a senha
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/change-password", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    resp = api_client.post("/users/change-password", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -645,6 +486,7 @@ def test_update_user_password_api(setup_database):
     cursor = setup_database.cursor(dictionary=True)
     cursor.execute("UPDATE users SET password = %s WHERE `index` = %s", (user_new_password, user_index))
     setup_database.commit()
+    record_password(setup_database, user_id, user_new_password)
 
     # Consulta a senha atualizada para validar
     cursor.execute("SELECT password FROM users WHERE `index` = %s", (user_index,))
@@ -657,20 +499,9 @@ def test_update_user_password_api(setup_database):
     assert "The password was successfully updated" == respJS['message']
     assert db_user['password'] == user_new_password  # database validation
 
-    # Deleta o usuário e o arquivo JSON após o teste
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_update_user_password_api_bad_request(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
 
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_update_user_password_api_bad_request(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -686,8 +517,8 @@ def test_update_user_password_api_bad_request(setup_database):
     print(body)
 
     # Realiza a requisição para tentar atualizar a senha com senha inválida
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/change-password", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': user_token}
+    resp = api_client.post("/users/change-password", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -696,20 +527,9 @@ def test_update_user_password_api_bad_request(setup_database):
     assert 400 == respJS['status']
     assert "New password must be between 6 and 30 characters" == respJS['message']
 
-    # Deleta o usuário e o arquivo JSON após o teste
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_update_user_password_api_unauthorized(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
 
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_update_user_password_api_unauthorized(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar os dados do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -727,8 +547,8 @@ def test_update_user_password_api_unauthorized(setup_database):
     print(body)
 
     # Simula um erro de autorização com um token inválido
-    headers = {'accept': 'application/json', 'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': "@" + user_token}
-    resp = requests.post("https://practice.expandtesting.com/notes/api/users/change-password", headers=headers, data=body)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'x-auth-token': "@" + user_token}
+    resp = api_client.post("/users/change-password", headers=headers, data=body)
     respJS = resp.json()
     print(respJS)
 
@@ -737,19 +557,10 @@ def test_update_user_password_api_unauthorized(setup_database):
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message']
 
-    # Deleta o usuário e o arquivo JSON após o teste
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_logout_user_api(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+@pytest.mark.slo(endpoint="/users", p95_ms=1500)
+def test_logout_user_api(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar o token do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -758,26 +569,17 @@ def test_logout_user_api(setup_database):
 
     # Atribui o valor do token à variável user_token
     user_token = user["token"]
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.delete("https://practice.expandtesting.com/notes/api/users/logout", headers=headers)
+    headers = {'x-auth-token': user_token}
+    resp = api_client.delete("/users/logout", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert True == respJS['success']
     assert 200 == respJS['status']
     assert "User has been successfully logged out" == respJS['message']
-    login_user_api(randomData, setup_database)
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_logout_user_api_unauthorized(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+    login_user_api(flow_context, setup_database, api_client)
+
+def test_logout_user_api_unauthorized(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar o token do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -786,55 +588,38 @@ def test_logout_user_api_unauthorized(setup_database):
 
     # Atribui o valor do token à variável user_token
     user_token = user["token"]
-    headers = {'accept': 'application/json', 'x-auth-token': '@'+user_token}
-    resp = requests.delete("https://practice.expandtesting.com/notes/api/users/logout", headers=headers)
+    headers = {'x-auth-token': '@'+user_token}
+    resp = api_client.delete("/users/logout", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message']
-    delete_user_api(randomData, setup_database)
-    delete_json_file(randomData)
-    time.sleep(5)
-
-def test_delete_user_api(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
 
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_delete_user_api(setup_database, api_client, flow_context, disposable_user):
+    user_index = flow_context.user_index
 
-    # Conecta ao banco de dados para buscar o token do usuário pelo index
+    # Conecta ao banco de dados para buscar o id e o token do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
-    cursor.execute("SELECT token FROM users WHERE `index` = %s", (user_index,))
+    cursor.execute("SELECT id, token FROM users WHERE `index` = %s", (user_index,))
     user = cursor.fetchone()
 
     # Atribui o valor do token à variável user_token
     user_token = user["token"]
 
-    headers = {'accept': 'application/json', 'x-auth-token': user_token}
-    resp = requests.delete("https://practice.expandtesting.com/notes/api/users/delete-account", headers=headers)
+    headers = {'x-auth-token': user_token}
+    resp = api_client.delete("/users/delete-account", headers=headers)
     respJS = resp.json()
     print(respJS)
 
     assert True == respJS['success']
     assert 200 == respJS['status']
     assert "Account successfully deleted" == respJS['message']
+    forget_account(setup_database, user["id"])
 
-    delete_json_file(randomData)
-    time.sleep(5)
 
-def test_delete_user_api_unauthorized(setup_database):
-    randomData = Faker().hexify(text='^^^^^^^^^^^^')
-    create_user_api(randomData, setup_database)
-    login_user_api(randomData, setup_database)
-    # Abre o arquivo para obter o index do usuário escolhido aleatoriamente
-    with open(f"./tests/fixtures/file-{randomData}.json", 'r') as json_file:
-        data = json.load(json_file)
-    user_index = data['user_index']
+def test_delete_user_api_unauthorized(setup_database, api_client, flow_context, pooled_user):
+    user_index = flow_context.user_index
 
     # Conecta ao banco de dados para buscar o token do usuário pelo index
     cursor = setup_database.cursor(dictionary=True)
@@ -843,17 +628,13 @@ def test_delete_user_api_unauthorized(setup_database):
 
     # Atribui o valor do token à variável user_token
     user_token = user["token"]
-    headers = {'accept': 'application/json', 'x-auth-token': '@'+user_token}
-    resp = requests.delete("https://practice.expandtesting.com/notes/api/users/delete-account", headers=headers)
+    headers = {'x-auth-token': '@'+user_token}
+    resp = api_client.delete("/users/delete-account", headers=headers)
     respJS = resp.json()
     print(respJS)
     assert False == respJS['success']
     assert 401 == respJS['status']
     assert "Access token is not valid or has expired, you will need to login" == respJS['message']
 
-    delete_user_api(randomData, setup_database)
-
-    delete_json_file(randomData)
-    time.sleep(5)
 
 
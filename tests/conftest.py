@@ -0,0 +1,299 @@
+import os
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente do arquivo .env antes de ler os valores padrão das opções
+load_dotenv()
+
+pytest_plugins = ["api.plugin_db", "api.plugin_sql", "api.plugin_db_budget", "api.plugin_http", "api.plugin_slo", "api.plugin_phases", "api.plugin_profile", "api.plugin_baseline"]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("database", "seed database options")
+    group.addoption(
+        "--seed-rows",
+        action="store",
+        type=int,
+        default=int(os.getenv("SEED_ROWS", "250")),
+        help="number of seed rows inserted in the users and notes tables (env: SEED_ROWS, default: 250)",
+    )
+    group.addoption(
+        "--seed-batch-size",
+        action="store",
+        type=int,
+        default=int(os.getenv("SEED_BATCH_SIZE", "5000")),
+        help="rows sent per multi-row INSERT or per CSV chunk (env: SEED_BATCH_SIZE, default: 5000)",
+    )
+    group.addoption(
+        "--seed-method",
+        action="store",
+        choices=("executemany", "load-data"),
+        default=os.getenv("SEED_METHOD", "executemany"),
+        help="bulk seeding path: multi-row executemany batches or LOAD DATA LOCAL INFILE (env: SEED_METHOD)",
+    )
+    group.addoption(
+        "--seed-generator",
+        action="store",
+        choices=("vectorized", "faker"),
+        default=os.getenv("SEED_GENERATOR", "vectorized"),
+        help="seed data generator: column-wise NumPy generator or the per-row Faker loop (env: SEED_GENERATOR)",
+    )
+    group.addoption(
+        "--db-isolation",
+        action="store",
+        choices=("drop", "transaction"),
+        default=os.getenv("DB_ISOLATION", "drop"),
+        help="drop: rebuild and drop the databases every session; transaction: keep the seeded schema "
+             "between runs (rebuilt only when its fingerprint changes) and roll back each db_only test (env: DB_ISOLATION)",
+    )
+    group.addoption(
+        "--db-pool-size",
+        action="store",
+        type=int,
+        default=int(os.getenv("DB_POOL_SIZE", "4")),
+        help="connections per database in the shared MySQL pool, max 32 (env: DB_POOL_SIZE, default: 4)",
+    )
+    group.addoption(
+        "--db-pool-timeout",
+        action="store",
+        type=float,
+        default=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        help="seconds to wait for a free pooled connection before failing (env: DB_POOL_TIMEOUT, default: 10)",
+    )
+    group.addoption(
+        "--full-validation",
+        action="store_true",
+        default=os.getenv("FULL_VALIDATION", "") not in ("", "0", "false"),
+        help="check every row in the column format tests instead of only rows changed since the stored "
+             "validation watermark (env: FULL_VALIDATION)",
+    )
+
+    group.addoption(
+        "--sql-slow-ms",
+        action="store",
+        type=float,
+        default=float(os.getenv("SQL_SLOW_MS", "50")),
+        help="statements slower than this are listed with their EXPLAIN plan in the SQL summary "
+             "(env: SQL_SLOW_MS, default: 50)",
+    )
+    group.addoption(
+        "--sql-scan-rows",
+        action="store",
+        type=int,
+        default=int(os.getenv("SQL_SCAN_ROWS", "100")),
+        help="estimated rows from which a full scan, filesort or temporary table in the EXPLAIN plan "
+             "is listed in the SQL summary (env: SQL_SCAN_ROWS, default: 100)",
+    )
+    group.addoption(
+        "--no-sql-explain",
+        action="store_true",
+        default=os.getenv("SQL_EXPLAIN", "1") in ("0", "false"),
+        help="do not run EXPLAIN for the statements executed by the tests; only count and time them "
+             "(env: SQL_EXPLAIN=0)",
+    )
+    group.addoption(
+        "--db-budget",
+        action="store",
+        choices=("enforce", "report", "off"),
+        default=os.getenv("DB_BUDGET", "enforce"),
+        help="round-trip budgets of @pytest.mark.db_budget: fail the test, only report them in the summary, "
+             "or skip the check (env: DB_BUDGET, default: enforce)",
+    )
+
+    group = parser.getgroup("api", "Notes API client options")
+    group.addoption(
+        "--api-base-url",
+        action="store",
+        default=os.getenv("API_BASE_URL", "https://practice.expandtesting.com/notes/api"),
+        help="base URL of the Notes API (env: API_BASE_URL)",
+    )
+    group.addoption(
+        "--api-route",
+        action="append",
+        default=[route for route in os.getenv("API_ROUTES", "").split(",") if route],
+        metavar="PREFIX=URL",
+        help="send the requests whose path starts with PREFIX to another base URL, e.g. "
+             "--api-route /notes=http://localhost:8080/api; repeatable, ignored with --api-standin "
+             "(env: API_ROUTES, comma separated)",
+    )
+    group.addoption(
+        "--http-pool-size",
+        action="store",
+        type=int,
+        default=int(os.getenv("HTTP_POOL_SIZE", "10")),
+        help="keep-alive connections kept by the shared HTTP session (env: HTTP_POOL_SIZE, default: 10)",
+    )
+    group.addoption(
+        "--api-standin",
+        action="store_true",
+        default=os.getenv("API_STANDIN", "") not in ("", "0", "false"),
+        help="run the API tests against the in-memory Notes API stand-in started on localhost "
+             "instead of --api-base-url (env: API_STANDIN)",
+    )
+    group.addoption(
+        "--api-pause",
+        action="store",
+        type=float,
+        default=float(os.environ["API_PAUSE"]) if os.getenv("API_PAUSE") else None,
+        help="seconds to wait at the end of each API test to respect the public API rate limit "
+             "(env: API_PAUSE, default: 5, or 0 with --api-standin)",
+    )
+    group.addoption(
+        "--async-concurrency",
+        action="store",
+        type=int,
+        default=int(os.environ["ASYNC_CONCURRENCY"]) if os.getenv("ASYNC_CONCURRENCY") else None,
+        help="user lifecycles run at the same time by the async API tests "
+             "(env: ASYNC_CONCURRENCY, default: 50 with --api-standin, 1 against the rate-limited public API)",
+    )
+    group.addoption(
+        "--async-lifecycles",
+        action="store",
+        type=int,
+        default=int(os.environ["ASYNC_LIFECYCLES"]) if os.getenv("ASYNC_LIFECYCLES") else None,
+        help="user lifecycles started by the concurrent async API test (env: ASYNC_LIFECYCLES, default: 10 "
+             "with --api-standin; against the public API the test is skipped unless this is set)",
+    )
+    group.addoption(
+        "--user-pool-size",
+        action="store",
+        type=int,
+        default=int(os.getenv("USER_POOL_SIZE", "4")),
+        help="users registered and logged in at session start and leased to the API tests; "
+             "more are registered on demand when the pool runs dry (env: USER_POOL_SIZE, default: 4)",
+    )
+    group.addoption(
+        "--slo",
+        action="store",
+        choices=("enforce", "report", "off"),
+        default=os.getenv("API_SLO") or None,
+        help="latency budgets of @pytest.mark.slo: fail the test, only report them in the summary, "
+             "or skip the check (env: API_SLO, default: enforce with --api-standin, report against "
+             "the public API, whose latency is too noisy to fail on)",
+    )
+    group.addoption(
+        "--phase-timings",
+        action="store",
+        default=os.getenv("PHASE_TIMINGS") or None,
+        metavar="PATH",
+        help="write each test's time per phase (DB query, DB commit, HTTP, JSON decode, file I/O, other) "
+             "to this JSON file, e.g. ./reports/phase_timings.json (env: PHASE_TIMINGS)",
+    )
+    group.addoption(
+        "--persist-flow-context",
+        action="store_true",
+        default=os.getenv("PERSIST_FLOW_CONTEXT", "") not in ("", "0", "false"),
+        help="also write each test's flow state to tests/fixtures/file-<id>.json for debugging; "
+             "the files are kept after the run (env: PERSIST_FLOW_CONTEXT)",
+    )
+
+    group = parser.getgroup("profiling", "per-test CPU and memory profiling")
+    group.addoption(
+        "--profile-tests",
+        action="store_true",
+        default=os.getenv("PROFILE_TESTS", "") not in ("", "0", "false"),
+        help="run the body of each test under cProfile and write <test>.prof and <test>.prof.txt "
+             "to --profile-dir (env: PROFILE_TESTS)",
+    )
+    group.addoption(
+        "--trace-memory",
+        action="store_true",
+        default=os.getenv("TRACE_MEMORY", "") not in ("", "0", "false"),
+        help="trace the allocations of each test body with tracemalloc and write the top lines "
+             "to <test>.mem.txt in --profile-dir (env: TRACE_MEMORY)",
+    )
+    group.addoption(
+        "--profile-dir",
+        action="store",
+        default=os.getenv("PROFILE_DIR") or None,
+        help="where the profiles are written (env: PROFILE_DIR, default: profiles/ next to the --html "
+             "report, or ./reports/profiles)",
+    )
+    group.addoption(
+        "--profile-top",
+        action="store",
+        type=int,
+        default=int(os.getenv("PROFILE_TOP", "30")),
+        help="functions and allocation lines listed in the text summaries (env: PROFILE_TOP, default: 30)",
+    )
+    group.addoption(
+        "--trace-memory-frames",
+        action="store",
+        type=int,
+        default=int(os.getenv("TRACE_MEMORY_FRAMES", "1")),
+        help="frames kept per allocation by tracemalloc; more frames cost more memory and time "
+             "(env: TRACE_MEMORY_FRAMES, default: 1)",
+    )
+
+    group = parser.getgroup("perf", "performance regression gate")
+    group.addoption(
+        "--perf-baseline",
+        action="store",
+        default=os.getenv("PERF_BASELINE") or None,
+        metavar="PATH",
+        help="compare test durations and endpoint latencies with the samples in this baseline file "
+             "(env: PERF_BASELINE)",
+    )
+    group.addoption(
+        "--perf-save-baseline",
+        action="store",
+        default=os.getenv("PERF_SAVE_BASELINE") or None,
+        metavar="PATH",
+        help="append this run's timings to the baseline file when the run passes (env: PERF_SAVE_BASELINE)",
+    )
+    group.addoption(
+        "--perf-gate",
+        action="store",
+        choices=("fail", "warn"),
+        default=os.getenv("PERF_GATE", "fail"),
+        help="fail the run on regressions, or only list them (env: PERF_GATE, default: fail)",
+    )
+    group.addoption(
+        "--perf-tolerance",
+        action="store",
+        type=float,
+        default=float(os.getenv("PERF_TOLERANCE", "0.2")),
+        help="relative slowdown over the baseline median allowed (env: PERF_TOLERANCE, default: 0.2 = 20%%)",
+    )
+    group.addoption(
+        "--perf-min-delta-ms",
+        action="store",
+        type=float,
+        default=float(os.getenv("PERF_MIN_DELTA_MS", "50")),
+        help="absolute slowdown in ms always allowed, for very fast tests and endpoints "
+             "(env: PERF_MIN_DELTA_MS, default: 50)",
+    )
+    group.addoption(
+        "--perf-noise-k",
+        action="store",
+        type=float,
+        default=float(os.getenv("PERF_NOISE_K", "3")),
+        help="slowdown allowed in robust standard deviations (MAD) of the baseline samples "
+             "(env: PERF_NOISE_K, default: 3)",
+    )
+    group.addoption(
+        "--perf-min-samples",
+        action="store",
+        type=int,
+        default=int(os.getenv("PERF_MIN_SAMPLES", "3")),
+        help="baseline runs needed before a regression can fail the run; with fewer it is only listed "
+             "(env: PERF_MIN_SAMPLES, default: 3)",
+    )
+    group.addoption(
+        "--perf-window",
+        action="store",
+        type=int,
+        default=int(os.getenv("PERF_WINDOW", "10")),
+        help="most recent runs kept per test and endpoint by --perf-save-baseline (env: PERF_WINDOW, default: 10)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "db_only: test only touches MySQL; rolled back when --db-isolation=transaction")
+    config.addinivalue_line(
+        "markers",
+        "slo(endpoint, method=None, p95_ms=..., max_ms=...): latency budget for the API requests made by the test",
+    )
+    config.addinivalue_line(
+        "markers",
+        "db_budget(queries=..., commits=..., cursors=...): most statements, commits and cursors the test body may use",
+    )